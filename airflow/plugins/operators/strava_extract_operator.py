@@ -22,6 +22,7 @@ class StravaExtractOperator(BaseOperator):
 
     :param extract_start_date: Start date for extraction (YYYY-MM-DD format)
     :param extract_end_date: End date for extraction (YYYY-MM-DD format)
+    :param force_refetch: Refetch child data of activities already loaded
     """
 
     template_fields = ["extract_start_date", "extract_end_date"]
@@ -31,11 +32,13 @@ class StravaExtractOperator(BaseOperator):
         self,
         extract_start_date: Optional[str] = None,
         extract_end_date: Optional[str] = None,
+        force_refetch: bool = False,
         **kwargs
     ):
         super().__init__(**kwargs)
         self.extract_start_date = extract_start_date
         self.extract_end_date = extract_end_date
+        self.force_refetch = force_refetch
 
     def execute(self, context):
         """Execute the extraction pipeline."""
@@ -139,6 +142,7 @@ class StravaExtractOperator(BaseOperator):
                         start_date=start_date,
                         end_date=end_date,
                         configure_logging=False,
+                        force_refetch=self.force_refetch,
                     )
             finally:
                 detach_trace_context(token)
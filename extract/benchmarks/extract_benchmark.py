@@ -0,0 +1,163 @@
+"""
+Benchmark StravaPipeline.run end to end against the local fake Strava API.
+
+Starts benchmarks/fake_strava.py in a separate process (so serving does not
+compete with the pipeline for the GIL), runs the pipeline once per synthetic
+athlete into a temporary DuckDB database and reports requests/s, rows/s,
+peak RSS and the time spent per stage (pipeline spans and dlt steps).
+
+Usage:
+    python benchmarks/extract_benchmark.py [--athletes 1] [--activities 200]
+        [--rate-limit-mode paced] [--fail-every 0] [--item-format dict]
+        [--dir /path/on/volume]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict
+from urllib.request import urlopen
+
+from fake_strava import API_PREFIX, FakeStravaServer, add_arguments, from_arguments
+
+
+def _serve(args: argparse.Namespace, urls: "multiprocessing.Queue[str]") -> None:
+    data, limits = from_arguments(args)
+    server = FakeStravaServer(("127.0.0.1", 0), data, limits)
+    urls.put(server.url)
+    server.serve_forever()
+
+
+class _StepTimer:
+    """dlt tracking module summing the time and rows of every pipeline step."""
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.rows: Dict[str, int] = defaultdict(int)
+
+    def on_start_trace(self, trace: Any, step: str, pipeline: Any) -> None:
+        pass
+
+    def on_start_trace_step(self, trace: Any, step: str, pipeline: Any) -> None:
+        pass
+
+    def on_end_trace_step(
+        self, trace: Any, step: Any, pipeline: Any, step_info: Any, send_state: bool
+    ) -> None:
+        if step.step == "run":
+            return
+        duration = step.finished_at - step.started_at
+        self.seconds[f"dlt.{step.step}"] += duration.total_seconds()
+        if step.step == "normalize" and step_info is not None:
+            for table, count in getattr(step_info, "row_counts", {}).items():
+                if not table.startswith("_dlt"):
+                    self.rows[table] += count
+
+    def on_end_trace(self, trace: Any, pipeline: Any, send_state: bool) -> None:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(parser)
+    parser.add_argument("--start-date", default="2023-12-31")
+    parser.add_argument("--end-date", default=None)
+    parser.add_argument("--rate-limit-mode", choices=["reactive", "paced"], default="paced")
+    parser.add_argument("--item-format", choices=["dict", "arrow"], default="dict")
+    parser.add_argument("--dir", default=None, help="Directory for the DuckDB database and state")
+    args = parser.parse_args()
+
+    urls: "multiprocessing.Queue[str]" = multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve, args=(args, urls), daemon=True)
+    server.start()
+    url = urls.get(timeout=120)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        os.chdir(tmp)
+        os.environ["DUCKDB_PATH"] = str(Path(tmp) / "benchmark.duckdb")
+        os.environ["DLT_DATA_DIR"] = str(Path(tmp) / "dlt")
+        os.environ["CREDENTIALS__CLIENT_ID"] = "1"
+        os.environ["CREDENTIALS__CLIENT_SECRET"] = "fake"
+        os.environ["CREDENTIALS__ACCESS_TOKEN_URL"] = f"{url}/oauth/token"
+
+        from dlt.pipeline import trace as dlt_trace
+        from opentelemetry import trace
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+            InMemorySpanExporter,
+        )
+
+        from strava_extract.config.settings import get_settings
+        from strava_extract.pipeline import StravaPipeline
+        from strava_extract.sources.strava_source import reset_rate_limiter
+        from strava_extract.utils.logging import setup_logging
+
+        settings = get_settings()
+        settings.api.base_url = f"{url}{API_PREFIX}"
+        settings.rate_limiting.mode = args.rate_limit_mode
+        settings.rate_limiting.show_progress_bar = False
+        settings.pipeline.item_format = args.item_format
+        settings.rate_limiting.state_file = str(Path(tmp) / "rate_limit_state.json")
+        settings.auth.token_cache_file = str(Path(tmp) / "token_cache.json")
+        setup_logging(level="WARNING", include_trace_id=False)
+
+        spans = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(spans))
+        trace.set_tracer_provider(provider)
+        steps = _StepTimer()
+        dlt_trace.TRACKING_MODULES.append(steps)  # type: ignore[arg-type]
+
+        print(
+            f"{args.athletes} athlete(s) x {args.activities} activities, "
+            f"{args.min_seconds}-{args.max_seconds} s streams, rate limiting {args.rate_limit_mode}, "
+            f"{args.item_format} items, "
+            f"fake API {url}"
+        )
+        start = time.perf_counter()
+        for athlete in range(args.athletes):
+            os.environ["CREDENTIALS__REFRESH_TOKEN"] = f"athlete-{athlete}"
+            reset_rate_limiter()
+            StravaPipeline(start_date=args.start_date, end_date=args.end_date).run()
+        elapsed = time.perf_counter() - start
+
+        with urlopen(f"{url}/_stats") as response:
+            served = json.load(response)
+    server.terminate()
+
+    api_requests = sum(count for kind, count in served.items() if kind not in ("token", "429"))
+    rows = sum(steps.rows.values())
+    stage_seconds: Dict[str, float] = defaultdict(float)
+    for span in spans.get_finished_spans():
+        if span.name != "strava.pipeline.run" and span.start_time and span.end_time:
+            stage_seconds[span.name] += (span.end_time - span.start_time) / 1e9
+    stage_seconds.update(steps.seconds)
+
+    print(f"\nWall time:        {elapsed:10.2f} s")
+    print(f"API requests:     {api_requests:10d}  ({api_requests / elapsed:.1f} requests/s)")
+    print(f"  by endpoint:    {json.dumps(served, sort_keys=True)}")
+    print(f"Rows loaded:      {rows:10d}  ({rows / elapsed:.1f} rows/s)")
+    for table, count in sorted(steps.rows.items()):
+        print(f"  {table:<30} {count:10d}")
+    print(f"Peak RSS:         {_peak_rss_mb():10.1f} MB")
+    print("Time per stage:")
+    for name, seconds in sorted(stage_seconds.items(), key=lambda item: -item[1]):
+        print(f"  {name:<30} {seconds:10.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,648 @@
+"""
+Local stand-in for the Strava API, serving synthetic athletes and activities.
+
+Serves the endpoints the extract pipeline calls:
+
+- ``POST /oauth/token``: refresh token ``athlete-<n>`` -> access token of athlete n
+- ``GET /api/v3/activities``: paged activity list with ``after``/``before`` (ascending)
+- ``GET /api/v3/activities/<id>``: detail with segment efforts, laps, splits, best efforts
+- ``GET /api/v3/activities/<id>/streams``: streams of 1 Hz samples (``resolution`` caps them)
+- ``GET /api/v3/activities/<id>/zones``: heart rate and power zones
+- ``GET /_stats``: requests served per endpoint and 429s sent
+
+Every API response carries ``X-RateLimit-*`` and ``X-ReadRateLimit-*`` headers
+for the configured limits; requests over a limit get a 429, and ``--fail-every``
+injects a 429 every N requests on top.
+
+Usage:
+    python benchmarks/fake_strava.py [--port 8765] [--athletes 1] [--activities 200]
+
+Point the pipeline at it with:
+    CREDENTIALS__CLIENT_ID=1 CREDENTIALS__CLIENT_SECRET=fake
+    CREDENTIALS__REFRESH_TOKEN=athlete-0
+    CREDENTIALS__ACCESS_TOKEN_URL=http://127.0.0.1:8765/oauth/token
+    and api.base_url: http://127.0.0.1:8765/api/v3/ in config.yaml
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+API_PREFIX = "/api/v3/"
+# Sample counts Strava downsamples streams to per resolution
+RESOLUTION_POINTS = {"low": 100, "medium": 1000, "high": 10000}
+SPORTS = ("Run", "Ride", "Ride", "Run", "Swim", "VirtualRide", "Walk")
+STREAM_KEYS = (
+    "time,distance,altitude,velocity_smooth,heartrate,cadence,watts,temp,moving,grade_smooth,latlng"
+)
+
+
+@dataclass
+class SyntheticAthletes:
+    """
+    Deterministic synthetic athletes and activities.
+
+    Athlete n has ``activities`` activities, one every ``spacing_hours`` from
+    ``start``, with moving times (and so 1 Hz stream lengths) drawn between
+    ``min_seconds`` and ``max_seconds``.
+    """
+
+    athletes: int = 1
+    activities: int = 200
+    start: datetime = datetime(2024, 1, 1, 6, 0, tzinfo=timezone.utc)
+    spacing_hours: float = 20.0
+    min_seconds: int = 1800
+    max_seconds: int = 7200
+    seed: int = 42
+    _by_id: Dict[int, Dict[str, Any]] = field(default_factory=dict, init=False)
+    _by_athlete: List[List[Dict[str, Any]]] = field(default_factory=list, init=False)
+
+    def __post_init__(self) -> None:
+        rng = random.Random(self.seed)
+        for athlete in range(self.athletes):
+            activities = []
+            for index in range(self.activities):
+                activity = self._activity(rng, athlete, index)
+                activities.append(activity)
+                self._by_id[activity["id"]] = activity
+            self._by_athlete.append(activities)
+
+    def _activity(self, rng: random.Random, athlete: int, index: int) -> Dict[str, Any]:
+        start = self.start + timedelta(hours=index * self.spacing_hours, minutes=athlete)
+        sport = SPORTS[(index + athlete) % len(SPORTS)]
+        moving_time = rng.randint(self.min_seconds, self.max_seconds)
+        speed = {"Run": 3.0, "Walk": 1.4, "Swim": 0.8}.get(sport, 8.0)
+        trainer = sport == "VirtualRide"
+        has_heartrate = rng.random() > 0.1
+        device_watts = sport in ("Ride", "VirtualRide") and rng.random() > 0.3
+        lat, lng = 52.0 + rng.random(), 4.0 + rng.random()
+        activity = {
+            "resource_state": 2,
+            "athlete": {"id": 1000 + athlete, "resource_state": 1},
+            "name": f"{sport} {index}",
+            "distance": round(moving_time * speed, 1),
+            "moving_time": moving_time,
+            "elapsed_time": moving_time + rng.randint(0, 600),
+            "total_elevation_gain": round(rng.uniform(0, 800), 1),
+            "type": sport,
+            "sport_type": sport,
+            "workout_type": None,
+            "id": (athlete + 1) * 10_000_000 + index,
+            "start_date": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "start_date_local": (start + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "timezone": "(GMT+01:00) Europe/Amsterdam",
+            "utc_offset": 3600.0,
+            "location_city": None,
+            "location_state": None,
+            "location_country": "Netherlands",
+            "achievement_count": rng.randint(0, 5),
+            "kudos_count": rng.randint(0, 30),
+            "comment_count": rng.randint(0, 3),
+            "athlete_count": 1,
+            "photo_count": 0,
+            "map": {"id": f"a{index}", "summary_polyline": "_p~iF~ps|U_ulLnnqC", "resource_state": 2},
+            "trainer": trainer,
+            "commute": False,
+            "manual": index % 50 == 49,
+            "private": False,
+            "visibility": "everyone",
+            "flagged": False,
+            "gear_id": "b1",
+            "start_latlng": [] if trainer else [round(lat, 6), round(lng, 6)],
+            "end_latlng": [] if trainer else [round(lat, 6), round(lng, 6)],
+            "average_speed": speed,
+            "max_speed": speed * 1.8,
+            "has_heartrate": has_heartrate,
+            "average_heartrate": 145.0 if has_heartrate else None,
+            "max_heartrate": 180.0 if has_heartrate else None,
+            "heartrate_opt_out": False,
+            "display_hide_heartrate_option": has_heartrate,
+            "elev_high": 40.0,
+            "elev_low": 1.0,
+            "upload_id": 9_000_000_000 + index,
+            "upload_id_str": str(9_000_000_000 + index),
+            "external_id": f"garmin_{index}.fit",
+            "from_accepted_tag": False,
+            "pr_count": rng.randint(0, 3),
+            "total_photo_count": 0,
+            "has_kudoed": False,
+            "suffer_score": float(rng.randint(10, 200)),
+            "device_name": "Garmin Edge 540",
+            "average_watts": 210.0 if device_watts else None,
+            "device_watts": device_watts,
+            "kilojoules": moving_time * 0.21 if device_watts else None,
+        }
+        if sport not in ("Ride", "VirtualRide"):
+            # Like Strava, no power fields at all for sports without power meters
+            for name in ("average_watts", "device_watts", "kilojoules"):
+                del activity[name]
+        return activity
+
+    def athlete_of_token(self, token: str) -> Optional[int]:
+        """Get the athlete an access token belongs to."""
+        match = re.fullmatch(r"fake-access-(\d+)", token)
+        if match and int(match.group(1)) < self.athletes:
+            return int(match.group(1))
+        return None
+
+    def list_activities(
+        self, athlete: int, after: Optional[int], before: Optional[int], page: int, per_page: int
+    ) -> List[Dict[str, Any]]:
+        """Get a page of an athlete's activities in a range, oldest first."""
+        selected = [
+            activity
+            for activity in self._by_athlete[athlete]
+            if (after is None or _epoch(activity["start_date"]) > after)
+            and (before is None or _epoch(activity["start_date"]) < before)
+        ]
+        return selected[(page - 1) * per_page : page * per_page]
+
+    def activity(self, activity_id: int) -> Optional[Dict[str, Any]]:
+        """Get an activity summary by ID."""
+        return self._by_id.get(activity_id)
+
+    def detail(self, activity: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the detailed representation of an activity."""
+        rng = random.Random(activity["id"])
+        activity_id = activity["id"]
+        ref = {"id": activity_id, "resource_state": 1}
+        athlete = activity["athlete"]
+        kilometers = max(1, int(activity["distance"] // 1000))
+        efforts = [
+            {
+                "id": activity_id * 100 + k,
+                "resource_state": 2,
+                "name": f"Segment {k}",
+                "activity": ref,
+                "athlete": athlete,
+                "elapsed_time": rng.randint(60, 900),
+                "moving_time": rng.randint(60, 900),
+                "start_date": activity["start_date"],
+                "start_date_local": activity["start_date_local"],
+                "distance": round(rng.uniform(300, 5000), 1),
+                "start_index": k * 100,
+                "end_index": k * 100 + 90,
+                "device_watts": activity.get("device_watts", False),
+                "segment": {"id": 500 + k, "name": f"Segment {k}", "distance": 1200.0},
+                "pr_rank": None,
+                "kom_rank": None,
+                "achievements": [],
+                "visibility": "everyone",
+                "hidden": False,
+            }
+            for k in range(rng.randint(0, 12))
+        ]
+        laps = [
+            {
+                "id": activity_id * 1000 + k,
+                "resource_state": 2,
+                "name": f"Lap {k + 1}",
+                "activity": ref,
+                "athlete": athlete,
+                "elapsed_time": 600,
+                "moving_time": 590,
+                "start_date": activity["start_date"],
+                "start_date_local": activity["start_date_local"],
+                "distance": 5000.0,
+                "start_index": k * 600,
+                "end_index": (k + 1) * 600,
+                "lap_index": k + 1,
+                "split": k + 1,
+                "total_elevation_gain": 12.0,
+                "average_speed": activity["average_speed"],
+                "max_speed": activity["max_speed"],
+                "device_watts": activity.get("device_watts", False),
+                "pace_zone": 2,
+            }
+            for k in range(max(1, kilometers // 5))
+        ]
+        splits = [
+            {
+                "split": k + 1,
+                "distance": 1000.0,
+                "elapsed_time": rng.randint(180, 400),
+                "moving_time": rng.randint(180, 400),
+                "elevation_difference": round(rng.uniform(-5, 5), 1),
+                "average_speed": activity["average_speed"],
+                "average_grade_adjusted_speed": activity["average_speed"],
+                "pace_zone": 2,
+            }
+            for k in range(kilometers)
+        ]
+        best_efforts = [
+            {
+                "id": activity_id * 10 + k,
+                "resource_state": 2,
+                "name": name,
+                "activity": ref,
+                "athlete": athlete,
+                "elapsed_time": rng.randint(200, 4000),
+                "moving_time": rng.randint(200, 4000),
+                "start_date": activity["start_date"],
+                "start_date_local": activity["start_date_local"],
+                "distance": distance,
+                "start_index": 0,
+                "end_index": 100,
+                "pr_rank": None,
+                "achievements": [],
+            }
+            for k, (name, distance) in enumerate(
+                [("1k", 1000.0), ("5k", 5000.0), ("10k", 10000.0)]
+            )
+            if activity["sport_type"] == "Run" and distance <= activity["distance"]
+        ]
+        return {
+            **activity,
+            "resource_state": 3,
+            "map": {
+                **activity["map"],
+                "polyline": activity["map"]["summary_polyline"],
+                "resource_state": 3,
+            },
+            "description": "Synthetic activity",
+            "calories": round(activity["moving_time"] * 0.2, 1),
+            "embed_token": "0" * 40,
+            "gear": {"id": "b1", "name": "Bike", "distance": 12345.0},
+            "photos": {"primary": None, "count": 0},
+            "splits_standard": [],
+            "available_zones": ["heartrate"] if activity["has_heartrate"] else [],
+            "average_cadence": 85.0,
+            "average_temp": 18.0,
+            "weighted_average_watts": 220 if activity.get("device_watts") else None,
+            "max_watts": 650 if activity.get("device_watts") else None,
+            "hide_from_home": False,
+            "segment_leaderboard_opt_out": False,
+            "leaderboard_opt_out": False,
+            "segment_efforts": efforts,
+            "laps": laps,
+            "splits_metric": splits,
+            "best_efforts": best_efforts,
+        }
+
+    def streams(
+        self,
+        activity: Dict[str, Any],
+        keys: List[str],
+        resolution: Optional[str],
+        series_type: str,
+        key_by_type: bool,
+    ) -> Any:
+        """Build the streams of an activity: 1 Hz samples, downsampled to the resolution."""
+        size = activity["moving_time"]
+        points = min(size, RESOLUTION_POINTS.get(resolution or "", size))
+        step = size / points
+        lat, lng = activity["start_latlng"] or [52.0, 4.0]
+        speed = activity["average_speed"]
+        streams = []
+        for key in keys:
+            if key == "latlng" and activity["trainer"]:
+                continue
+            if key == "heartrate" and not activity["has_heartrate"]:
+                continue
+            if key == "watts" and not activity.get("device_watts"):
+                continue
+            data: List[Any]
+            if key == "time":
+                data = [int(i * step) for i in range(points)]
+            elif key == "distance":
+                data = [round(i * step * speed, 1) for i in range(points)]
+            elif key == "latlng":
+                data = [
+                    [round(lat + i * 1e-5, 6), round(lng + math.sin(i / 50) * 1e-3, 6)]
+                    for i in range(points)
+                ]
+            elif key == "moving":
+                data = [i % 97 != 0 for i in range(points)]
+            elif key in ("heartrate", "cadence", "watts", "temp"):
+                base = {"heartrate": 140, "cadence": 85, "watts": 210, "temp": 18}[key]
+                data = [base + int(10 * math.sin(i / 30)) for i in range(points)]
+            else:
+                data = [round(10 + 5 * math.sin(i / 40), 1) for i in range(points)]
+            streams.append(
+                {
+                    "type": key,
+                    "data": data,
+                    "series_type": series_type,
+                    "original_size": size,
+                    "resolution": resolution or "high",
+                }
+            )
+        if key_by_type:
+            return {
+                stream["type"]: {k: v for k, v in stream.items() if k != "type"}
+                for stream in streams
+            }
+        return streams
+
+    def zones(self, activity: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Build the zones of an activity."""
+        zones = []
+        if activity["has_heartrate"]:
+            zones.append(_zone("heartrate", activity["moving_time"], [0, 120, 150, 170, 185, -1]))
+        if activity.get("device_watts"):
+            zones.append(_zone("power", activity["moving_time"], [0, 150, 200, 250, 300, -1]))
+        return zones
+
+
+def _zone(kind: str, seconds: int, bounds: List[int]) -> Dict[str, Any]:
+    buckets = len(bounds) - 1
+    return {
+        "score": 42.0,
+        "distribution_buckets": [
+            {"min": bounds[i], "max": bounds[i + 1], "time": seconds // buckets}
+            for i in range(buckets)
+        ],
+        "type": kind,
+        "resource_state": 3,
+        "sensor_based": True,
+        "points": 12,
+        "custom_zones": False,
+    }
+
+
+def _epoch(iso: str) -> int:
+    return int(datetime.strptime(iso, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp())
+
+
+class RateLimits:
+    """Strava-style 15-minute and daily request windows with optional injected 429s."""
+
+    def __init__(
+        self,
+        short_term_limit: int = 100_000,
+        daily_limit: int = 1_000_000,
+        window_seconds: float = 900.0,
+        fail_every: int = 0,
+    ):
+        """
+        Initialize limits.
+
+        Args:
+            short_term_limit: Requests per window.
+            daily_limit: Requests per day (per server lifetime).
+            window_seconds: Length of the short-term window.
+            fail_every: Answer every Nth request with a 429 (0 disables).
+        """
+        self.short_term_limit = short_term_limit
+        self.daily_limit = daily_limit
+        self.window_seconds = window_seconds
+        self.fail_every = fail_every
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._short_term_usage = 0
+        self._daily_usage = 0
+        self._seen = 0
+
+    def admit(self) -> Tuple[bool, Dict[str, str]]:
+        """
+        Count a request against the windows.
+
+        Returns:
+            (whether it is served, rate limit headers).
+        """
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.window_seconds:
+                self._window_start = now
+                self._short_term_usage = 0
+            self._seen += 1
+            injected = self.fail_every > 0 and self._seen % self.fail_every == 0
+            allowed = (
+                not injected
+                and self._short_term_usage < self.short_term_limit
+                and self._daily_usage < self.daily_limit
+            )
+            if allowed:
+                self._short_term_usage += 1
+                self._daily_usage += 1
+            limit = f"{self.short_term_limit},{self.daily_limit}"
+            usage = f"{self._short_term_usage},{self._daily_usage}"
+        headers = {
+            "X-RateLimit-Limit": limit,
+            "X-RateLimit-Usage": usage,
+            "X-ReadRateLimit-Limit": limit,
+            "X-ReadRateLimit-Usage": usage,
+        }
+        return allowed, headers
+
+
+class FakeStravaServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the synthetic data, limits and request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], data: SyntheticAthletes, limits: RateLimits):
+        """
+        Initialize server.
+
+        Args:
+            address: (host, port) to listen on; port 0 picks a free port.
+            data: Synthetic athletes served.
+            limits: Rate limits applied to API requests.
+        """
+        super().__init__(address, FakeStravaHandler)
+        self.data = data
+        self.limits = limits
+        self.stats: Dict[str, int] = {}
+        self.stats_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Get the base URL of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, kind: str) -> None:
+        """Count a request of a kind."""
+        with self.stats_lock:
+            self.stats[kind] = self.stats.get(kind, 0) + 1
+
+
+class FakeStravaHandler(BaseHTTPRequestHandler):
+    """Request handler of the fake Strava API."""
+
+    server: FakeStravaServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        """Silence per-request logging."""
+
+    def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Serve the OAuth token endpoint."""
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode())
+        if urlsplit(self.path).path != "/oauth/token":
+            self._send(404, {"message": "Not Found"})
+            return
+        self.server.count("token")
+        match = re.fullmatch(r"athlete-(\d+)", (form.get("refresh_token") or [""])[0])
+        if not match or int(match.group(1)) >= self.server.data.athletes:
+            self._send(400, {"message": "Bad Request", "errors": [{"code": "invalid"}]})
+            return
+        expires_at = int(time.time()) + 21600
+        self._send(
+            200,
+            {
+                "token_type": "Bearer",
+                "access_token": f"fake-access-{match.group(1)}",
+                "refresh_token": f"athlete-{match.group(1)}",
+                "expires_at": expires_at,
+                "expires_in": 21600,
+            },
+        )
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Serve the API endpoints."""
+        parts = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        if parts.path == "/_stats":
+            with self.server.stats_lock:
+                self._send(200, dict(self.server.stats))
+            return
+        if not parts.path.startswith(API_PREFIX):
+            self._send(404, {"message": "Not Found"})
+            return
+
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        athlete = self.server.data.athlete_of_token(token)
+        if athlete is None:
+            self._send(401, {"message": "Authorization Error"})
+            return
+
+        allowed, headers = self.server.limits.admit()
+        if not allowed:
+            self.server.count("429")
+            self._send(429, {"message": "Rate Limit Exceeded"}, headers)
+            return
+
+        path = parts.path[len(API_PREFIX) :]
+        data = self.server.data
+        if path == "activities":
+            self.server.count("list")
+            body = data.list_activities(
+                athlete,
+                after=int(query["after"]) if "after" in query else None,
+                before=int(query["before"]) if "before" in query else None,
+                page=int(query.get("page", 1)),
+                per_page=min(200, int(query.get("per_page", 30))),
+            )
+            self._send(200, body, headers)
+            return
+
+        match = re.fullmatch(r"activities/(\d+)(?:/(streams|zones))?", path)
+        activity = data.activity(int(match.group(1))) if match else None
+        if activity is None:
+            self._send(404, {"message": "Not Found"}, headers)
+            return
+        kind = match.group(2) or "detail"  # type: ignore[union-attr]
+        self.server.count(kind)
+        if kind == "streams":
+            body = data.streams(
+                activity,
+                keys=query.get("keys", STREAM_KEYS).split(","),
+                resolution=query.get("resolution"),
+                series_type=query.get("series_type", "distance"),
+                key_by_type=query.get("key_by_type") == "true",
+            )
+        elif kind == "zones":
+            body = data.zones(activity)
+        else:
+            body = data.detail(activity)
+        self._send(200, body, headers)
+
+
+def serve(
+    data: SyntheticAthletes,
+    limits: Optional[RateLimits] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> FakeStravaServer:
+    """
+    Start the fake API in a background thread.
+
+    Args:
+        data: Synthetic athletes to serve.
+        limits: Rate limits. Defaults to limits no benchmark reaches.
+        host: Interface to listen on.
+        port: Port; 0 picks a free port.
+
+    Returns:
+        The running server (stop it with ``shutdown()``).
+    """
+    server = FakeStravaServer((host, port), data, limits or RateLimits())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the synthetic data and rate limit options to a parser."""
+    parser.add_argument("--athletes", type=int, default=1)
+    parser.add_argument("--activities", type=int, default=200, help="Activities per athlete")
+    parser.add_argument("--min-seconds", type=int, default=1800, help="Shortest activity (1 Hz samples)")
+    parser.add_argument("--max-seconds", type=int, default=7200, help="Longest activity (1 Hz samples)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--short-term-limit", type=int, default=100_000)
+    parser.add_argument("--daily-limit", type=int, default=1_000_000)
+    parser.add_argument("--window-seconds", type=float, default=900.0)
+    parser.add_argument("--fail-every", type=int, default=0, help="Inject a 429 every N requests")
+
+
+def from_arguments(args: argparse.Namespace) -> Tuple[SyntheticAthletes, RateLimits]:
+    """Build the synthetic data and rate limits from parsed options."""
+    data = SyntheticAthletes(
+        athletes=args.athletes,
+        activities=args.activities,
+        min_seconds=args.min_seconds,
+        max_seconds=args.max_seconds,
+        seed=args.seed,
+    )
+    limits = RateLimits(
+        short_term_limit=args.short_term_limit,
+        daily_limit=args.daily_limit,
+        window_seconds=args.window_seconds,
+        fail_every=args.fail_every,
+    )
+    return data, limits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    data, limits = from_arguments(args)
+    server = FakeStravaServer((args.host, args.port), data, limits)
+    print(
+        f"Fake Strava API on {server.url}{API_PREFIX} "
+        f"({args.athletes} athlete(s) x {args.activities} activities, "
+        f"token URL {server.url}/oauth/token, refresh tokens athlete-0..)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark schema contract normalization of raw records.
+
+Compares the previous behaviour (walk the contract's columns and build a
+new dict for every record, called once per record) with contracts compiled
+once and applied a page at a time, trimming records in place.
+
+Usage:
+    python benchmarks/normalize_benchmark.py [--rows 100000] [--page-size 200]
+"""
+
+import argparse
+import gc
+import time
+from typing import Any, Callable, List, Mapping
+
+from strava_extract.strava_schema_contract import (
+    SCHEMA_CONTRACTS,
+    TableContract,
+    normalize_page,
+    normalize_record,
+)
+
+# Fields Strava returns that are not in the contracts
+_EXTRA_FIELDS = {"upload_id_str": "1", "external_id": "garmin.fit", "has_kudoed": False}
+
+
+def _legacy_normalize_record(record: Any, contract: TableContract) -> Any:
+    """Per-record normalization walking the column dataclasses (previous behaviour)."""
+    if not isinstance(record, Mapping):
+        return record
+    normalized = {}
+    for column in contract.columns:
+        if column.is_system:
+            continue
+        if column.name in record:
+            normalized[column.name] = record[column.name]
+        else:
+            normalized[column.name] = column.default
+    split = contract.list_split
+    if split is not None and record.get(split.source) is not None:
+        normalized[split.column_for(record)] = record[split.source]
+    return normalized
+
+
+def _records(contract: TableContract, rows: int) -> List[dict]:
+    # Every third record misses a field, so defaults are exercised too
+    names = [column.name for column in contract.columns if not column.is_system]
+    records = []
+    for index in range(rows):
+        record = {name: index for name in names if index % 3 or name != names[-1]}
+        record.update(_EXTRA_FIELDS)
+        records.append(record)
+    return records
+
+
+def _best_of(repeat: int, pages: List[List[dict]], run: Callable[[List[dict]], Any]) -> float:
+    # normalize_page modifies records, so every run gets fresh copies
+    best = float("inf")
+    for _ in range(repeat):
+        fresh = [[dict(record) for record in page] for page in pages]
+        gc.collect()
+        start = time.perf_counter()
+        for page in fresh:
+            run(page)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        default=["activities", "activity_segment_efforts", "activity_streams"],
+        choices=sorted(SCHEMA_CONTRACTS),
+    )
+    args = parser.parse_args()
+
+    print(f"{args.rows} rows per table in pages of {args.page_size}, best of {args.repeat}")
+    for table in args.tables:
+        contract = SCHEMA_CONTRACTS[table]
+        records = _records(contract, args.rows)
+        pages = [
+            records[start : start + args.page_size]
+            for start in range(0, len(records), args.page_size)
+        ]
+        expected = [_legacy_normalize_record(record, contract) for record in records]
+        normalized = [
+            row
+            for page in pages
+            for row in normalize_page([dict(record) for record in page], contract)
+        ]
+        assert normalized == expected
+
+        cases = {
+            "before (per record, column walk)": lambda page: [
+                _legacy_normalize_record(record, contract) for record in page
+            ],
+            "compiled, per record": lambda page: [
+                normalize_record(record, contract) for record in page
+            ],
+            "after (compiled, per page)": lambda page: normalize_page(page, contract),
+        }
+        print(f"{table} ({len(contract.fields)} columns)")
+        for name, run in cases.items():
+            seconds = _best_of(args.repeat, pages, run)
+            print(
+                f"  {name:<35} {seconds * 1000:8.1f} ms  "
+                f"{args.rows / seconds / 1000:8.0f}k rows/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
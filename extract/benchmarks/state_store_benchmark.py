@@ -0,0 +1,74 @@
+"""
+Benchmark per-request overhead of rate limit state persistence.
+
+Compares the previous behaviour (rewrite the state file on every request)
+with batched, atomic flushing.
+
+Usage:
+    python benchmarks/state_store_benchmark.py [--requests 2000] [--dir /path/on/volume]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from strava_extract.client.rate_limit_state import RateLimitStateManager
+
+
+class _LegacyStateManager(RateLimitStateManager):
+    """State manager writing the file in place on every request (previous behaviour)."""
+
+    def save_state(self) -> None:
+        if self._state is None:
+            return
+        with open(self._state_file, "w") as f:
+            json.dump(self._state.to_dict(), f, indent=2)
+
+    def record_request(self) -> None:
+        self.state.total_requests_today += 1
+        self.state.requests_since_last_429 += 1
+        self.state.current_request_retries = 0
+        self.state.current_request_url = None
+        self.save_state()
+
+
+def _run(manager: RateLimitStateManager, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        manager.record_request()
+    manager.flush()
+    return (time.perf_counter() - start) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--dir", default=None, help="Directory for the state files")
+    parser.add_argument("--flush-requests", type=int, default=50)
+    parser.add_argument("--flush-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        cases = {
+            "before (in-place write per request)": _LegacyStateManager(
+                str(Path(tmp) / "legacy.json")
+            ),
+            "atomic write per request": RateLimitStateManager(
+                str(Path(tmp) / "atomic.json"), flush_requests=1
+            ),
+            f"after (batched every {args.flush_requests} requests)": RateLimitStateManager(
+                str(Path(tmp) / "batched.json"),
+                flush_requests=args.flush_requests,
+                flush_seconds=args.flush_seconds,
+            ),
+        }
+        print(f"{args.requests} requests per case, state files in {tmp}")
+        for name, manager in cases.items():
+            per_request = _run(manager, args.requests)
+            print(f"  {name:<45} {per_request * 1e6:10.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark parsing of a full-resolution activity streams response.
+
+Compares response.json() on the whole body (previous behaviour) with
+parse_streams reading the body in chunks, into lists (dict items) and into
+typed array buffers (Arrow items). Reports time, peak memory while parsing
+and the memory the parsed samples keep.
+
+Usage:
+    python benchmarks/stream_parse_benchmark.py [--hours 6] [--repeat 3]
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Iterator, Tuple
+
+from strava_extract.sources.stream_parser import CHUNK_SIZE, parse_streams
+
+_STREAM_TYPES = [
+    "time",
+    "distance",
+    "latlng",
+    "altitude",
+    "velocity_smooth",
+    "heartrate",
+    "cadence",
+    "watts",
+    "temp",
+    "moving",
+    "grade_smooth",
+]
+
+
+def _body(samples: int) -> bytes:
+    streams = []
+    for stream_type in _STREAM_TYPES:
+        if stream_type == "latlng":
+            data: Any = [[45.5 + i * 1e-5, -122.6 - i * 1e-5] for i in range(samples)]
+        elif stream_type == "moving":
+            data = [i % 10 != 0 for i in range(samples)]
+        elif stream_type in ("time", "heartrate", "cadence", "watts", "temp"):
+            data = [i % 200 for i in range(samples)]
+        else:
+            data = [round(i * 1.37, 1) for i in range(samples)]
+        streams.append(
+            {
+                "type": stream_type,
+                "data": data,
+                "series_type": "distance",
+                "original_size": samples,
+                "resolution": "high",
+            }
+        )
+    return json.dumps(streams, separators=(",", ":")).encode()
+
+
+def _chunks(body: bytes) -> Iterator[bytes]:
+    for start in range(0, len(body), CHUNK_SIZE):
+        yield body[start : start + CHUNK_SIZE]
+
+
+def _measure(run: Callable[[], Any], extra: int = 0) -> Tuple[float, int, int]:
+    # Timed without tracemalloc, which slows allocations down
+    gc.collect()
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    result = run()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return seconds, peak + extra, retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hours", type=float, default=6.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    samples = int(args.hours * 3600)
+    body = _body(samples)
+    assert parse_streams(_chunks(body)) == json.loads(body)
+    print(
+        f"{args.hours:g} h at 1 Hz: {samples} samples x {len(_STREAM_TYPES)} streams, "
+        f"{len(body) / 1e6:.1f} MB of JSON, best of {args.repeat}"
+    )
+
+    cases = {
+        # The whole body is held by the response before it is decoded and parsed
+        "before (response.json())": (lambda: json.loads(body.decode("utf-8")), len(body)),
+        "chunked, lists": (lambda: parse_streams(_chunks(body)), 0),
+        "chunked, array buffers": (lambda: parse_streams(_chunks(body), compact=True), 0),
+    }
+    for name, (run, extra) in cases.items():
+        runs = [_measure(run, extra) for _ in range(args.repeat)]
+        seconds = min(seconds for seconds, _, _ in runs)
+        peak = min(peak for _, peak, _ in runs)
+        retained = min(retained for _, _, retained in runs)
+        print(
+            f"  {name:<28} {seconds * 1000:8.1f} ms  peak {peak / 1e6:7.1f} MB  "
+            f"samples {retained / 1e6:7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Local generator of Strava push subscription events.
+
+Sends the subscription validation request and activity create/update/delete
+and athlete deauthorization events for the synthetic activities of
+benchmarks/fake_strava.py to a webhook receiver (python -m strava_extract
+--mode webhook), as Strava would. Events are sent twice with --redeliver,
+like Strava retrying unacknowledged events.
+
+Usage:
+    python benchmarks/webhook_events.py [--url http://127.0.0.1:8080/webhook]
+        [--creates 5] [--updates 2] [--deletes 1] [--deauth] [--redeliver]
+        [--verify-token TOKEN]
+
+Then fetch the queued activities from the fake API with:
+    python -m strava_extract --mode drain
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from fake_strava import SyntheticAthletes, add_arguments, from_arguments
+
+SUBSCRIPTION_ID = 120475
+
+
+def synthetic_events(
+    data: SyntheticAthletes,
+    athlete: int = 0,
+    creates: int = 5,
+    updates: int = 2,
+    deletes: int = 1,
+    deauth: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Build push events for an athlete's synthetic activities.
+
+    The newest ``creates`` activities are created, the newest ``updates`` of
+    them renamed, and the ``deletes`` activities before them deleted.
+
+    Args:
+        data: Synthetic athletes of the fake API.
+        athlete: Athlete the events belong to.
+        creates: Activity create events.
+        updates: Activity update events (title changes).
+        deletes: Activity delete events.
+        deauth: Finish with an athlete deauthorization event.
+
+    Returns:
+        Events in sending order.
+    """
+    activities = data.list_activities(athlete, None, None, page=1, per_page=data.activities)
+    owner_id = activities[0]["athlete"]["id"] if activities else 1000 + athlete
+    created = activities[len(activities) - creates :] if creates else []
+    deleted = activities[max(0, len(activities) - creates - deletes) : len(activities) - creates]
+    now = int(time.time())
+
+    def event(object_type: str, object_id: int, aspect_type: str, **updates: Any) -> Dict[str, Any]:
+        return {
+            "aspect_type": aspect_type,
+            "event_time": now,
+            "object_id": object_id,
+            "object_type": object_type,
+            "owner_id": owner_id,
+            "subscription_id": SUBSCRIPTION_ID,
+            "updates": updates,
+        }
+
+    renamed = created[len(created) - updates :] if updates else []
+    events = [event("activity", activity["id"], "create") for activity in created]
+    events += [
+        event("activity", activity["id"], "update", title=f"{activity['name']} (renamed)")
+        for activity in renamed
+    ]
+    events += [event("activity", activity["id"], "delete") for activity in deleted]
+    if deauth:
+        events.append(event("athlete", owner_id, "update", authorized="false"))
+    return events
+
+
+def validate(url: str, verify_token: str) -> Dict[str, Any]:
+    """Send the subscription validation request and return the response body."""
+    query = urlencode(
+        {"hub.mode": "subscribe", "hub.challenge": "local-challenge", "hub.verify_token": verify_token}
+    )
+    with urlopen(f"{url}?{query}", timeout=5) as response:
+        return json.load(response)
+
+
+def post_event(url: str, event: Dict[str, Any]) -> int:
+    """POST one event and return the response status."""
+    request = Request(
+        url,
+        data=json.dumps(event).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urlopen(request, timeout=5) as response:
+            return response.status
+    except HTTPError as e:
+        return e.code
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(parser)
+    parser.add_argument("--url", default="http://127.0.0.1:8080/webhook", help="Receiver callback URL")
+    parser.add_argument("--athlete", type=int, default=0, help="Athlete the events belong to")
+    parser.add_argument("--creates", type=int, default=5)
+    parser.add_argument("--updates", type=int, default=2)
+    parser.add_argument("--deletes", type=int, default=1)
+    parser.add_argument("--deauth", action="store_true", help="Send an athlete deauthorization")
+    parser.add_argument("--redeliver", action="store_true", help="Send every event twice")
+    parser.add_argument("--verify-token", default=None, help="Validate the subscription first")
+    args = parser.parse_args()
+
+    if args.verify_token is not None:
+        print(f"Validation: {validate(args.url, args.verify_token)}")
+
+    data, _ = from_arguments(args)
+    events = synthetic_events(
+        data, args.athlete, args.creates, args.updates, args.deletes, args.deauth
+    )
+    start = time.perf_counter()
+    statuses: Dict[int, int] = {}
+    for event in events * (2 if args.redeliver else 1):
+        status = post_event(args.url, event)
+        statuses[status] = statuses.get(status, 0) + 1
+    elapsed = time.perf_counter() - start
+    sent = sum(statuses.values())
+    print(
+        f"Sent {sent} events to {args.url} in {elapsed * 1000:.0f} ms "
+        f"({elapsed / max(1, sent) * 1000:.1f} ms each), statuses {statuses}"
+    )
+    for event in events:
+        print(f"  {event['object_type']} {event['object_id']} {event['aspect_type']} {event['updates']}")
+
+
+if __name__ == "__main__":
+    main()
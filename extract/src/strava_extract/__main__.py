@@ -3,6 +3,7 @@
 import argparse
 import sys
 from pathlib import Path
+from typing import Literal, Optional, cast
 
 # Load .env file early
 from dotenv import load_dotenv
@@ -11,7 +12,7 @@ load_dotenv(Path(__file__).parent.parent.parent / ".env")
 
 from .client.rate_limiter import RateLimitExceededError  # noqa: E402
 from .config.settings import get_settings  # noqa: E402
-from .pipeline import run_pipeline  # noqa: E402
+from .pipeline import StravaPipeline, run_pipeline  # noqa: E402
 from .utils.exceptions import StravaExtractError  # noqa: E402
 from .utils.logging import get_logger, setup_logging  # noqa: E402
 from .utils.telemetry import TelemetryConfig, setup_telemetry  # noqa: E402
@@ -38,6 +39,33 @@ Examples:
   # Load specific date range
   python -m strava_extract --start-date 2024-01-01 --end-date 2024-07-01
 
+  # Refetch streams, zones and details of activities already loaded
+  python -m strava_extract --start-date 2024-01-01 --force-refetch
+
+  # Estimate the request cost of a range (only calls the activity list endpoint)
+  python -m strava_extract --mode plan --start-date 2019-01-01
+
+  # Backfill a long range in daily-budget-sized chunks; rerun daily to continue
+  # (runs in the backfill lane, leaving part of every quota window to daily runs)
+  python -m strava_extract --mode backfill --start-date 2019-01-01
+
+  # Run a historical range in the backfill lane
+  python -m strava_extract --start-date 2019-01-01 --end-date 2020-01-01 --lane backfill
+
+  # Refresh kudos, comments, name, gear, ... of the last 30 days' activities
+  # (activity list requests only, no detail/streams/zones)
+  python -m strava_extract --mode refresh
+
+  # Receive Strava webhook events into the local queue, then fetch only the
+  # activities they name (and delete removed ones)
+  python -m strava_extract --mode webhook
+  python -m strava_extract --mode drain
+
+  # Record every API response to an archive, then replay the run offline
+  # (the replay loads into its own <dataset>_replay with fresh incremental state)
+  python -m strava_extract --start-date 2024-01-01 --end-date 2024-07-01 --record .http_archive
+  python -m strava_extract --start-date 2024-01-01 --end-date 2024-07-01 --replay .http_archive
+
   # Override log level
   python -m strava_extract --log-level DEBUG
 
@@ -67,6 +95,48 @@ Examples:
         help="Path to configuration file (overrides STRAVA_CONFIG_PATH env var)",
     )
 
+    parser.add_argument(
+        "--mode",
+        choices=["run", "plan", "backfill", "refresh", "webhook", "drain"],
+        default="run",
+        help=(
+            "run: extract the range; plan: estimate its request cost; "
+            "backfill: extract it in chunks sized to the daily request budget; "
+            "refresh: update mutable activity columns from the list endpoint only; "
+            "webhook: queue Strava push events; drain: fetch the queued activities"
+        ),
+    )
+
+    parser.add_argument(
+        "--lane",
+        choices=["fresh", "backfill"],
+        default=None,
+        help=(
+            "Priority lane sharing the quota (default: backfill for --mode plan/backfill, "
+            "rate_limiting.lane from config otherwise)"
+        ),
+    )
+
+    parser.add_argument(
+        "--force-refetch",
+        action="store_true",
+        help="Refetch child data (streams, zones, details) of activities already loaded",
+    )
+
+    archive_group = parser.add_mutually_exclusive_group()
+    archive_group.add_argument(
+        "--record",
+        metavar="ARCHIVE_DIR",
+        default=None,
+        help="Record every API response to a compressed HTTP archive",
+    )
+    archive_group.add_argument(
+        "--replay",
+        metavar="ARCHIVE_DIR",
+        default=None,
+        help="Serve the run from an HTTP archive (no network, no rate limiter)",
+    )
+
     parser.add_argument(
         "--log-level",
         type=str,
@@ -78,6 +148,40 @@ Examples:
     return parser.parse_args()
 
 
+def _print_plan(start_date: str, end_date: Optional[str], force_refetch: bool) -> int:
+    """
+    Print the estimated request cost of a date range.
+
+    Args:
+        start_date: ISO date string for start of data range.
+        end_date: ISO date string for end of data range.
+        force_refetch: Count child requests of activities already loaded.
+
+    Returns:
+        Exit code.
+    """
+    from .planner import daily_request_budget, plan_range
+
+    known_activities = None
+    if not force_refetch:
+        known_activities = StravaPipeline(start_date, end_date).load_known_activities()
+    plan = plan_range(start_date, end_date, known_activities)
+    daily_budget = daily_request_budget()
+
+    print("\n" + "=" * 80)
+    print(f"Request plan for {plan.start_date} .. {plan.end_date}")
+    print("=" * 80)
+    print(f"Activities:             {len(plan.activities)}")
+    print(f"List requests:          {plan.list_requests}")
+    print(f"Child requests:         {plan.child_requests}")
+    print(f"Total requests:         {plan.total_requests}")
+    print(f"Daily request budget:   {daily_budget}")
+    print(f"Days needed (minimum):  {plan.days_needed(daily_budget)}")
+    print(f"Requests used to plan:  {plan.list_requests}")
+    print("=" * 80 + "\n")
+    return 0
+
+
 def main() -> int:
     """
     Main entry point for CLI.
@@ -95,6 +199,14 @@ def main() -> int:
 
     try:
         settings = get_settings()
+        if args.record or args.replay:
+            # Keep the rest of the configured archive settings (replay_suffix)
+            settings.http_archive.mode = "record" if args.record else "replay"
+            settings.http_archive.path = args.record or args.replay
+        lane = args.lane or ("backfill" if args.mode in ("plan", "backfill") else None)
+        if lane:
+            # argparse restricts --lane to the lanes of the config
+            settings.rate_limiting.lane = cast(Literal["fresh", "backfill"], lane)
         log_level = args.log_level or settings.logging.level
         telemetry_handlers = setup_telemetry(
             TelemetryConfig(
@@ -117,11 +229,77 @@ def main() -> int:
 
         logger = get_logger(__name__)
 
+        if args.mode in ("plan", "backfill") and not args.start_date:
+            print(f"\nERROR: --start-date is required for --mode {args.mode}\n", file=sys.stderr)
+            return 1
+
+        if args.mode == "plan":
+            return _print_plan(args.start_date, args.end_date, args.force_refetch)
+
+        if args.mode == "backfill":
+            from .backfill import BackfillRunner
+
+            logger.info("Starting Strava backfill")
+            load_infos = BackfillRunner(
+                start_date=args.start_date,
+                end_date=args.end_date,
+                force_refetch=args.force_refetch,
+            ).run()
+            print("\n" + "=" * 80)
+            print(f"Backfill completed in {len(load_infos)} chunk(s)!")
+            print("=" * 80 + "\n")
+            return 0
+
+        if args.mode == "refresh":
+            from .refresh import SummaryRefresher
+
+            logger.info("Starting Strava summary refresh")
+            result = SummaryRefresher(start_date=args.start_date, end_date=args.end_date).run()
+            print("\n" + "=" * 80)
+            print(f"Summary refresh of {result.start_date} .. {result.end_date}")
+            print("=" * 80)
+            print(f"Activities listed:      {result.activities}")
+            print(f"Activities updated:     {result.updated}")
+            print(f"List requests:          {result.requests}")
+            print("=" * 80 + "\n")
+            return 0
+
+        if args.mode == "webhook":
+            from .webhooks.receiver import serve_webhooks
+
+            server = serve_webhooks()
+            print(f"\nReceiving Strava webhook events on {server.url} (Ctrl+C to stop)\n")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                logger.info("Webhook receiver stopped")
+            finally:
+                server.server_close()
+                server.queue.close()
+            return 0
+
+        if args.mode == "drain":
+            from .drain import EventDrainer
+
+            logger.info("Starting Strava webhook event drain")
+            drainer = EventDrainer(force_refetch=args.force_refetch)
+            load_infos = drainer.run()
+            print("\n" + "=" * 80)
+            print(
+                f"Drain completed: {len(load_infos)} load(s), "
+                f"{drainer.queue.pending_count()} event(s) pending"
+            )
+            print("=" * 80 + "\n")
+            return 0
+
         logger.info("Starting Strava extraction pipeline")
 
         # Run pipeline
         load_info = run_pipeline(
-            start_date=args.start_date, end_date=args.end_date, configure_logging=False
+            start_date=args.start_date,
+            end_date=args.end_date,
+            configure_logging=False,
+            force_refetch=args.force_refetch,
         )
 
         # Print summary
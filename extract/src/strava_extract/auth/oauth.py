@@ -1,13 +1,17 @@
 """Strava OAuth2 authentication implementation."""
 
 import os
-from typing import Any, Dict
+from typing import Annotated, Any, Dict, Optional
 
-from dlt.common.configuration.specs.base_configuration import configspec
+from dlt.common.configuration.specs.base_configuration import NotResolved, configspec
+from dlt.common.pendulum import pendulum
 from dlt.sources.helpers.rest_client.auth import OAuth2ClientCredentials
 
+from ..client.http_archive import is_replaying
+from ..config.settings import get_settings
 from ..utils.exceptions import AuthenticationError
 from ..utils.logging import get_logger
+from .token_cache import CachedToken, TokenCache, cache_key, create_token_cache
 
 logger = get_logger(__name__)
 
@@ -19,8 +23,86 @@ class StravaOAuth2(OAuth2ClientCredentials):
 
     Extends dlt's OAuth2ClientCredentials to handle Strava's specific
     requirements for token refresh using application/x-www-form-urlencoded.
+
+    With a token cache, a refresh first takes the cache lock and reuses a
+    token another run or task cached while it is valid beyond
+    ``refresh_ahead_seconds``; only otherwise is Strava asked for a new one,
+    which is then cached. Refresh tokens rotated by Strava are kept as well.
     """
 
+    token_cache: Annotated[Optional[TokenCache], NotResolved()] = None
+    token_cache_key: Optional[str] = None
+    refresh_ahead_seconds: int = 0
+
+    def is_token_expired(self) -> bool:
+        """Check whether the token expires within the refresh-ahead margin."""
+        return pendulum.now() >= self.token_expiry.subtract(seconds=self.refresh_ahead_seconds)
+
+    def obtain_token(self) -> None:
+        """
+        Get a valid access token from the cache or by refreshing it.
+
+        Raises:
+            HTTPError: If the token refresh fails.
+        """
+        if self.token_cache is None or self.token_cache_key is None:
+            super().obtain_token()
+            return
+
+        with self.token_cache.lock(self.token_cache_key):
+            cached = self.token_cache.load(self.token_cache_key)
+            if cached is not None:
+                if cached.refresh_token:
+                    self.access_token_request_data["refresh_token"] = cached.refresh_token
+                expiry = pendulum.from_timestamp(cached.expires_at)
+                if pendulum.now() < expiry.subtract(seconds=self.refresh_ahead_seconds):
+                    self.parse_native_representation(cached.access_token)
+                    self.token_expiry = expiry
+                    logger.info(f"Using cached access token valid until {expiry.isoformat()}")
+                    return
+
+            super().obtain_token()
+            logger.info(f"Refreshed access token valid until {self.token_expiry.isoformat()}")
+            self.token_cache.store(
+                self.token_cache_key,
+                CachedToken(
+                    access_token=str(self.access_token),
+                    expires_at=int(self.token_expiry.timestamp()),
+                    refresh_token=self.access_token_request_data.get("refresh_token"),
+                ),
+            )
+
+    def parse_access_token(self, response_json: Any) -> str:
+        """
+        Get the access token from a token response, keeping a rotated refresh token.
+
+        Args:
+            response_json: Token response.
+
+        Returns:
+            Access token.
+        """
+        refresh_token = response_json.get("refresh_token")
+        if refresh_token and refresh_token != self.access_token_request_data.get("refresh_token"):
+            logger.info("Strava issued a new refresh token")
+            self.access_token_request_data["refresh_token"] = refresh_token
+        return super().parse_access_token(response_json)
+
+    def parse_expiration_in_seconds(self, response_json: Any) -> int:
+        """
+        Get the token lifetime, preferring Strava's absolute ``expires_at``.
+
+        Args:
+            response_json: Token response.
+
+        Returns:
+            Seconds until the token expires.
+        """
+        expires_at = response_json.get("expires_at")
+        if expires_at is not None:
+            return max(0, int(expires_at) - int(pendulum.now().timestamp()))
+        return super().parse_expiration_in_seconds(response_json)
+
     def build_access_token_request(self) -> Dict[str, Any]:
         """
         Build the access token request with Strava's required format.
@@ -39,7 +121,7 @@ class StravaOAuth2(OAuth2ClientCredentials):
         }
 
 
-def get_auth() -> StravaOAuth2:
+def get_auth(member: Optional[str] = None) -> StravaOAuth2:
     """
     Factory function to get authenticated Strava OAuth2 instance.
 
@@ -49,26 +131,47 @@ def get_auth() -> StravaOAuth2:
     - CREDENTIALS__REFRESH_TOKEN
     - CREDENTIALS__ACCESS_TOKEN_URL (optional, defaults to Strava's token URL)
 
+    Credential pool members use the same names nested under the member name,
+    e.g. CREDENTIALS__APP2__CLIENT_ID.
+
+    Access tokens are cached as configured in ``auth`` (keyed by client ID
+    and a hash of the refresh token). While replaying the HTTP archive no
+    credentials are needed and no token is ever requested.
+
+    Args:
+        member: Credential pool member name. None for the default credentials.
+
     Returns:
         Configured StravaOAuth2 instance.
 
     Raises:
         AuthenticationError: If credentials are missing or invalid.
     """
+    if is_replaying():
+        auth = StravaOAuth2(
+            access_token="replay",
+            access_token_url="replay://token",
+            client_id=member or "replay",
+            client_secret="replay",
+        )
+        auth.token_expiry = pendulum.now().add(years=1)
+        return auth
+
+    prefix = f"CREDENTIALS__{member.upper()}__" if member else "CREDENTIALS__"
     try:
         # Load credentials from environment variables (dlt naming convention)
-        client_id = os.getenv("CREDENTIALS__CLIENT_ID")
-        client_secret = os.getenv("CREDENTIALS__CLIENT_SECRET")
-        refresh_token = os.getenv("CREDENTIALS__REFRESH_TOKEN")
+        client_id = os.getenv(f"{prefix}CLIENT_ID")
+        client_secret = os.getenv(f"{prefix}CLIENT_SECRET")
+        refresh_token = os.getenv(f"{prefix}REFRESH_TOKEN")
         access_token_url = os.getenv(
-            "CREDENTIALS__ACCESS_TOKEN_URL", "https://www.strava.com/oauth/token"
+            f"{prefix}ACCESS_TOKEN_URL", "https://www.strava.com/oauth/token"
         )
 
         # Validate required credentials
         if not all([client_id, client_secret, refresh_token]):
             raise AuthenticationError(
-                "Missing required credentials. Please ensure CREDENTIALS__CLIENT_ID, "
-                "CREDENTIALS__CLIENT_SECRET, and CREDENTIALS__REFRESH_TOKEN are set in your .env file."
+                f"Missing required credentials. Please ensure {prefix}CLIENT_ID, "
+                f"{prefix}CLIENT_SECRET, and {prefix}REFRESH_TOKEN are set in your .env file."
             )
 
         # Type narrowing assertions
@@ -77,6 +180,7 @@ def get_auth() -> StravaOAuth2:
         assert refresh_token is not None
 
         # Create auth instance
+        auth_config = get_settings().auth
         auth = StravaOAuth2(
             access_token_url=access_token_url,
             client_id=client_id,
@@ -88,9 +192,12 @@ def get_auth() -> StravaOAuth2:
                 "client_secret": client_secret,
             },
             default_token_expiration=21600,  # 6 hours
+            token_cache=create_token_cache(),
+            token_cache_key=cache_key(client_id, refresh_token),
+            refresh_ahead_seconds=auth_config.refresh_ahead_seconds,
         )
 
-        logger.info("Strava OAuth2 authentication initialized")
+        logger.info(f"Strava OAuth2 authentication initialized ({member or 'default'})")
         return auth
 
     except AuthenticationError:
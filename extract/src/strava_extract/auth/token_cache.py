@@ -0,0 +1,251 @@
+"""Access token caches shared across runs and concurrent tasks."""
+
+import abc
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from ..client.rate_limit_state import DEFAULT_STATE_FILE
+from ..config.settings import get_settings
+from ..utils.exceptions import ConfigurationError
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_FILE = ".strava_token_cache.json"
+
+# One in-process lock per cache key; file locks only serialize processes
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def cache_key(client_id: str, refresh_token: str) -> str:
+    """
+    Build the cache key of an application and athlete.
+
+    The configured refresh token identifies the athlete; only a short hash
+    of it is used so the key never reveals the token.
+
+    Args:
+        client_id: Strava API client ID.
+        refresh_token: Configured refresh token.
+
+    Returns:
+        Cache key.
+    """
+    digest = hashlib.sha256(refresh_token.encode()).hexdigest()[:12]
+    return f"{client_id}-{digest}"
+
+
+@dataclass(frozen=True)
+class CachedToken:
+    """Access token issued by Strava, with its expiry as epoch seconds."""
+
+    access_token: str
+    expires_at: int
+    refresh_token: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Convert token to dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CachedToken":
+        """Create token from dictionary."""
+        return cls(
+            access_token=str(data["access_token"]),
+            expires_at=int(data["expires_at"]),
+            refresh_token=data.get("refresh_token"),
+        )
+
+
+class TokenCache(abc.ABC):
+    """
+    Base class for access token caches.
+
+    ``lock`` serializes refreshes of one key across threads and, through a
+    lock file, across processes on the same host, so concurrent tasks
+    waiting on an expired token share a single refresh.
+    """
+
+    def __init__(self, lock_file: str):
+        """
+        Initialize cache.
+
+        Args:
+            lock_file: Path of the file locked around refreshes.
+        """
+        self._lock_file = Path(lock_file)
+
+    @abc.abstractmethod
+    def load(self, key: str) -> Optional[CachedToken]:
+        """Get the cached token of a key, if any."""
+
+    @abc.abstractmethod
+    def store(self, key: str, token: CachedToken) -> None:
+        """Cache the token of a key."""
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        Hold the refresh lock of a key.
+
+        Args:
+            key: Cache key.
+        """
+        with _thread_locks_guard:
+            thread_lock = _thread_locks.setdefault(key, threading.Lock())
+        with thread_lock:
+            self._lock_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._lock_file, "a") as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class FileTokenCache(TokenCache):
+    """
+    Access tokens cached in a JSON file (mode 0600), one entry per key.
+
+    Writes go to a temporary file that atomically replaces the cache file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize cache.
+
+        Args:
+            path: Path to the cache file.
+        """
+        super().__init__(f"{path}.lock")
+        self._path = Path(path)
+
+    def _read(self) -> Dict[str, dict]:
+        if not self._path.exists():
+            return {}
+        try:
+            with open(self._path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read token cache {self._path}: {e}")
+            return {}
+
+    def load(self, key: str) -> Optional[CachedToken]:
+        """Get the cached token of a key, if any."""
+        entry = self._read().get(key)
+        return CachedToken.from_dict(entry) if entry else None
+
+    def store(self, key: str, token: CachedToken) -> None:
+        """Cache the token of a key."""
+        entries = self._read()
+        entries[key] = token.to_dict()
+        try:
+            directory = self._path.parent
+            directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=directory, prefix=f".{self._path.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(entries, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self._path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            logger.debug(f"Saved access token to {self._path}")
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Failed to save token cache: {e}")
+
+
+class AirflowVariableTokenCache(TokenCache):
+    """
+    Access tokens cached in Airflow Variables, one JSON Variable per key.
+
+    Variables are shared by every worker; refreshes are serialized per host
+    through the lock file, and a task that loses a cross-host race simply
+    stores a second valid token.
+    """
+
+    def __init__(self, prefix: str, lock_file: str):
+        """
+        Initialize cache.
+
+        Args:
+            prefix: Variable name prefix.
+            lock_file: Path of the file locked around refreshes.
+
+        Raises:
+            ConfigurationError: If Airflow is not installed.
+        """
+        super().__init__(lock_file)
+        try:
+            from airflow.models import Variable  # type: ignore[import-not-found]
+        except ImportError as e:
+            raise ConfigurationError(
+                "auth.token_cache 'airflow_variable' requires apache-airflow"
+            ) from e
+        self._variable = Variable
+        self._prefix = prefix
+
+    def load(self, key: str) -> Optional[CachedToken]:
+        """Get the cached token of a key, if any."""
+        try:
+            entry = self._variable.get(
+                f"{self._prefix}{key}", default_var=None, deserialize_json=True
+            )
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read token cache variable: {e}")
+            return None
+        return CachedToken.from_dict(entry) if entry else None
+
+    def store(self, key: str, token: CachedToken) -> None:
+        """Cache the token of a key."""
+        try:
+            self._variable.set(f"{self._prefix}{key}", token.to_dict(), serialize_json=True)
+            logger.debug(f"Saved access token to Airflow Variable {self._prefix}{key}")
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Failed to save token cache variable: {e}")
+
+
+def default_cache_file(state_file: Optional[str]) -> str:
+    """
+    Get the default token cache path, next to the rate limit state file.
+
+    Args:
+        state_file: Configured rate limit state file, if any.
+
+    Returns:
+        Token cache path.
+    """
+    return str(Path(state_file or DEFAULT_STATE_FILE).parent / DEFAULT_CACHE_FILE)
+
+
+def create_token_cache() -> Optional[TokenCache]:
+    """
+    Create the token cache configured in ``auth.token_cache``.
+
+    Returns:
+        Token cache, or None if caching is disabled.
+
+    Raises:
+        ConfigurationError: If the Airflow backend is configured without Airflow.
+    """
+    settings = get_settings()
+    config = settings.auth
+    path = config.token_cache_file or default_cache_file(settings.rate_limiting.state_file)
+    if config.token_cache == "file":
+        return FileTokenCache(path)
+    if config.token_cache == "airflow_variable":
+        return AirflowVariableTokenCache(config.airflow_variable_prefix, f"{path}.lock")
+    return None
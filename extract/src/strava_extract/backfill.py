@@ -0,0 +1,235 @@
+"""Chunked multi-day backfill of long date ranges."""
+
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from dlt.common.pipeline import LoadInfo
+
+from .client.pacer import next_daily_reset
+from .client.rate_limiter import RateLimitExceededError
+from .config.settings import get_settings
+from .pipeline import StravaPipeline
+from .planner import daily_request_budget, list_requests_for, plan_range
+from .sources.resume import boundary_before, utc_iso
+from .sources.strava_source import get_credential_pool
+from .utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BACKFILL_STATE_FILE = ".backfill_state.json"
+
+
+@dataclass
+class BackfillState:
+    """Remaining work of a backfill, persisted between quota windows."""
+
+    start_date: str
+    end_date: str
+    page_size: int
+    # [start_date, child_requests] per activity, oldest first
+    activities: List[Tuple[str, int]] = field(default_factory=list)
+    next_index: int = 0
+    chunks_completed: int = 0
+
+    def to_dict(self) -> dict:
+        """Convert state to dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BackfillState":
+        """Create state from dictionary."""
+        state = cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        state.activities = [(start, cost) for start, cost in state.activities]
+        return state
+
+    @property
+    def done(self) -> bool:
+        """Whether every activity of the range has been extracted."""
+        return self.next_index >= len(self.activities)
+
+
+class BackfillRunner:
+    """
+    Extracts a long date range in chunks sized to the daily request budget.
+
+    The range is planned once from the activity list endpoint; each chunk is
+    then extracted and loaded by a regular pipeline run, and the remaining
+    plan is saved after every chunk. When the next chunk does not fit in
+    what is left of today's quota, the runner stops with
+    RateLimitExceededError carrying the next daily reset; running it again
+    with the same range continues from the saved plan.
+
+    Backfills run in the backfill lane of the rate limiter (``--mode
+    backfill``), so their budget excludes the share of the quota left to
+    daily runs of the fresh lane.
+    """
+
+    def __init__(
+        self,
+        start_date: str,
+        end_date: Optional[str] = None,
+        state_file: Optional[str] = None,
+        force_refetch: bool = False,
+    ):
+        """
+        Initialize backfill runner.
+
+        Args:
+            start_date: ISO date string for start of data range.
+            end_date: ISO date string for end of data range. Defaults to now.
+            state_file: Path to backfill state file. Defaults from config.
+            force_refetch: Refetch child data of activities already loaded.
+        """
+        settings = get_settings()
+        self.start_date = start_date
+        self.end_date = end_date
+        self.force_refetch = force_refetch
+        self.daily_budget = daily_request_budget()
+        self._state_file = Path(
+            state_file or settings.backfill.state_file or DEFAULT_BACKFILL_STATE_FILE
+        )
+
+    def _load_state(self) -> Optional[BackfillState]:
+        if not self._state_file.exists():
+            return None
+        with open(self._state_file) as f:
+            state = BackfillState.from_dict(json.load(f))
+        if state.start_date != self.start_date or (
+            self.end_date is not None and state.end_date != self.end_date
+        ):
+            logger.warning(
+                f"Ignoring backfill state for {state.start_date}..{state.end_date}, "
+                f"planning {self.start_date}..{self.end_date} instead"
+            )
+            return None
+        return state
+
+    def _save_state(self, state: BackfillState) -> None:
+        directory = self._state_file.parent
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{self._state_file.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state.to_dict(), f)
+            os.replace(tmp_path, self._state_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _plan(self) -> BackfillState:
+        known_activities = None
+        if not self.force_refetch:
+            known_activities = StravaPipeline(self.start_date, self.end_date).load_known_activities()
+        plan = plan_range(self.start_date, self.end_date, known_activities)
+        logger.info(
+            f"Backfill plan: {len(plan.activities)} activities, {plan.total_requests} requests, "
+            f"at least {plan.days_needed(self.daily_budget)} day(s) at {self.daily_budget}/day"
+        )
+        return BackfillState(
+            start_date=plan.start_date,
+            end_date=plan.end_date,
+            page_size=plan.page_size,
+            activities=[(a.start_date, a.child_requests) for a in plan.activities],
+        )
+
+    def next_chunk(self, state: BackfillState, budget: int) -> Optional[Tuple[str, str, int]]:
+        """
+        Get the largest next chunk whose estimated cost fits a request budget.
+
+        Args:
+            state: Backfill state.
+            budget: Requests available for the chunk.
+
+        Returns:
+            (chunk start, chunk end, index of the first activity after the
+            chunk), or None if not even one activity fits.
+        """
+        activities = state.activities
+        first = state.next_index
+        end = first
+        child_requests = 0
+        while end < len(activities):
+            cost = child_requests + activities[end][1]
+            if cost + list_requests_for(end + 1 - first, state.page_size) > budget:
+                break
+            child_requests = cost
+            end += 1
+        if end == first:
+            return None
+        # Never split activities sharing a start time across chunks
+        while 0 < end < len(activities) and activities[end][0] == activities[end - 1][0]:
+            end += 1
+
+        # Both bounds are exclusive: a chunk ends at the start of the next
+        # chunk's first activity, and the next chunk starts a second before it
+        chunk_start = (
+            utc_iso(state.start_date) if first == 0 else boundary_before(activities[first][0])
+        )
+        chunk_end = (
+            utc_iso(state.end_date) if end == len(activities) else utc_iso(activities[end][0])
+        )
+        return chunk_start, chunk_end, end
+
+    def run(self) -> List[LoadInfo]:
+        """
+        Extract as many chunks as today's quota allows.
+
+        Returns:
+            Load info of every chunk run.
+
+        Raises:
+            RateLimitExceededError: If today's quota is used up before the range is done.
+        """
+        state = self._load_state() or self._plan()
+        self._save_state(state)
+        pool = get_credential_pool()
+
+        load_infos: List[LoadInfo] = []
+        while not state.done:
+            # Child requests are sharded across the credential pool
+            remaining = sum(
+                member.rate_limiter.remaining_daily_requests(self.daily_budget)
+                for member in pool.members
+            )
+            chunk = self.next_chunk(state, remaining)
+            if chunk is None:
+                resume_after = datetime.fromtimestamp(next_daily_reset(time.time()))
+                logger.warning(
+                    f"Backfill paused after {state.chunks_completed} chunk(s): "
+                    f"{len(state.activities) - state.next_index} activities left, "
+                    f"{remaining} requests left today in the {pool.primary.rate_limiter.lane} lane"
+                )
+                raise RateLimitExceededError(
+                    f"Daily request budget used up. Backfill state saved to "
+                    f"{self._state_file}. Resume after {resume_after}",
+                    resume_after=resume_after,
+                )
+
+            chunk_start, chunk_end, next_index = chunk
+            logger.info(
+                f"Backfill chunk {state.chunks_completed + 1}: {chunk_start}..{chunk_end} "
+                f"({next_index - state.next_index} activities, {remaining} requests left today)"
+            )
+            load_infos.append(
+                StravaPipeline(
+                    start_date=chunk_start,
+                    end_date=chunk_end,
+                    force_refetch=self.force_refetch,
+                ).run()
+            )
+
+            state.next_index = next_index
+            state.chunks_completed += 1
+            self._save_state(state)
+
+        logger.info(f"Backfill of {state.start_date}..{state.end_date} complete")
+        self._state_file.unlink(missing_ok=True)
+        return load_infos
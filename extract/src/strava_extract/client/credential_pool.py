@@ -0,0 +1,184 @@
+"""Pool of Strava API applications, each with its own quota and rate limiter."""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from ..auth.oauth import StravaOAuth2, get_auth
+from ..config.settings import get_settings
+from ..utils.exceptions import ConfigurationError
+from ..utils.logging import get_logger
+from .rate_limit_state import DEFAULT_STATE_FILE
+from .rate_limiter import RateLimiter, RateLimitExceededError
+
+logger = get_logger(__name__)
+
+DEFAULT_MEMBER = "default"
+
+
+def member_state_file(member: str) -> str:
+    """
+    Get the rate limit state file of a pool member.
+
+    The member name is inserted before the suffix of the configured state
+    file, e.g. ``.rate_limit_state.app2.json``.
+
+    Args:
+        member: Pool member name.
+
+    Returns:
+        Path to the member's state file.
+    """
+    state_file = Path(get_settings().rate_limiting.state_file or DEFAULT_STATE_FILE)
+    return str(state_file.with_name(f"{state_file.stem}.{member}{state_file.suffix}"))
+
+
+@dataclass(frozen=True)
+class PoolMember:
+    """One Strava API application (client ID and athlete token) of the pool."""
+
+    name: str
+    auth: StravaOAuth2
+    rate_limiter: RateLimiter
+
+
+class CredentialPool:
+    """
+    Strava API applications sharing the extraction load.
+
+    The first member uses the default credentials and rate limiter; it lists
+    activities and serves every top-level resource. Per-activity child
+    requests are sharded across all members by activity ID, so the request
+    throughput grows with the number of applications. Each member has its
+    own quota, so it keeps its own rate limiter and state file; when one
+    member hits its daily limit, its shard fails over to the others.
+    """
+
+    def __init__(self, members: Sequence[PoolMember]):
+        """
+        Initialize pool.
+
+        Args:
+            members: Pool members, the default member first.
+
+        Raises:
+            ConfigurationError: If the pool is empty or member names repeat.
+        """
+        if not members:
+            raise ConfigurationError("Credential pool needs at least one member")
+        names = [member.name for member in members]
+        if len(set(names)) != len(names):
+            raise ConfigurationError(f"Duplicate credential pool members: {names}")
+        self.members: List[PoolMember] = list(members)
+
+    @property
+    def primary(self) -> PoolMember:
+        """Get the member serving top-level resources."""
+        return self.members[0]
+
+    def shard(self, activity_id: int) -> List[PoolMember]:
+        """
+        Get the members to try for an activity, its shard owner first.
+
+        Args:
+            activity_id: Parent activity ID.
+
+        Returns:
+            Members in failover order.
+        """
+        start = activity_id % len(self.members)
+        return self.members[start:] + self.members[:start]
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether every member hit its daily limit."""
+        return all(member.rate_limiter.stopped for member in self.members)
+
+    def stop_error(self) -> Optional[RateLimitExceededError]:
+        """
+        Get the error that stopped the run, if any.
+
+        A run stops when the primary member can no longer list activities
+        or when no member has quota left for child requests.
+
+        Returns:
+            The stop error, or None if the run was not stopped.
+        """
+        if self.primary.rate_limiter.stopped:
+            return self.primary.rate_limiter.stop_error
+        if self.exhausted:
+            return min(
+                (member.rate_limiter.stop_error for member in self.members),
+                key=lambda error: error.resume_after,  # type: ignore[union-attr]
+            )
+        return None
+
+    def check_resume_status(self) -> None:
+        """
+        Check whether the members may send requests.
+
+        Members other than the primary still waiting for their daily reset
+        are left out of this run instead of failing it.
+
+        Raises:
+            RateLimitExceededError: If the primary member must wait for its reset.
+        """
+        self.primary.rate_limiter.check_resume_status()
+        for member in self.members[1:]:
+            try:
+                member.rate_limiter.check_resume_status()
+            except RateLimitExceededError as e:
+                logger.warning(f"Credential pool member '{member.name}' skipped: {e}")
+
+    def usage(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the request usage of every member.
+
+        Returns:
+            Member name -> requests this session, requests today and whether it stopped.
+        """
+        return {
+            member.name: {
+                "requests": member.rate_limiter.total_requests,
+                "requests_today": member.rate_limiter.total_requests_today,
+                "stopped": int(member.rate_limiter.stopped),
+            }
+            for member in self.members
+        }
+
+    def log_usage(self) -> None:
+        """Log the request usage of every member."""
+        for name, usage in self.usage().items():
+            logger.info(
+                f"Credential pool member '{name}': {usage['requests']} requests this run, "
+                f"{usage['requests_today']} today"
+                + (" (daily limit reached)" if usage["stopped"] else "")
+            )
+
+    def flush_state(self) -> None:
+        """Write batched request counts of every member to its state file."""
+        for member in self.members:
+            member.rate_limiter.flush_state()
+
+
+def create_credential_pool(default_rate_limiter: RateLimiter) -> CredentialPool:
+    """
+    Create the credential pool from the default credentials and ``credential_pool.members``.
+
+    Args:
+        default_rate_limiter: Rate limiter of the default credentials.
+
+    Returns:
+        Credential pool.
+
+    Raises:
+        AuthenticationError: If a member's credentials are missing.
+    """
+    members = [PoolMember(DEFAULT_MEMBER, get_auth(), default_rate_limiter)]
+    for name in get_settings().credential_pool.members:
+        members.append(
+            PoolMember(name, get_auth(name), RateLimiter(state_file=member_state_file(name)))
+        )
+    if len(members) > 1:
+        logger.info(f"Credential pool: {', '.join(member.name for member in members)}")
+    return CredentialPool(members)
@@ -0,0 +1,247 @@
+"""Content-addressed archive of Strava API responses for offline record/replay."""
+
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from ..config.settings import get_settings
+from ..utils.exceptions import APIError
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+_http_archive: Optional["HttpArchive"] = None
+
+INDEX_FILE = "index.jsonl"
+OBJECTS_DIR = "objects"
+
+# Response headers kept in the archive; everything else is dropped
+_ARCHIVED_HEADERS = (
+    "Content-Type",
+    "X-RateLimit-Limit",
+    "X-RateLimit-Usage",
+    "X-ReadRateLimit-Limit",
+    "X-ReadRateLimit-Usage",
+)
+
+
+def request_key(method: str, url: str) -> Tuple[str, str]:
+    """
+    Build the archive key of a request.
+
+    The key covers the method, path and sorted query parameters; the host
+    and the Authorization header are left out, so an archive recorded
+    against Strava replays for any base URL and token.
+
+    Args:
+        method: HTTP method.
+        url: Request URL.
+
+    Returns:
+        (key, readable request line).
+    """
+    parts = urlsplit(url)
+    params = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    query = "&".join(f"{name}={value}" for name, value in params)
+    line = f"{method.upper()} {parts.path}" + (f"?{query}" if query else "")
+    return hashlib.sha256(line.encode()).hexdigest(), line
+
+
+class HttpArchive:
+    """
+    Compressed, content-addressed store of request/response pairs.
+
+    Layout of the archive directory:
+
+    - ``objects/<aa>/<sha256>.gz``: gzip-compressed response bodies, named
+      by the SHA-256 of the body, so identical payloads are stored once
+    - ``index.jsonl``: one line per recorded request with its key, request
+      line, status, kept headers and body digest; appended as requests
+      complete, the last line of a key wins
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize archive.
+
+        Args:
+            path: Archive directory.
+        """
+        self.path = Path(path)
+        self._lock = Lock()
+        self._index: Optional[Dict[str, dict]] = None
+        self.recorded = 0
+        self.replayed = 0
+
+    def _object_path(self, digest: str) -> Path:
+        return self.path / OBJECTS_DIR / digest[:2] / f"{digest}.gz"
+
+    def _load_index(self) -> Dict[str, dict]:
+        if self._index is None:
+            index_file = self.path / INDEX_FILE
+            if not index_file.exists():
+                raise APIError(f"HTTP archive not found: {index_file}")
+            index: Dict[str, dict] = {}
+            with open(index_file) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        index[entry["key"]] = entry
+            self._index = index
+            logger.info(f"Loaded HTTP archive {self.path}: {len(index)} requests")
+        return self._index
+
+    def record(self, request: PreparedRequest, response: Response) -> None:
+        """
+        Store a response under its request key.
+
+        Args:
+            request: Sent request.
+            response: Received response (body is read).
+        """
+        key, line = request_key(request.method or "GET", request.url or "")
+        body = response.content or b""
+        digest = hashlib.sha256(body).hexdigest()
+        entry = {
+            "key": key,
+            "request": line,
+            "status": response.status_code,
+            "headers": {
+                name: response.headers[name]
+                for name in _ARCHIVED_HEADERS
+                if name in response.headers
+            },
+            "body": digest,
+        }
+        object_path = self._object_path(digest)
+        with self._lock:
+            if not object_path.exists():
+                object_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = object_path.with_suffix(".tmp")
+                tmp_path.write_bytes(gzip.compress(body, compresslevel=6))
+                os.replace(tmp_path, object_path)
+            with open(self.path / INDEX_FILE, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.recorded += 1
+
+    def replay(self, request: PreparedRequest) -> Response:
+        """
+        Build the archived response of a request.
+
+        Args:
+            request: Request to answer.
+
+        Returns:
+            Archived response.
+
+        Raises:
+            APIError: If the request was not recorded.
+        """
+        key, line = request_key(request.method or "GET", request.url or "")
+        entry = self._load_index().get(key)
+        if entry is None:
+            raise APIError(f"Request not in HTTP archive {self.path}: {line}")
+
+        response = Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = gzip.decompress(self._object_path(entry["body"]).read_bytes())
+        # The body is read: streamed requests iterate over it
+        response._content_consumed = True  # type: ignore[attr-defined]
+        response.encoding = "utf-8"
+        response.url = request.url or ""
+        response.request = request
+        with self._lock:
+            self.replayed += 1
+        return response
+
+    def __getstate__(self):
+        """Get state for pickling."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        """Restore state from pickling."""
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    Transport adapter that archives every response it receives.
+
+    429 and 5xx responses are not archived: they depend on the quota and
+    server state at recording time, and the resent request is recorded.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["archive"]
+
+    def __init__(self, archive: HttpArchive, **kwargs):
+        """
+        Initialize adapter.
+
+        Args:
+            archive: Archive to record into.
+            **kwargs: Arguments for HTTPAdapter.
+        """
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:  # type: ignore[override]
+        """Send a request and archive its response."""
+        response = super().send(request, *args, **kwargs)
+        if response.status_code != 429 and response.status_code < 500:
+            self.archive.record(request, response)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter answering every request from an archive, without network."""
+
+    def __init__(self, archive: HttpArchive):
+        """
+        Initialize adapter.
+
+        Args:
+            archive: Archive to replay from.
+        """
+        super().__init__()
+        self.archive = archive
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:  # type: ignore[override]
+        """Answer a request from the archive."""
+        return self.archive.replay(request)
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def get_http_archive() -> Optional[HttpArchive]:
+    """
+    Get the archive configured in ``http_archive``, shared by all sessions.
+
+    Returns:
+        HttpArchive instance, or None if recording and replay are off.
+    """
+    global _http_archive
+    config = get_settings().http_archive
+    if config.mode == "off":
+        return None
+    if _http_archive is None or _http_archive.path != Path(config.path):
+        _http_archive = HttpArchive(config.path)
+    return _http_archive
+
+
+def is_replaying() -> bool:
+    """Check whether requests are served from the HTTP archive."""
+    return get_settings().http_archive.mode == "replay"
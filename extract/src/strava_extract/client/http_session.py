@@ -0,0 +1,146 @@
+"""Pooled keep-alive HTTP session for Strava API requests."""
+
+from typing import Optional, Tuple
+
+from requests import HTTPError, PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..config.settings import APIConfig, get_settings
+from ..utils.logging import get_logger
+from .http_archive import RecordingAdapter, ReplayAdapter, get_http_archive
+
+logger = get_logger(__name__)
+
+# Transient server errors retried inside the transport adapter
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+# Upper bound on resends after a 429; the rate limiter stops earlier on the daily limit
+_MAX_RATE_LIMIT_RESENDS = 3
+
+
+class StravaSession(Session):
+    """
+    Requests session tuned for the Strava API.
+
+    - One keep-alive connection pool sized for all extraction workers, so
+      connections (and their TLS sessions) are reused instead of re-handshaking
+    - Compressed responses (``Accept-Encoding: gzip, deflate``)
+    - Separate connect and read timeouts on every request
+    - Jittered exponential retries on 5xx responses and connection errors,
+      handled by the transport adapter before response hooks run, so they
+      never reach the 429 handling of the rate limiter
+
+    429 responses are left to the rate limiter's response hook: once it has
+    waited for the window to reset, the hook chain raises an HTTPError and
+    the session sends the request again.
+
+    With ``http_archive.mode`` set, responses are recorded to, or replayed
+    from, the HTTP archive by the transport adapter.
+    """
+
+    def __init__(
+        self,
+        timeout: Tuple[float, float],
+        retry_attempts: int,
+        backoff_factor: float,
+        backoff_jitter: float,
+        pool_maxsize: int,
+    ):
+        """
+        Initialize session.
+
+        Args:
+            timeout: (connect, read) timeout in seconds.
+            retry_attempts: Retries for 5xx responses and connection errors.
+            backoff_factor: Exponential backoff factor between retries.
+            backoff_jitter: Maximum random seconds added to every backoff.
+            pool_maxsize: Connections kept alive per host.
+        """
+        super().__init__()
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retry_attempts,
+            connect=retry_attempts,
+            read=retry_attempts,
+            status=retry_attempts,
+            other=0,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        archive = get_http_archive()
+        adapter: BaseAdapter
+        if archive is not None and get_settings().http_archive.mode == "replay":
+            adapter = ReplayAdapter(archive)
+        elif archive is not None:
+            adapter = RecordingAdapter(
+                archive,
+                pool_connections=1,
+                pool_maxsize=pool_maxsize,
+                max_retries=retry,
+            )
+        else:
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=pool_maxsize,
+                max_retries=retry,
+            )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self.headers.update({"Accept-Encoding": "gzip, deflate"})
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:  # type: ignore[override]
+        """
+        Send a request, resending it after the rate limiter handled a 429.
+
+        Args:
+            request: Prepared request.
+            **kwargs: Arguments for requests.Session.send.
+
+        Returns:
+            The response.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        resends = 0
+        while True:
+            try:
+                return super().send(request, **kwargs)
+            except HTTPError as e:
+                if (
+                    e.response is None
+                    or e.response.status_code != 429
+                    or resends >= _MAX_RATE_LIMIT_RESENDS
+                ):
+                    raise
+                resends += 1
+                logger.info(f"Resending rate-limited request: {request.url}")
+
+
+def create_session(api_config: Optional[APIConfig] = None) -> StravaSession:
+    """
+    Create an HTTP session from the API settings.
+
+    Args:
+        api_config: API settings. Defaults to the loaded configuration.
+
+    Returns:
+        Configured session.
+    """
+    api_config = api_config or get_settings().api
+    session = StravaSession(
+        timeout=(api_config.connect_timeout_seconds, api_config.timeout_seconds),
+        retry_attempts=api_config.retry_attempts,
+        backoff_factor=api_config.retry_backoff_factor,
+        backoff_jitter=api_config.retry_jitter_seconds,
+        pool_maxsize=api_config.pool_maxsize,
+    )
+    logger.debug(
+        f"HTTP session created: pool_maxsize={api_config.pool_maxsize}, "
+        f"timeout={session.timeout}, retries={api_config.retry_attempts}"
+    )
+    return session
@@ -0,0 +1,326 @@
+"""Header-driven request pacing for Strava's fixed quota windows."""
+
+import math
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from threading import Lock
+from typing import Mapping, Optional
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+SHORT_TERM_WINDOW_SECONDS = 15 * 60
+
+# Strava reports "<15-minute>,<daily>" pairs in these headers
+LIMIT_HEADER = "X-RateLimit-Limit"
+USAGE_HEADER = "X-RateLimit-Usage"
+READ_LIMIT_HEADER = "X-ReadRateLimit-Limit"
+READ_USAGE_HEADER = "X-ReadRateLimit-Usage"
+
+
+def next_short_term_reset(now: float) -> float:
+    """
+    Get the epoch time of the next 15-minute window reset.
+
+    Strava's short-term windows reset on the quarter hour (:00/:15/:30/:45).
+
+    Args:
+        now: Current epoch time in seconds.
+
+    Returns:
+        Epoch time of the next quarter-hour boundary.
+    """
+    return (now // SHORT_TERM_WINDOW_SECONDS + 1) * SHORT_TERM_WINDOW_SECONDS
+
+
+def next_daily_reset(now: float) -> float:
+    """
+    Get the epoch time of the next daily window reset (midnight UTC).
+
+    Args:
+        now: Current epoch time in seconds.
+
+    Returns:
+        Epoch time of the next UTC midnight.
+    """
+    today = datetime.fromtimestamp(now, tz=UTC).date()
+    midnight = datetime.combine(today + timedelta(days=1), datetime.min.time(), UTC)
+    return midnight.timestamp()
+
+
+def _parse_pair(value: Optional[str]) -> Optional[tuple[int, int]]:
+    if not value:
+        return None
+    try:
+        short_term, daily = (int(part.strip()) for part in value.split(","))
+    except ValueError:
+        logger.debug(f"Ignoring malformed rate limit header value: {value!r}")
+        return None
+    return short_term, daily
+
+
+@dataclass(frozen=True)
+class RateLimitUsage:
+    """Quota limits and usage reported by one Strava response."""
+
+    short_term_limit: int
+    daily_limit: int
+    short_term_usage: int
+    daily_usage: int
+    read_short_term_limit: Optional[int] = None
+    read_daily_limit: Optional[int] = None
+    read_short_term_usage: Optional[int] = None
+    read_daily_usage: Optional[int] = None
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> Optional[RateLimitUsage]:
+    """
+    Parse Strava's X-RateLimit-* and X-ReadRateLimit-* response headers.
+
+    Args:
+        headers: Response headers (case-insensitive mapping).
+
+    Returns:
+        Parsed usage, or None if the overall quota headers are absent.
+    """
+    limits = _parse_pair(headers.get(LIMIT_HEADER))
+    usage = _parse_pair(headers.get(USAGE_HEADER))
+    if limits is None or usage is None:
+        return None
+
+    read_limits = _parse_pair(headers.get(READ_LIMIT_HEADER))
+    read_usage = _parse_pair(headers.get(READ_USAGE_HEADER))
+    if read_limits is None or read_usage is None:
+        read_limits = read_usage = None
+
+    return RateLimitUsage(
+        short_term_limit=limits[0],
+        daily_limit=limits[1],
+        short_term_usage=usage[0],
+        daily_usage=usage[1],
+        read_short_term_limit=read_limits[0] if read_limits else None,
+        read_daily_limit=read_limits[1] if read_limits else None,
+        read_short_term_usage=read_usage[0] if read_usage else None,
+        read_daily_usage=read_usage[1] if read_usage else None,
+    )
+
+
+class QuotaWindow:
+    """
+    Live token bucket for one fixed Strava quota window.
+
+    The bucket holds the requests still available in the current window.
+    Every granted request takes a token locally, and every response header
+    re-syncs the bucket with the usage Strava actually counted (which
+    includes requests made by other processes sharing the application).
+    The bucket refills completely when the window resets.
+    """
+
+    def __init__(self, name: str, limit: int, daily: bool = False):
+        """
+        Initialize quota window.
+
+        Args:
+            name: Window name (for logging).
+            limit: Requests allowed per window until headers say otherwise.
+            daily: True for the daily window, False for the 15-minute window.
+        """
+        self.name = name
+        self.limit = limit
+        self.daily = daily
+        self.usage = 0
+        self.reset_at = 0.0  # Set on first roll()
+
+    def _next_reset(self, now: float) -> float:
+        return next_daily_reset(now) if self.daily else next_short_term_reset(now)
+
+    def roll(self, now: float) -> None:
+        """Refill the bucket if the window has reset since the last request."""
+        if now >= self.reset_at:
+            self.usage = 0
+            self.reset_at = self._next_reset(now)
+
+    def sync(self, limit: int, usage: int, now: float) -> None:
+        """
+        Re-sync the bucket with limits and usage reported by Strava.
+
+        Usage only grows within a window, so a lower count comes from a
+        response sent before slots granted since: it is kept from
+        handing those slots out again.
+        """
+        self.roll(now)
+        self.limit = limit
+        self.usage = max(self.usage, usage)
+
+    def take(self) -> None:
+        """Consume one token for a granted request."""
+        self.usage += 1
+
+    def available(self, reserve: int) -> int:
+        """Get the number of requests that may still be sent in this window."""
+        return self.limit - self.usage - reserve
+
+
+@dataclass(frozen=True)
+class PacingDecision:
+    """Outcome of asking the pacer for the next request slot."""
+
+    delay_seconds: float
+    window: Optional[str] = None
+    daily_exhausted: bool = False
+    resume_at: Optional[float] = None
+
+
+class RequestPacer:
+    """
+    Proactive request pacer driven by Strava's rate limit headers.
+
+    Tracks the overall and read quotas for both the 15-minute and the daily
+    window. Requests flow freely while a 15-minute window has headroom; once
+    less than ``spread_threshold`` of it is left, the remaining requests are
+    spaced evenly until the window resets, and when only ``reserve`` requests
+    are left the pacer waits for the reset instead of provoking a 429.
+    An exhausted daily window is reported back so the caller can stop.
+
+    A pacer of a low priority lane also leaves ``held_back`` (a fraction of
+    every window's limit) unused for the higher priority lane sharing the
+    quota: it waits for the 15-minute reset, and reports the daily window
+    exhausted, as soon as only that share is left.
+    """
+
+    def __init__(
+        self,
+        short_term_limit: int,
+        daily_limit: int,
+        read_short_term_limit: int,
+        read_daily_limit: int,
+        reserve: int = 2,
+        spread_threshold: float = 0.25,
+        held_back: float = 0.0,
+    ):
+        """
+        Initialize request pacer.
+
+        Args:
+            short_term_limit: Overall requests per 15 minutes.
+            daily_limit: Overall requests per day.
+            read_short_term_limit: Read requests per 15 minutes.
+            read_daily_limit: Read requests per day.
+            reserve: Requests left unused in every window as a safety margin.
+            spread_threshold: Fraction of a 15-minute window below which
+                requests are spaced out evenly until the reset.
+            held_back: Fraction of every window left to higher priority lanes.
+        """
+        self.reserve = reserve
+        self.spread_threshold = spread_threshold
+        self.held_back = held_back
+        self.short_term = QuotaWindow("15-minute", short_term_limit)
+        self.daily = QuotaWindow("daily", daily_limit, daily=True)
+        self.read_short_term = QuotaWindow("read 15-minute", read_short_term_limit)
+        self.read_daily = QuotaWindow("read daily", read_daily_limit, daily=True)
+        self._next_slot = 0.0
+        self._lock = Lock()
+
+    @property
+    def windows(self) -> tuple[QuotaWindow, ...]:
+        """All tracked quota windows."""
+        return (self.short_term, self.daily, self.read_short_term, self.read_daily)
+
+    def window_reserve(self, window: QuotaWindow) -> int:
+        """Get the requests of a window this pacer leaves unused."""
+        return self.reserve + math.ceil(window.limit * self.held_back)
+
+    def available(self, window: QuotaWindow) -> int:
+        """Get the requests this pacer may still send in a window."""
+        return window.available(self.window_reserve(window))
+
+    def update(self, usage: RateLimitUsage, now: Optional[float] = None) -> None:
+        """
+        Sync the buckets with usage reported by a response.
+
+        Args:
+            usage: Parsed rate limit headers.
+            now: Current epoch time. Defaults to time.time().
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self.short_term.sync(usage.short_term_limit, usage.short_term_usage, now)
+            self.daily.sync(usage.daily_limit, usage.daily_usage, now)
+            if usage.read_short_term_limit is not None:
+                self.read_short_term.sync(
+                    usage.read_short_term_limit, usage.read_short_term_usage or 0, now
+                )
+            if usage.read_daily_limit is not None:
+                self.read_daily.sync(usage.read_daily_limit, usage.read_daily_usage or 0, now)
+
+    def reserve_slot(self, now: Optional[float] = None) -> PacingDecision:
+        """
+        Reserve the next request slot.
+
+        Consumes one token from every window and returns how long the caller
+        must wait before sending the request. Concurrent callers are handed
+        consecutive slots.
+
+        Args:
+            now: Current epoch time. Defaults to time.time().
+
+        Returns:
+            Pacing decision with the delay to honour.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            for window in self.windows:
+                window.roll(now)
+
+            for window in (self.daily, self.read_daily):
+                if self.available(window) <= 0:
+                    return PacingDecision(
+                        delay_seconds=0.0,
+                        window=window.name,
+                        daily_exhausted=True,
+                        resume_at=window.reset_at,
+                    )
+
+            short_term_windows = (self.short_term, self.read_short_term)
+            slot = max(now, self._next_slot)
+            limiting_window: Optional[str] = None
+            for window in short_term_windows:
+                if slot < window.reset_at and self.available(window) <= 0:
+                    # Window exhausted: the slot moves to the reset instant
+                    slot = window.reset_at
+                    limiting_window = window.name
+
+            interval = 0.0
+            for window in short_term_windows:
+                if slot < window.reset_at:
+                    available = self.available(window)
+                    seconds_left = window.reset_at - slot
+                else:
+                    # Slot falls into a later window that starts with a full bucket
+                    available = window.limit - self.window_reserve(window)
+                    seconds_left = next_short_term_reset(slot) - slot
+                if available <= window.limit * self.spread_threshold:
+                    spacing = seconds_left / max(available, 1)
+                    if spacing > interval:
+                        interval = spacing
+                        limiting_window = window.name
+
+            for window in self.windows:
+                if slot < window.reset_at:
+                    window.take()
+            self._next_slot = slot + interval
+
+        return PacingDecision(delay_seconds=slot - now, window=limiting_window)
+
+    def __getstate__(self):
+        """Get state for pickling."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        """Restore state from pickling."""
+        self.__dict__.update(state)
+        self._lock = Lock()
@@ -1,11 +1,12 @@
 """Custom pagination for Strava API resources."""
 
-from typing import Optional
+from typing import Any, List, Optional
 
-from dlt.sources.helpers.requests import Request
+from dlt.sources.helpers.requests import Request, Response
 from dlt.sources.helpers.rest_client.paginators import PageNumberPaginator
 
 from ..utils.logging import get_logger
+from .rate_limiter import RateLimiter
 
 logger = get_logger(__name__)
 
@@ -15,7 +16,9 @@ class StravaPagePaginator(PageNumberPaginator):
     Page number paginator for Strava API resources.
 
     Extends dlt's PageNumberPaginator with request tracking for logging.
-    Rate limiting is handled reactively via response handlers, not here.
+    Rate limiting is handled reactively via response handlers, not here;
+    the paginator only stops requesting pages once the rate limiter hit the
+    daily limit, so the pages already fetched are still loaded.
     """
 
     def __init__(
@@ -24,6 +27,7 @@ class StravaPagePaginator(PageNumberPaginator):
         base_page: int = 1,
         total_path: Optional[str] = None,
         maximum_page: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
         **kwargs,
     ):
         """
@@ -34,6 +38,7 @@ class StravaPagePaginator(PageNumberPaginator):
             base_page: Starting page number.
             total_path: JSON path to total pages (if available).
             maximum_page: Maximum page to fetch (if known).
+            rate_limiter: Rate limiter whose daily limit stop ends pagination.
             **kwargs: Additional arguments for PageNumberPaginator.
         """
         super().__init__(
@@ -43,10 +48,28 @@ class StravaPagePaginator(PageNumberPaginator):
             **kwargs,
         )
         self.resource_name = resource_name
+        self._rate_limiter = rate_limiter
+        self.stopped_by_rate_limit = False
         self._resource_requests = 0
 
         logger.debug(f"Paginator initialized for resource: {resource_name}")
 
+    def update_state(self, response: Response, data: Optional[List[Any]] = None) -> None:
+        """
+        Update pagination state from a response.
+
+        Args:
+            response: The response of the last page.
+            data: Records of the last page.
+        """
+        super().update_state(response, data)
+        if self._has_next_page and self._rate_limiter is not None and self._rate_limiter.stopped:
+            logger.warning(
+                f"Resource '{self.resource_name}' stops paginating: daily rate limit reached"
+            )
+            self._has_next_page = False
+            self.stopped_by_rate_limit = True
+
     def update_request(self, request: Request) -> None:
         """
         Update request with pagination parameters.
@@ -1,6 +1,11 @@
 """Rate limit state persistence for resumable rate limiting."""
 
+import atexit
 import json
+import os
+import tempfile
+import time
+import weakref
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -46,15 +51,42 @@ class RateLimitState:
         return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
 
 
+def _flush_at_exit(manager_ref: "weakref.ref[RateLimitStateManager]") -> None:
+    manager = manager_ref()
+    if manager is not None:
+        manager.flush()
+
+
 class RateLimitStateManager:
-    """Manages persistence of rate limit state."""
+    """
+    Manages persistence of rate limit state.
+
+    Successful requests only update the in-memory state; it is written out
+    every ``flush_requests`` requests or ``flush_seconds`` seconds, whichever
+    comes first. 429s, resume times and pipeline state are written
+    immediately, and pending updates are flushed at interpreter exit.
+    Every write goes to a temporary file that atomically replaces the state
+    file, so a crash mid-write never leaves a truncated file behind.
 
-    def __init__(self, state_file: Optional[str] = None):
+    With ``persist=False`` the state lives in memory only: the state file is
+    neither read nor written.
+    """
+
+    def __init__(
+        self,
+        state_file: Optional[str] = None,
+        flush_requests: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+        persist: bool = True,
+    ):
         """
         Initialize state manager.
 
         Args:
             state_file: Path to state file. Defaults from config or .rate_limit_state.json
+            flush_requests: Successful requests batched per write. Defaults from config.
+            flush_seconds: Maximum age of unwritten updates. Defaults from config.
+            persist: Read and write the state file; False keeps the state in memory.
         """
         settings = get_settings()
         if state_file:
@@ -64,7 +96,22 @@ class RateLimitStateManager:
         else:
             self._state_file = Path(DEFAULT_STATE_FILE)
 
+        self._flush_requests = max(
+            1,
+            flush_requests
+            if flush_requests is not None
+            else settings.rate_limiting.state_flush_requests,
+        )
+        self._flush_seconds = (
+            flush_seconds if flush_seconds is not None else settings.rate_limiting.state_flush_seconds
+        )
+
+        self._persist = persist
         self._state: Optional[RateLimitState] = None
+        self._pending_requests = 0
+        self._last_flush = time.monotonic()
+        if persist:
+            atexit.register(_flush_at_exit, weakref.ref(self))
         logger.debug(f"State manager initialized with file: {self._state_file}")
 
     @property
@@ -76,7 +123,7 @@ class RateLimitStateManager:
 
     def _load_state(self) -> RateLimitState:
         """Load state from file or create new state."""
-        if self._state_file.exists():
+        if self._persist and self._state_file.exists():
             try:
                 with open(self._state_file) as f:
                     data = json.load(f)
@@ -98,24 +145,51 @@ class RateLimitStateManager:
         return RateLimitState(day_start=datetime.now().isoformat())
 
     def save_state(self) -> None:
-        """Save current state to file."""
+        """Atomically save current state to file."""
         if self._state is None:
             return
 
+        self._pending_requests = 0
+        self._last_flush = time.monotonic()
+        if not self._persist:
+            return
         try:
-            with open(self._state_file, "w") as f:
-                json.dump(self._state.to_dict(), f, indent=2)
+            directory = self._state_file.parent
+            directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=directory, prefix=f".{self._state_file.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(self._state.to_dict(), f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self._state_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
             logger.debug(f"Saved rate limit state to {self._state_file}")
         except Exception as e:
             logger.error(f"Failed to save state file: {e}")
 
+    def flush(self) -> None:
+        """Write pending request updates to file, if any."""
+        if self._pending_requests:
+            self.save_state()
+
     def record_request(self) -> None:
-        """Record a successful request."""
+        """Record a successful request, writing the state once a batch is full."""
         self.state.total_requests_today += 1
         self.state.requests_since_last_429 += 1
         self.state.current_request_retries = 0
         self.state.current_request_url = None
-        self.save_state()
+
+        self._pending_requests += 1
+        if (
+            self._pending_requests >= self._flush_requests
+            or time.monotonic() - self._last_flush >= self._flush_seconds
+        ):
+            self.save_state()
 
     def record_429(self, request_url: str) -> None:
         """
@@ -179,6 +253,16 @@ class RateLimitStateManager:
             f"resource={last_resource}"
         )
 
+    def clear_pipeline_state(self, key: str) -> None:
+        """
+        Remove one entry of the preserved pipeline state.
+
+        Args:
+            key: Pipeline state entry to remove.
+        """
+        if self.state.pipeline_state.pop(key, None) is not None:
+            self.save_state()
+
     def get_resume_info(self) -> Optional[dict]:
         """
         Get information needed to resume pipeline.
@@ -222,3 +306,4 @@ class RateLimitStateManager:
             self._state_file.unlink()
             logger.info(f"Deleted state file: {self._state_file}")
         self._state = None
+        self._pending_requests = 0
@@ -1,20 +1,54 @@
-"""Reactive rate limiter for Strava API requests."""
+"""Reactive and header-paced rate limiter for Strava API requests."""
 
 import sys
 import time
 from datetime import datetime, timedelta
-from threading import Lock
-from typing import Optional
+from pathlib import Path
+from threading import Event, Lock
+from typing import Mapping, Optional
 
+from opentelemetry import trace
 from tqdm import tqdm  # type: ignore[import-untyped]
 
 from ..config.settings import get_settings
 from ..utils.exceptions import RateLimitError
 from ..utils.logging import get_logger
-from .rate_limit_state import RateLimitStateManager
+from .http_archive import is_replaying
+from .pacer import (
+    RequestPacer,
+    next_daily_reset,
+    next_short_term_reset,
+    parse_rate_limit_headers,
+)
+from .rate_limit_state import DEFAULT_STATE_FILE, RateLimitStateManager
 
 logger = get_logger(__name__)
 
+# How often the progress bar is redrawn while waiting
+_PROGRESS_REFRESH_SECONDS = 10
+
+
+def lane_state_file(state_file: Optional[str] = None) -> Optional[str]:
+    """
+    Get the rate limit state file of the configured priority lane.
+
+    The fresh lane uses the state file as is. The backfill lane inserts its
+    name before the suffix (e.g. ``.rate_limit_state.backfill.json``), so its
+    request counts, resume time and resume progress never hold back a fresh
+    run.
+
+    Args:
+        state_file: State file of the credentials. Defaults from config.
+
+    Returns:
+        Path to the lane's state file, or None for the default state file.
+    """
+    rate_config = get_settings().rate_limiting
+    if rate_config.lane == "fresh":
+        return state_file
+    path = Path(state_file or rate_config.state_file or DEFAULT_STATE_FILE)
+    return str(path.with_name(f"{path.stem}.{rate_config.lane}{path.suffix}"))
+
 
 class RateLimitExceededError(RateLimitError):
     """Raised when daily rate limit is exceeded and pipeline should stop."""
@@ -26,15 +60,30 @@ class RateLimitExceededError(RateLimitError):
 
 class RateLimiter:
     """
-    Reactive rate limiter for Strava API requests.
+    Rate limiter for Strava API requests.
 
-    Only sleeps when a 429 response is encountered:
-    - First 429: Sleep for 15 minutes (short-term limit)
+    Always handles 429 responses reactively:
+    - First 429: Sleep until the next quarter-hour window reset (short-term limit)
     - Second 429 on same request: Save state and wait 24 hours (daily limit)
 
+    Concurrent 429s of one window share a single wait, and interrupt() wakes
+    every thread waiting for a window (pacing or a 429) at once.
+
+    In ``paced`` mode it additionally reads the X-RateLimit-* headers of every
+    response and spaces requests out so the 15-minute windows are never
+    exceeded, stopping the pipeline before the daily window runs out.
+
     Strava rate limits:
     - 100 requests per 15 minutes
     - 1000 requests per day
+
+    Processes sharing the quota run in priority lanes (``lane``): the fresh
+    lane may use every window in full, while the backfill lane leaves
+    ``fresh_lane_share`` of every window to it, waiting for the 15-minute
+    reset and stopping for the day as soon as only that share is left.
+
+    While replaying the HTTP archive no quota is spent, so the limiter is
+    disabled: it neither paces nor reads or writes its state file.
     """
 
     def __init__(
@@ -52,7 +101,12 @@ class RateLimiter:
         settings = get_settings()
         rate_config = settings.rate_limiting
 
+        self.mode = rate_config.mode
+        self.lane = rate_config.lane
+        self.held_back = rate_config.fresh_lane_share if self.lane == "backfill" else 0.0
+        self.enabled = not is_replaying()
         self.short_term_sleep_minutes = rate_config.short_term_sleep_minutes
+        self.reset_buffer_seconds = rate_config.short_term_reset_buffer_seconds
         self.daily_sleep_hours = rate_config.daily_sleep_hours
         self.max_retries_before_daily = rate_config.max_retries_before_daily_wait
         self.show_progress = (
@@ -61,12 +115,33 @@ class RateLimiter:
             else rate_config.show_progress_bar
         )
 
-        self._state_manager = RateLimitStateManager(state_file)
+        self._pacer: Optional[RequestPacer] = None
+        if self.mode == "paced" and self.enabled:
+            self._pacer = RequestPacer(
+                short_term_limit=rate_config.short_term_limit,
+                daily_limit=rate_config.daily_limit,
+                read_short_term_limit=rate_config.read_short_term_limit,
+                read_daily_limit=rate_config.read_daily_limit,
+                reserve=rate_config.pacing_reserve,
+                spread_threshold=rate_config.pacing_spread_threshold,
+                held_back=self.held_back,
+            )
+
+        self._state_manager = RateLimitStateManager(
+            lane_state_file(state_file), persist=self.enabled
+        )
         self._lock = Lock()
+        self._wake = Event()
         self._total_requests = 0
+        self._short_term_resume_at = 0.0  # Shared end of the current 429 wait
+        self._stop_error: Optional[RateLimitExceededError] = None
 
+        if not self.enabled:
+            logger.info("Rate limiter disabled while replaying the HTTP archive")
+            return
         logger.info(
-            f"Reactive rate limiter initialized: "
+            f"Rate limiter initialized (mode={self.mode}, lane={self.lane}, "
+            f"held back={self.held_back:.0%}): "
             f"15-min sleep={self.short_term_sleep_minutes}min, "
             f"daily sleep={self.daily_sleep_hours}h"
         )
@@ -78,6 +153,8 @@ class RateLimiter:
         Raises:
             RateLimitExceededError: If daily limit was hit and resume time not reached
         """
+        if not self.enabled:
+            return
         should_wait, resume_time = self._state_manager.should_wait_for_resume()
         if should_wait and resume_time:
             wait_seconds = (resume_time - datetime.now()).total_seconds()
@@ -86,12 +163,14 @@ class RateLimiter:
                     f"Daily rate limit was previously hit. "
                     f"Resume time: {resume_time.isoformat()}"
                 )
-                raise RateLimitExceededError(
+                self._stop_error = RateLimitExceededError(
                     f"Daily rate limit reached. Resume after {resume_time}",
                     resume_after=resume_time,
                 )
+                raise self._stop_error
         # Clear resume time if we're past it
         self._state_manager.clear_resume_time()
+        self._stop_error = None
 
     def record_success(self, request_url: Optional[str] = None) -> None:
         """
@@ -102,14 +181,89 @@ class RateLimiter:
         """
         with self._lock:
             self._total_requests += 1
-            self._state_manager.record_request()
+            if self.enabled:
+                self._state_manager.record_request()
             logger.debug(f"Request succeeded (total: {self._total_requests})")
 
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Sync the pacer with the quota usage reported by a response.
+
+        No-op in reactive mode or when the response carries no rate limit headers.
+
+        Args:
+            headers: Response headers.
+        """
+        if self._pacer is None:
+            return
+        usage = parse_rate_limit_headers(headers)
+        if usage is not None:
+            self._pacer.update(usage)
+            logger.debug(
+                f"Rate limit usage: 15-min {usage.short_term_usage}/{usage.short_term_limit}, "
+                f"daily {usage.daily_usage}/{usage.daily_limit}"
+            )
+
+    def pace(self, last_resource: Optional[str] = None) -> None:
+        """
+        Wait until the next request may be sent without exceeding the quota.
+
+        No-op in reactive mode.
+
+        Args:
+            last_resource: Name of the resource being processed
+
+        Raises:
+            RateLimitExceededError: If the daily quota is exhausted
+        """
+        if self._pacer is None:
+            return
+        self.raise_if_stopped()
+
+        decision = self._pacer.reserve_slot()
+        if decision.daily_exhausted:
+            assert decision.resume_at is not None
+            if self.held_back:
+                logger.warning(
+                    f"{self.lane.capitalize()} lane used its share of the {decision.window} "
+                    f"window; the remaining {self.held_back:.0%} is left to the fresh lane"
+                )
+            with self._lock:
+                self._handle_daily_limit(
+                    last_resource=last_resource,
+                    resume_time=datetime.fromtimestamp(decision.resume_at),
+                )
+
+        if decision.delay_seconds <= 0:
+            return
+
+        if decision.delay_seconds >= 60:
+            logger.info(
+                f"Pacing requests: waiting {decision.delay_seconds:.0f}s "
+                f"for the {decision.window} window"
+                + (
+                    f" ({self.lane} lane, {self.held_back:.0%} left to the fresh lane)"
+                    if self.held_back
+                    else ""
+                )
+            )
+        else:
+            logger.debug(
+                f"Pacing requests: waiting {decision.delay_seconds:.2f}s "
+                f"for the {decision.window} window"
+            )
+        self._wait(decision.delay_seconds)
+
+    def interrupt(self) -> None:
+        """Wake up every thread currently waiting for a rate limit window."""
+        self._wake.set()
+
     def handle_429(
         self,
         request_url: str,
         last_activity_id: Optional[int] = None,
         last_resource: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
     ) -> bool:
         """
         Handle a 429 rate limit response.
@@ -118,6 +272,7 @@ class RateLimiter:
             request_url: URL of the rate-limited request
             last_activity_id: Last successfully processed activity ID
             last_resource: Name of the resource being processed
+            headers: Headers of the 429 response, used to tell which window ran out
 
         Returns:
             True if request should be retried after sleeping
@@ -126,6 +281,8 @@ class RateLimiter:
         Raises:
             RateLimitExceededError: If daily limit exceeded and should stop
         """
+        self.raise_if_stopped()
+        received_at = time.time()
         with self._lock:
             self._state_manager.record_429(request_url)
             retry_count = self._state_manager.state.current_request_retries
@@ -135,40 +292,119 @@ class RateLimiter:
                 f"for: {request_url}"
             )
 
-            if retry_count > self.max_retries_before_daily:
+            usage = parse_rate_limit_headers(headers) if headers else None
+            daily_exhausted = usage is not None and (
+                usage.daily_usage >= usage.daily_limit
+                or (
+                    usage.read_daily_limit is not None
+                    and (usage.read_daily_usage or 0) >= usage.read_daily_limit
+                )
+            )
+
+            if daily_exhausted:
+                # Headers say the daily window ran out - no point waiting 15 minutes
+                return self._handle_daily_limit(
+                    last_activity_id=last_activity_id,
+                    last_resource=last_resource,
+                    resume_time=datetime.fromtimestamp(next_daily_reset(time.time())),
+                )
+            elif retry_count > self.max_retries_before_daily:
                 # Likely hit daily limit - save state and schedule resume
                 return self._handle_daily_limit(
                     last_activity_id=last_activity_id,
                     last_resource=last_resource,
                 )
-            else:
-                # First 429 - wait 15 minutes
-                self._sleep_for_short_term_limit()
-                return True
+            # First 429 - wait for the 15-minute window to reset. Concurrent 429s
+            # of the same window share one reset time.
+            if self._short_term_resume_at <= received_at:
+                self._short_term_resume_at = received_at + self._short_term_wait_seconds(
+                    received_at
+                )
+            resume_at = self._short_term_resume_at
+
+        self._sleep_for_short_term_limit(resume_at)
+        return True
+
+    def _short_term_wait_seconds(self, now: float) -> float:
+        """
+        Get the number of seconds until the 15-minute window has reset.
+
+        Args:
+            now: Current epoch time.
 
-    def _sleep_for_short_term_limit(self) -> None:
-        """Sleep for 15 minutes due to short-term rate limit."""
-        sleep_seconds = self.short_term_sleep_minutes * 60
+        Returns:
+            Seconds until the next quarter-hour boundary plus the reset buffer,
+            capped at short_term_sleep_minutes.
+        """
+        wait_seconds = next_short_term_reset(now) - now + self.reset_buffer_seconds
+        return min(wait_seconds, self.short_term_sleep_minutes * 60)
+
+    def _sleep_for_short_term_limit(self, resume_at: float) -> None:
+        """
+        Sleep until the 15-minute window resets due to short-term rate limit.
+
+        Args:
+            resume_at: Epoch time the window has reset (plus the reset buffer).
+        """
+        now = time.time()
+        sleep_seconds = resume_at - now
+        if sleep_seconds <= 0:
+            logger.info("Short-term rate limit window already reset, retrying")
+            return
+        fixed_sleep_seconds = self.short_term_sleep_minutes * 60
+        idle_seconds_saved = max(fixed_sleep_seconds - sleep_seconds, 0.0)
+        reset_at = datetime.fromtimestamp(resume_at)
 
         logger.warning(
             f"Short-term rate limit hit (100 req/15min). "
-            f"Sleeping for {self.short_term_sleep_minutes} minutes..."
+            f"Sleeping {sleep_seconds:.0f}s until window reset at {reset_at.isoformat()} "
+            f"({idle_seconds_saved:.0f}s shorter than a fixed "
+            f"{self.short_term_sleep_minutes} min sleep)..."
         )
 
-        if self.show_progress:
-            self._sleep_with_progress(
-                sleep_seconds,
-                f"Rate limited - waiting {self.short_term_sleep_minutes} min",
-            )
-        else:
-            time.sleep(sleep_seconds)
+        tracer = trace.get_tracer(__name__)
+        with tracer.start_as_current_span("strava.rate_limit.short_term_wait") as span:
+            span.set_attribute("strava.rate_limit.wait_seconds", sleep_seconds)
+            span.set_attribute("strava.rate_limit.idle_seconds_saved", idle_seconds_saved)
+            span.set_attribute("strava.rate_limit.reset_at", reset_at.isoformat())
+
+            if self.show_progress:
+                self._sleep_with_progress(
+                    sleep_seconds,
+                    f"Rate limited - waiting {sleep_seconds / 60:.1f} min for window reset",
+                )
+            else:
+                self._wait(sleep_seconds)
 
         logger.info("Waking up from short-term rate limit sleep")
 
+    def _wait(self, seconds: float, clear: bool = True) -> bool:
+        """
+        Wait for the given number of seconds unless interrupted.
+
+        The wake event is cleared first, so interrupt() only cuts short the
+        waits in progress when it is called, not a later one.
+
+        Args:
+            seconds: Number of seconds to wait.
+            clear: Clear the wake event first. False continues a wait that
+                already cleared it.
+
+        Returns:
+            True if the wait was interrupted via interrupt().
+        """
+        if clear:
+            self._wake.clear()
+        interrupted = self._wake.wait(timeout=seconds)
+        if interrupted:
+            logger.info("Rate limit wait interrupted")
+        return interrupted
+
     def _handle_daily_limit(
         self,
         last_activity_id: Optional[int] = None,
         last_resource: Optional[str] = None,
+        resume_time: Optional[datetime] = None,
     ) -> bool:
         """
         Handle daily rate limit exceeded.
@@ -176,6 +412,7 @@ class RateLimiter:
         Args:
             last_activity_id: Last successfully processed activity ID
             last_resource: Name of the resource being processed
+            resume_time: When the quota resets. Defaults to now + daily_sleep_hours.
 
         Returns:
             False to indicate pipeline should stop
@@ -183,7 +420,8 @@ class RateLimiter:
         Raises:
             RateLimitExceededError: Always raised to stop pipeline
         """
-        resume_time = datetime.now() + timedelta(hours=self.daily_sleep_hours)
+        if resume_time is None:
+            resume_time = datetime.now() + timedelta(hours=self.daily_sleep_hours)
 
         # Save state for resumption
         self._state_manager.save_pipeline_state(
@@ -197,11 +435,32 @@ class RateLimiter:
             f"Saved state for resumption at {resume_time.isoformat()}"
         )
 
-        raise RateLimitExceededError(
+        self._stop_error = RateLimitExceededError(
             f"Daily rate limit exceeded. Pipeline state saved. "
             f"Resume after {resume_time.isoformat()}",
             resume_after=resume_time,
         )
+        raise self._stop_error
+
+    @property
+    def stopped(self) -> bool:
+        """Whether the daily limit was hit and no further requests should be sent."""
+        return self._stop_error is not None
+
+    @property
+    def stop_error(self) -> Optional[RateLimitExceededError]:
+        """Get the error that stopped requests, if the daily limit was hit."""
+        return self._stop_error
+
+    def raise_if_stopped(self) -> None:
+        """
+        Refuse further requests once the daily limit was hit.
+
+        Raises:
+            RateLimitExceededError: If the daily limit was hit in this process.
+        """
+        if self._stop_error is not None:
+            raise self._stop_error
 
     def _sleep_with_progress(self, sleep_seconds: float, desc: str) -> None:
         """
@@ -215,6 +474,7 @@ class RateLimiter:
         print(f"Total requests this session: {self._total_requests}")
         print(f"Total requests today: {self._state_manager.state.total_requests_today}")
 
+        deadline = time.monotonic() + sleep_seconds
         with tqdm(
             total=int(sleep_seconds),
             desc="Waiting",
@@ -224,9 +484,14 @@ class RateLimiter:
             bar_format="{l_bar}{bar}| {remaining} remaining",
             file=sys.stdout,
         ) as pbar:
-            for _ in range(int(sleep_seconds)):
-                time.sleep(1)
-                pbar.update(1)
+            remaining = sleep_seconds
+            self._wake.clear()
+            while remaining > 0:
+                if self._wait(min(remaining, _PROGRESS_REFRESH_SECONDS), clear=False):
+                    break
+                remaining = max(deadline - time.monotonic(), 0.0)
+                pbar.n = int(sleep_seconds - remaining)
+                pbar.refresh()
 
         print()  # New line after progress bar
 
@@ -239,6 +504,41 @@ class RateLimiter:
         """
         return self._state_manager.get_resume_info()
 
+    def save_resume_progress(
+        self,
+        progress: dict,
+        last_activity_id: Optional[int] = None,
+        last_resource: Optional[str] = None,
+    ) -> None:
+        """
+        Save how far a run stopped by the daily limit got.
+
+        Args:
+            progress: Per-resource progress of the stopped run.
+            last_activity_id: Last activity whose child data was completed.
+            last_resource: Resource that completed it.
+        """
+        with self._lock:
+            self._state_manager.save_pipeline_state(
+                last_activity_id=last_activity_id,
+                last_resource=last_resource,
+                additional_state={"resume": progress},
+            )
+
+    def get_resume_progress(self) -> Optional[dict]:
+        """
+        Get the progress saved by a run stopped by the daily limit.
+
+        Returns:
+            Per-resource progress, or None if the last run was not interrupted.
+        """
+        return self._state_manager.state.pipeline_state.get("resume")
+
+    def clear_resume_progress(self) -> None:
+        """Forget saved progress once the interrupted window has been completed."""
+        with self._lock:
+            self._state_manager.clear_pipeline_state("resume")
+
     @property
     def total_requests(self) -> int:
         """Get total number of requests made this session."""
@@ -249,6 +549,33 @@ class RateLimiter:
         """Get total number of requests made today."""
         return self._state_manager.state.total_requests_today
 
+    def remaining_daily_requests(self, budget: int) -> int:
+        """
+        Get the requests still available today within a daily budget.
+
+        Uses the requests recorded today and, in paced mode, the daily usage
+        Strava reported (which includes other clients of the application),
+        less the share the lane leaves to higher priority lanes.
+
+        Args:
+            budget: Requests allowed per day.
+
+        Returns:
+            Requests that may still be sent today.
+        """
+        remaining = budget - self._state_manager.state.total_requests_today
+        if self._pacer is not None:
+            now = time.time()
+            for window in (self._pacer.daily, self._pacer.read_daily):
+                if window.reset_at > now:
+                    remaining = min(remaining, self._pacer.available(window))
+        return max(remaining, 0)
+
+    def flush_state(self) -> None:
+        """Write batched request counts to the state file."""
+        with self._lock:
+            self._state_manager.flush()
+
     def reset_state(self) -> None:
         """Reset all rate limit state."""
         with self._lock:
@@ -260,9 +587,12 @@ class RateLimiter:
         """Get state for pickling."""
         state = self.__dict__.copy()
         del state["_lock"]
+        del state["_wake"]
+        state["_stop_error"] = None
         return state
 
     def __setstate__(self, state):
         """Restore state from pickling."""
         self.__dict__.update(state)
         self._lock = Lock()
+        self._wake = Event()
@@ -1,9 +1,11 @@
 """Custom response handling with reactive rate limiting."""
 
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
+from dlt.sources.helpers.rest_client.exceptions import IgnoreResponseException
 from requests import Response
 
+from ..utils.exceptions import ConfigurationError
 from ..utils.logging import get_logger
 from .rate_limiter import RateLimiter, RateLimitExceededError
 
@@ -15,7 +17,7 @@ class RateLimitResponseHandler:
     Handles HTTP responses with reactive rate limiting.
 
     Intercepts 429 responses and applies rate limit handling:
-    - First 429: Sleep 15 minutes and retry
+    - First 429: Sleep until the 15-minute window resets and retry
     - Second 429: Save state and raise exception to stop pipeline
     """
 
@@ -52,6 +54,8 @@ class RateLimitResponseHandler:
         Raises:
             RateLimitExceededError: If daily limit exceeded
         """
+        self.rate_limiter.update_from_headers(response.headers)
+
         if response.status_code == 429:
             request_url = response.request.url or "unknown"
             logger.warning(
@@ -63,14 +67,19 @@ class RateLimitResponseHandler:
                 request_url=str(request_url),
                 last_activity_id=self._last_activity_id,
                 last_resource=self.resource_name,
+                headers=response.headers,
             )
             # If we get here, we should retry the request
             # The caller should handle retry logic
+            return response
 
-        elif response.ok:
+        if response.ok:
             # Record successful request
             self.rate_limiter.record_success(response.request.url)
 
+        # Hold back the next request if the quota needs pacing
+        self.rate_limiter.pace(last_resource=self.resource_name)
+
         return response
 
 
@@ -81,7 +90,9 @@ def create_rate_limit_response_action(
     """
     Create a response action function for dlt REST client.
 
-    This function can be used in the response_actions config to handle 429 errors.
+    The action is registered without a status code so it sees every response:
+    it syncs the rate limiter with the X-RateLimit-* headers, handles 429s,
+    and paces the next request when the limiter runs in paced mode.
 
     Args:
         rate_limiter: Shared rate limiter instance
@@ -91,7 +102,6 @@ def create_rate_limit_response_action(
         A callable that processes responses and returns action string
     """
     handler = RateLimitResponseHandler(rate_limiter, resource_name)
-    _last_activity_id: Optional[int] = None
 
     def response_action(response: Response) -> Optional[str]:
         """
@@ -101,7 +111,7 @@ def create_rate_limit_response_action(
             "retry" if request should be retried
             None to continue normally
         """
-        nonlocal _last_activity_id
+        rate_limiter.update_from_headers(response.headers)
 
         if response.status_code == 429:
             request_url = str(response.request.url or "unknown")
@@ -109,27 +119,91 @@ def create_rate_limit_response_action(
                 f"Rate limit 429 for {resource_name}: {request_url}"
             )
 
-            # This will either sleep and return True (retry),
-            # or raise RateLimitExceededError (stop)
+            # Either sleeps until the window resets (the session then resends
+            # the request) or stops at the daily limit. Like a stop found by
+            # pace(), a daily limit stop ends pagination without failing the
+            # resource, so what was fetched is loaded and resume progress saved.
             try:
                 should_retry = rate_limiter.handle_429(
                     request_url=request_url,
-                    last_activity_id=_last_activity_id,
                     last_resource=resource_name,
+                    headers=response.headers,
                 )
                 if should_retry:
                     return "retry"
             except RateLimitExceededError:
-                raise
+                logger.warning(f"Daily quota exhausted at {resource_name} request, stopping")
+                raise IgnoreResponseException from None
+            return None
 
-        elif response.ok:
+        if response.ok:
             rate_limiter.record_success(str(response.request.url))
 
+        # Hold back the next request if the quota needs pacing. A daily limit
+        # stop keeps this response: resumption tracks completed activities, and
+        # the paginators and child fetchers refuse to send further requests.
+        try:
+            rate_limiter.pace(last_resource=resource_name)
+        except RateLimitExceededError:
+            logger.warning(f"Daily quota exhausted after {resource_name} response, stopping")
+
         return None
 
     return response_action
 
 
+def create_streaming_response_hooks(
+    rate_limiter: RateLimiter,
+    resource_name: str = "unknown",
+    response_actions: Optional[Sequence[Dict[str, Any]]] = None,
+) -> Dict[str, List[Callable[..., None]]]:
+    """
+    Create dlt REST client hooks that leave a streamed response body unread.
+
+    dlt's response action hooks read ``response.text`` before matching any
+    action, which buffers the whole body of a ``stream=True`` request ahead
+    of the streaming parser. These hooks look only at the status code and
+    headers: the rate limit action runs first, then ``ignore`` actions match
+    on their status code alone (a ``content`` condition is not checked), and
+    any other error status raises an HTTPError like dlt's fallback hook.
+
+    Args:
+        rate_limiter: Shared rate limiter instance
+        resource_name: Name of the resource
+        response_actions: Additional response actions from resources.yaml
+
+    Returns:
+        Hooks dict for the ``hooks`` argument of RESTClient.paginate
+
+    Raises:
+        ConfigurationError: If an action needs more than the status code
+    """
+    ignored_status_codes = set()
+    for action in response_actions or []:
+        if not isinstance(action, dict) or action.get("action") != "ignore" or (
+            action.get("status_code") is None
+        ):
+            raise ConfigurationError(
+                f"Streaming resource '{resource_name}' supports only status code "
+                f"'ignore' response actions, got {action!r}"
+            )
+        ignored_status_codes.add(action["status_code"])
+
+    rate_limit_action = create_rate_limit_response_action(rate_limiter, resource_name)
+
+    def response_hook(response: Response, *args, **kwargs) -> None:
+        """Hook called after each response, before its body is read."""
+        rate_limit_action(response)
+        if response.status_code in ignored_status_codes:
+            logger.info(
+                f"Ignoring response with code {response.status_code} for {resource_name}"
+            )
+            raise IgnoreResponseException
+        response.raise_for_status()
+
+    return {"response": [response_hook]}
+
+
 def create_response_hooks(
     rate_limiter: RateLimiter,
     resource_name: str,
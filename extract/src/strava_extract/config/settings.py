@@ -1,7 +1,7 @@
 """Type-safe configuration management using Pydantic."""
 
 from pathlib import Path
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 import yaml
 from pydantic import BaseModel, Field, SecretStr
@@ -15,20 +15,39 @@ class APIConfig(BaseModel):
 
     base_url: str = "https://www.strava.com/api/v3/"
     version: str = "v3"
-    timeout_seconds: int = 30
-    retry_attempts: int = 3
+    timeout_seconds: int = 30  # Read timeout
+    connect_timeout_seconds: float = 10.0
+    retry_attempts: int = 3  # Retries on 5xx and connection errors (not 429)
     retry_backoff_factor: float = 2.0
+    retry_jitter_seconds: float = 1.0  # Random extra backoff per retry
+    pool_maxsize: int = 10  # Keep-alive connections, >= max_concurrent_requests + 1
+    max_concurrent_requests: int = 4  # Child requests in flight across all resources
 
 
 class RateLimitConfig(BaseModel):
     """Rate limiting configuration settings."""
 
-    # Strava API limits
+    # reactive: only sleep on 429, paced: pace requests from X-RateLimit-* headers
+    mode: Literal["reactive", "paced"] = "reactive"
+
+    # Strava API limits (overridden by response headers in paced mode)
     short_term_limit: int = 100  # 100 requests per 15 minutes
     daily_limit: int = 1000  # 1000 requests per day
+    read_short_term_limit: int = 100  # 100 read requests per 15 minutes
+    read_daily_limit: int = 1000  # 1000 read requests per day
+
+    # Paced mode tuning
+    pacing_reserve: int = 2  # Requests left unused in every window
+    pacing_spread_threshold: float = 0.25  # Spread requests below this window fraction
+
+    # Priority lanes sharing the quota (paced mode): the backfill lane leaves
+    # fresh_lane_share of every window to the fresh lane
+    lane: Literal["fresh", "backfill"] = "fresh"
+    fresh_lane_share: float = Field(default=0.3, ge=0.0, lt=1.0)
 
     # Sleep durations when rate limited
-    short_term_sleep_minutes: int = 15  # Sleep when 15-min limit hit
+    short_term_sleep_minutes: int = 15  # Max sleep when 15-min limit hit
+    short_term_reset_buffer_seconds: int = 5  # Extra wait past the quarter-hour reset
     daily_sleep_hours: int = 24  # Sleep when daily limit hit
 
     # Retry configuration
@@ -39,6 +58,17 @@ class RateLimitConfig(BaseModel):
 
     # State persistence
     state_file: Optional[str] = None  # Path to rate limit state file
+    state_flush_requests: int = 50  # Flush state after this many successful requests
+    state_flush_seconds: float = 30.0  # ...or after this many seconds, whichever first
+
+
+class HttpArchiveConfig(BaseModel):
+    """Offline record/replay of Strava API responses."""
+
+    # record: archive every response; replay: serve every request from the archive
+    mode: Literal["off", "record", "replay"] = "off"
+    path: str = ".http_archive"  # Archive directory
+    replay_suffix: str = "_replay"  # Appended to the pipeline and dataset names while replaying
 
 
 class PaginationConfig(BaseModel):
@@ -56,6 +86,23 @@ class PipelineConfig(BaseModel):
     destination: str = "duckdb"
     dataset_name: str = "strava_raw"
     progress: Literal["log", "enlighten", "alive_progress"] = "log"
+    # Chunked commits: load and advance incremental state every N activities
+    commit_every_activities: Optional[int] = None
+    # ... or every M requests (converted to activities at the per-activity request cost)
+    commit_every_requests: Optional[int] = None
+    # Pages handed to dlt as dicts or as pyarrow Tables built from the schema contracts
+    item_format: Literal["dict", "arrow"] = "dict"
+    # Replace nested JSON columns (map, athlete, segment, ...) with typed columns
+    flatten_nested: bool = False
+    # dlt performance settings (defaults are dlt's own)
+    normalize_workers: int = 1  # Normalize processes
+    load_workers: int = 20  # Parallel load jobs
+    buffer_max_items: int = 5000  # Items buffered per table before writing extract files
+    # Rotate extract and normalize files every N items or bytes (None: one file per table)
+    file_max_items: Optional[int] = None
+    file_max_bytes: Optional[int] = None
+    # Load file format (None: the destination's preferred format)
+    loader_file_format: Optional[Literal["insert_values", "jsonl", "parquet", "csv"]] = None
 
 
 class IncrementalConfig(BaseModel):
@@ -63,6 +110,64 @@ class IncrementalConfig(BaseModel):
 
     default_lookback_days: int = 30
     cursor_field: str = "start_date"
+    skip_known_activities: bool = True  # Skip child requests for loaded activities
+
+
+class BackfillConfig(BaseModel):
+    """Chunked backfill configuration settings."""
+
+    # Requests per day; None uses the daily limit minus the pacing reserve
+    daily_budget: Optional[int] = None
+    state_file: Optional[str] = None  # Path to backfill state file
+
+
+class RefreshConfig(BaseModel):
+    """Summary-only refresh of mutable activity columns (--mode refresh)."""
+
+    lookback_days: int = 30  # Trailing window listed when no dates are given
+    # Activity list columns updated in the activities table
+    columns: List[str] = Field(
+        default_factory=lambda: [
+            "kudos_count",
+            "comment_count",
+            "achievement_count",
+            "name",
+            "gear_id",
+            "visibility",
+        ]
+    )
+
+
+class WebhookConfig(BaseModel):
+    """Strava push subscription receiver and its local event queue."""
+
+    queue_path: str = ".webhook_events.sqlite"  # SQLite event queue
+    host: str = "127.0.0.1"  # Receiver interface
+    port: int = 8080
+    callback_path: str = "/webhook"
+    # hub.verify_token of the subscription (set STRAVA_WEBHOOKS__VERIFY_TOKEN)
+    verify_token: Optional[SecretStr] = None
+    # Only queue events of this subscription (None: any)
+    subscription_id: Optional[int] = None
+    drain_max_activities: int = 200  # Activities fetched per drain run
+    retain_days: int = 7  # Keep drained events this long
+
+
+class CredentialPoolConfig(BaseModel):
+    """Additional Strava API applications sharing the per-activity requests."""
+
+    # Member names; credentials are read from CREDENTIALS__<NAME>__CLIENT_ID etc.
+    members: List[str] = Field(default_factory=list)
+
+
+class AuthConfig(BaseModel):
+    """Access token caching configuration settings."""
+
+    # file: JSON file, airflow_variable: Airflow Variables, none: refresh every run
+    token_cache: Literal["file", "airflow_variable", "none"] = "file"
+    token_cache_file: Optional[str] = None  # Path to token cache (and its .lock) file
+    airflow_variable_prefix: str = "strava_access_token_"
+    refresh_ahead_seconds: int = 300  # Refresh tokens expiring within this margin
 
 
 class LoggingConfig(BaseModel):
@@ -116,9 +221,15 @@ class Settings(BaseSettings):
 
     api: APIConfig = Field(default_factory=APIConfig)
     rate_limiting: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    http_archive: HttpArchiveConfig = Field(default_factory=HttpArchiveConfig)
     pagination: PaginationConfig = Field(default_factory=PaginationConfig)
     pipeline: PipelineConfig = Field(default_factory=PipelineConfig)
     incremental: IncrementalConfig = Field(default_factory=IncrementalConfig)
+    backfill: BackfillConfig = Field(default_factory=BackfillConfig)
+    refresh: RefreshConfig = Field(default_factory=RefreshConfig)
+    webhooks: WebhookConfig = Field(default_factory=WebhookConfig)
+    credential_pool: CredentialPoolConfig = Field(default_factory=CredentialPoolConfig)
+    auth: AuthConfig = Field(default_factory=AuthConfig)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
     telemetry: TelemetryConfig = Field(default_factory=TelemetryConfig)
 
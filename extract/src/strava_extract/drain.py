@@ -0,0 +1,144 @@
+"""Incremental sync of the activities queued by webhook events."""
+
+from typing import List, Optional
+
+from dlt.common.pipeline import LoadInfo
+from opentelemetry import trace
+
+from .config.settings import get_settings
+from .pipeline import StravaPipeline
+from .utils.logging import get_logger
+from .webhooks.event_queue import DrainBatch, EventQueue, WebhookEvent, open_event_queue
+
+logger = get_logger(__name__)
+
+
+class EventDrainer:
+    """
+    Drains the webhook event queue into the destination.
+
+    The events pending when the drain starts are processed in batches of at
+    most ``max_activities`` activities. Created and updated activities are
+    fetched by ID (detail, streams and zones as needed; no activity list
+    requests and no incremental state change), deleted ones are removed from
+    every table. A batch's events are marked drained only after its load
+    succeeded, so a failed or rate limited drain is retried by the next one.
+    """
+
+    def __init__(
+        self,
+        queue: Optional[EventQueue] = None,
+        max_activities: Optional[int] = None,
+        force_refetch: bool = False,
+    ):
+        """
+        Initialize event drainer.
+
+        Args:
+            queue: Event queue. Defaults to the configured queue.
+            max_activities: Activities fetched per batch. Defaults from config.
+            force_refetch: Refetch child data of activities already loaded.
+        """
+        config = get_settings().webhooks
+        self.queue = queue or open_event_queue()
+        self.max_activities = max(1, max_activities or config.drain_max_activities)
+        self.force_refetch = force_refetch
+        self.retain_days = config.retain_days
+
+    def batches(self, events: List[WebhookEvent]) -> List[DrainBatch]:
+        """
+        Split events into batches of at most ``max_activities`` activities.
+
+        Deauthorizations are collected over all events first, so a batch never
+        fetches activities of an owner whose deauthorization is queued later.
+
+        Args:
+            events: Pending events, oldest first.
+
+        Returns:
+            Batches in queue order.
+        """
+        deauthorized = DrainBatch.deauthorizations(events)
+        batches: List[DrainBatch] = []
+        current: List[WebhookEvent] = []
+        activities: set = set()
+        for event in events:
+            if event.object_type == "activity" and event.object_id not in activities:
+                if len(activities) == self.max_activities:
+                    batches.append(DrainBatch.from_events(current, deauthorized))
+                    current, activities = [], set()
+                activities.add(event.object_id)
+            current.append(event)
+        if current:
+            batches.append(DrainBatch.from_events(current, deauthorized))
+        return batches
+
+    def drain_batch(self, batch: DrainBatch) -> Optional[LoadInfo]:
+        """
+        Apply one batch to the destination and mark its events drained.
+
+        Args:
+            batch: Batch to apply.
+
+        Returns:
+            Load info of the fetched activities, or None if nothing was fetched.
+
+        Raises:
+            PipelineError: If the pipeline fails (the events stay pending).
+            RateLimitExceededError: If the daily limit stopped the fetch.
+        """
+        for owner_id in batch.deauthorized_owners:
+            logger.warning(
+                f"Athlete {owner_id} deauthorized the application; "
+                f"their queued activity events are dropped"
+            )
+
+        load_info = None
+        if batch.fetch_ids:
+            load_info = StravaPipeline(
+                activity_ids=batch.fetch_ids, force_refetch=self.force_refetch
+            ).run()
+        if batch.delete_ids:
+            StravaPipeline().delete_activities(batch.delete_ids)
+
+        self.queue.mark_drained(batch.seqs, retain_days=self.retain_days)
+        logger.info(
+            f"Drained {len(batch.events)} events: {len(batch.fetch_ids)} activities fetched, "
+            f"{len(batch.delete_ids)} deleted"
+        )
+        return load_info
+
+    def run(self) -> List[LoadInfo]:
+        """
+        Drain the events pending when the drain starts.
+
+        Returns:
+            Load info of every batch that fetched activities.
+
+        Raises:
+            PipelineError: If the pipeline fails (the events stay pending).
+            RateLimitExceededError: If the daily limit stopped the drain.
+        """
+        tracer = trace.get_tracer(__name__)
+        with tracer.start_as_current_span("strava.drain") as span:
+            events = self.queue.pending()
+            batches = self.batches(events)
+            span.set_attribute("strava.drain.events", len(events))
+            span.set_attribute("strava.drain.batches", len(batches))
+            logger.info(
+                f"Draining {len(events)} webhook events from {self.queue.path} "
+                f"in {len(batches)} batch(es)"
+            )
+
+            load_infos: List[LoadInfo] = []
+            for batch in batches:
+                load_info = self.drain_batch(batch)
+                if load_info is not None:
+                    load_infos.append(load_info)
+            span.set_attribute(
+                "strava.drain.fetched", sum(len(batch.fetch_ids) for batch in batches)
+            )
+            span.set_attribute(
+                "strava.drain.deleted", sum(len(batch.delete_ids) for batch in batches)
+            )
+            return load_infos
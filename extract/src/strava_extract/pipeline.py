@@ -1,18 +1,41 @@
 """Main pipeline orchestration for Strava data extraction."""
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import dlt
 from dlt.common.pipeline import LoadInfo
+from dlt.destinations.exceptions import DatabaseUndefinedRelation
+from dlt.pipeline.exceptions import PipelineStepFailed
 from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
 
 import os
 
+from .client.credential_pool import CredentialPool
+from .client.http_archive import get_http_archive, is_replaying
 from .client.rate_limiter import RateLimitExceededError
 from .config.settings import get_settings
-from .sources.strava_source import strava_source
+from .sources.child_resources import (
+    get_activity_tables,
+    get_known_activity_tables,
+    is_child_resource,
+)
+from .sources.known_activities import (
+    ActivityIdIndex,
+    EmptyFetchLog,
+    load_known_activities,
+    record_empty_fetches,
+)
+from .sources.resume import ResumeTracker, boundary_before, utc_iso
+from .sources.typed_columns import convert_typed_list_columns
+from .sources.strava_source import (
+    get_activity_list_config,
+    get_credential_pool,
+    get_rate_limiter,
+    load_resource_config,
+    strava_source,
+)
 from .utils.exceptions import PipelineError
 from .utils.logging import get_logger, set_trace_id, setup_logging
 from .utils.telemetry import (
@@ -55,6 +78,8 @@ class StravaPipeline:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         trace_id: Optional[str] = None,
+        force_refetch: bool = False,
+        activity_ids: Optional[Sequence[int]] = None,
     ):
         """
         Initialize Strava pipeline.
@@ -63,6 +88,8 @@ class StravaPipeline:
             start_date: ISO date string for start of data range.
             end_date: ISO date string for end of data range.
             trace_id: Optional trace ID for request tracking.
+            force_refetch: Refetch child data of activities already loaded.
+            activity_ids: Fetch these activities by ID instead of the date range.
 
         Raises:
             ValidationError: If dates are invalid.
@@ -76,11 +103,45 @@ class StravaPipeline:
         self.start_date = start_date
         self.end_date = end_date
         self.trace_id = trace_id
+        self.force_refetch = force_refetch
+        self.activity_ids = list(activity_ids) if activity_ids is not None else None
+
+        # A replay loads into its own pipeline and dataset: it starts from fresh
+        # incremental state (so it sends the recorded requests) and leaves the
+        # live data untouched
+        suffix = self.settings.http_archive.replay_suffix if is_replaying() else ""
+        self.pipeline_name = f"{self.settings.pipeline.name}{suffix}"
+        self.dataset_name = f"{self.settings.pipeline.dataset_name}{suffix}"
+
+    def _dlt_performance_config(self) -> Dict[str, Any]:
+        """
+        Get the dlt config values of the pipeline performance settings.
+
+        Returns:
+            dlt config key -> value, without unset settings.
+        """
+        pipeline_config = self.settings.pipeline
+        values: Dict[str, Any] = {
+            "normalize.workers": pipeline_config.normalize_workers,
+            "load.workers": pipeline_config.load_workers,
+            "extract.data_writer.buffer_max_items": pipeline_config.buffer_max_items,
+            # Unsectioned, so both extract and normalize files rotate
+            "data_writer.file_max_items": pipeline_config.file_max_items,
+            "data_writer.file_max_bytes": pipeline_config.file_max_bytes,
+        }
+        if pipeline_config.item_format == "arrow":
+            # dlt adds its row columns to Arrow tables only when asked to
+            values["normalize.parquet_normalizer.add_dlt_id"] = True
+            values["normalize.parquet_normalizer.add_dlt_load_id"] = True
+        return {key: value for key, value in values.items() if value is not None}
 
     def _create_pipeline(self) -> dlt.Pipeline:
         """
         Create and configure dlt pipeline.
 
+        The performance settings of ``pipeline`` are applied to dlt's config
+        and recorded on the current span.
+
         Returns:
             Configured dlt.Pipeline instance.
         """
@@ -89,29 +150,353 @@ class StravaPipeline:
         # Get database path from environment variable or use default
         db_path = os.getenv("DUCKDB_PATH", "/opt/airflow/data/strava_datastack.duckdb")
 
+        span = trace.get_current_span()
+        for key, value in self._dlt_performance_config().items():
+            dlt.config[key] = value
+            span.set_attribute(f"dlt.{key}", value)
+        span.set_attribute("strava.item_format", self.settings.pipeline.item_format)
+        span.set_attribute(
+            "dlt.loader_file_format", self.settings.pipeline.loader_file_format or "default"
+        )
+
         pipeline = dlt.pipeline(
-            pipeline_name=self.settings.pipeline.name,
+            pipeline_name=self.pipeline_name,
             destination=dlt.destinations.duckdb(credentials=db_path),
-            dataset_name=self.settings.pipeline.dataset_name,
+            dataset_name=self.dataset_name,
             progress=self.settings.pipeline.progress,
         )
 
         logger.info(
             f"DLT pipeline created: {pipeline.pipeline_name} -> "
-            f"{pipeline.destination}/{self.settings.pipeline.dataset_name} (db_path={db_path})"
+            f"{pipeline.destination}/{self.dataset_name} (db_path={db_path})"
+        )
+        pipeline_config = self.settings.pipeline
+        logger.info(
+            f"DLT pipeline settings: normalize_workers={pipeline_config.normalize_workers}, "
+            f"load_workers={pipeline_config.load_workers}, "
+            f"buffer_max_items={pipeline_config.buffer_max_items}, "
+            f"file_max_items={pipeline_config.file_max_items}, "
+            f"file_max_bytes={pipeline_config.file_max_bytes}, "
+            f"loader_file_format={pipeline_config.loader_file_format or 'default'}, "
+            f"item_format={pipeline_config.item_format}"
         )
 
         return pipeline
 
+    def _load_known_activities(
+        self, pipeline: dlt.Pipeline
+    ) -> Optional[Dict[str, ActivityIdIndex]]:
+        """
+        Load the activities whose child data is already in the destination.
+
+        Args:
+            pipeline: Pipeline whose destination is queried.
+
+        Returns:
+            Per-resource known-activity index, or None when skipping is disabled.
+        """
+        if self.force_refetch or not self.settings.incremental.skip_known_activities:
+            logger.info("Refetching child data of already loaded activities")
+            return None
+        tables = get_known_activity_tables(load_resource_config())
+        return load_known_activities(pipeline, tables)
+
+    def load_known_activities(self) -> Optional[Dict[str, ActivityIdIndex]]:
+        """
+        Load the activities whose child data is already in the destination.
+
+        Returns:
+            Per-resource known-activity index, or None when skipping is disabled.
+        """
+        return self._load_known_activities(self._create_pipeline())
+
+    def delete_activities(self, activity_ids: Sequence[int]) -> int:
+        """
+        Delete activities and their child rows from the destination.
+
+        Every table of resources.yaml is cleaned by its activity ID column
+        (``id`` or the parent key, e.g. ``_activities_id``); tables not
+        created yet are skipped.
+
+        Args:
+            activity_ids: Activities to delete.
+
+        Returns:
+            Number of rows deleted.
+
+        Raises:
+            DatabaseException: If a delete fails for another reason than a
+                missing table (the drain then leaves the events pending).
+        """
+        if not activity_ids:
+            return 0
+        pipeline = self._create_pipeline()
+        ids = ", ".join(str(int(activity_id)) for activity_id in activity_ids)
+        deleted = 0
+        with pipeline.sql_client() as client:
+            for table_name, column_name in get_activity_tables(load_resource_config()).items():
+                table = client.make_qualified_table_name(table_name)
+                column = client.escape_column_name(column_name)
+                try:
+                    rows = client.execute_sql(
+                        f"DELETE FROM {table} WHERE {column} IN ({ids}) RETURNING 1"
+                    )
+                except DatabaseUndefinedRelation:
+                    logger.info(f"No rows deleted from '{table_name}': table not created yet")
+                    continue
+                deleted += len(rows or [])
+        logger.info(f"Deleted {len(activity_ids)} activities ({deleted} rows)")
+        return deleted
+
+    def update_activities(
+        self, pages: Iterable[List[Dict[str, Any]]], columns: Sequence[str]
+    ) -> Tuple[int, int]:
+        """
+        Update columns of activities already in the destination from activity records.
+
+        Rows of the activity list's table are matched by ``id``, one UPDATE
+        per page; records of activities not loaded yet are ignored and only
+        rows whose values changed are written. Nothing goes through dlt's
+        extract, normalize and load steps, and no state changes.
+
+        Args:
+            pages: Pages of activity records (e.g. from the list endpoint).
+            columns: Columns to update.
+
+        Returns:
+            (records read, rows updated).
+        """
+        pipeline = self._create_pipeline()
+        list_table = get_activity_list_config(load_resource_config())["name"]
+        read = updated = 0
+        with pipeline.sql_client() as client:
+            table = client.make_qualified_table_name(list_table)
+            names = ["id", *columns]
+            escaped = [client.escape_column_name(name) for name in names]
+            assignments = ", ".join(f"{column} = v.{column}" for column in escaped[1:])
+            changed = " OR ".join(
+                f"{table}.{column} IS DISTINCT FROM v.{column}" for column in escaped[1:]
+            )
+            placeholders = "(" + ", ".join(["%s"] * len(names)) + ")"
+            for page in pages:
+                if not page:
+                    continue
+                read += len(page)
+                values = [record.get(name) for record in page for name in names]
+                rows = client.execute_sql(
+                    f"UPDATE {table} SET {assignments} "
+                    f"FROM (VALUES {', '.join([placeholders] * len(page))}) "
+                    f"AS v({', '.join(escaped)}) "
+                    f"WHERE {table}.{escaped[0]} = v.{escaped[0]} AND ({changed}) RETURNING 1",
+                    *values,
+                )
+                updated += len(rows or [])
+        logger.info(f"Updated {', '.join(columns)} of {updated} of {read} activities")
+        return read, updated
+
+    def _extract_and_load(
+        self,
+        pipeline: dlt.Pipeline,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        known_activities: Optional[Dict[str, ActivityIdIndex]],
+        resume: ResumeTracker,
+        max_activities: Optional[int] = None,
+        activity_ids: Optional[Sequence[int]] = None,
+    ) -> LoadInfo:
+        """
+        Run the source for a date range, saving progress if the daily limit stops it.
+
+        A daily limit stop ends pagination and child fetching without failing
+        the extract, so everything fetched so far is loaded. The per-resource
+        progress is then saved for the next run and the stop is raised.
+        List columns created as JSON by the load are converted to their typed
+        DuckDB lists, and child fetches that returned no rows are recorded so
+        that later runs treat those activities as known.
+
+        Args:
+            pipeline: Pipeline to run.
+            start_date: ISO date string for start of data range.
+            end_date: ISO date string for end of data range.
+            known_activities: Per-resource index of activities to skip.
+            resume: Tracker recording per-resource progress.
+            max_activities: Stop listing activities after this many.
+            activity_ids: Fetch these activities by ID instead of the date range.
+
+        Returns:
+            Load info from dlt.
+
+        Raises:
+            RateLimitExceededError: If the daily limit stopped the run.
+        """
+        empty_fetches = EmptyFetchLog()
+        source = strava_source(
+            start_date=start_date,
+            end_date=end_date,
+            known_activities=known_activities,
+            resume=resume,
+            max_activities=max_activities,
+            activity_ids=activity_ids,
+            empty_fetches=empty_fetches,
+        )
+
+        run_kwargs: Dict[str, Any] = {}
+        if self.settings.pipeline.loader_file_format:
+            run_kwargs["loader_file_format"] = self.settings.pipeline.loader_file_format
+
+        logger.info("Executing pipeline run...")
+        try:
+            load_info = pipeline.run(source, **run_kwargs)
+        except PipelineStepFailed as e:
+            if isinstance(e.exception, RateLimitExceededError):
+                raise e.exception from e
+            raise
+        convert_typed_list_columns(pipeline, pipeline.default_schema.data_table_names())
+        record_empty_fetches(
+            pipeline, empty_fetches, set(get_known_activity_tables(load_resource_config()))
+        )
+
+        stop_error = get_credential_pool().stop_error()
+        if stop_error is not None:
+            if resume.window_end is not None:
+                last_completed = resume.last_completed()
+                get_rate_limiter().save_resume_progress(
+                    resume.to_dict(),
+                    last_activity_id=last_completed[1].activity_id if last_completed else None,
+                    last_resource=last_completed[0] if last_completed else None,
+                )
+                logger.warning(
+                    f"Daily rate limit stopped the run; fetched data was loaded and the next "
+                    f"run resumes activities {resume.window_start}..{resume.window_end}"
+                )
+            raise stop_error
+        return load_info
+
+    def _commit_chunk_activities(self) -> Optional[int]:
+        """
+        Get the number of activities extracted and loaded per chunk.
+
+        ``commit_every_requests`` is converted to activities at one request
+        per child resource per activity.
+
+        Returns:
+            Activities per chunk, or None to extract the range in one run.
+        """
+        pipeline_config = self.settings.pipeline
+        limits = []
+        if pipeline_config.commit_every_activities:
+            limits.append(pipeline_config.commit_every_activities)
+        if pipeline_config.commit_every_requests:
+            requests_per_activity = max(
+                1, sum(1 for res_config in load_resource_config() if is_child_resource(res_config))
+            )
+            limits.append(pipeline_config.commit_every_requests // requests_per_activity)
+        return max(1, min(limits)) if limits else None
+
+    def _extract_and_load_in_chunks(
+        self,
+        pipeline: dlt.Pipeline,
+        known_activities: Optional[Dict[str, ActivityIdIndex]],
+        chunk_activities: int,
+    ) -> LoadInfo:
+        """
+        Extract the date range as a series of runs of at most ``chunk_activities`` activities.
+
+        Every chunk is normalized and loaded, and its incremental state
+        committed, before the next one starts at the last activity it listed
+        (Strava's bound is exclusive, so the chunks overlap by a second and the
+        merge drops the repeats). A failure or daily limit stop only loses the current chunk.
+
+        Args:
+            pipeline: Pipeline to run.
+            known_activities: Per-resource index of activities to skip.
+            chunk_activities: Activities listed per chunk.
+
+        Returns:
+            Load info of the last chunk.
+
+        Raises:
+            RateLimitExceededError: If the daily limit stopped the run.
+        """
+        tracer = trace.get_tracer(__name__)
+        list_table = get_activity_list_config(load_resource_config())["name"]
+        start_date = self.start_date
+        chunk = 0
+        while True:
+            chunk += 1
+            resume = ResumeTracker()
+            with tracer.start_as_current_span("strava.pipeline.chunk") as span:
+                span.set_attribute("strava.chunk.index", chunk)
+                span.set_attribute("strava.chunk.start_date", start_date or "")
+                load_info = self._extract_and_load(
+                    pipeline,
+                    start_date,
+                    self.end_date,
+                    known_activities,
+                    resume,
+                    max_activities=chunk_activities,
+                )
+                trace_info = pipeline.last_trace
+                normalize_info = trace_info.last_normalize_info if trace_info else None
+                listed = normalize_info.row_counts.get(list_table, 0) if normalize_info else 0
+                span.set_attribute("strava.chunk.activities", listed)
+
+            logger.info(f"Chunk {chunk} committed: {listed} activities from {start_date}")
+            if listed < chunk_activities or resume.window_end is None:
+                return load_info
+            # Strava's `after` is exclusive: start a second early so activities
+            # sharing the last start_date are listed again (merge drops repeats),
+            # unless a whole chunk shares that second and the range would not advance
+            next_start = boundary_before(resume.window_end)
+            if start_date is not None and next_start <= utc_iso(start_date):
+                next_start = utc_iso(resume.window_end)
+            start_date = next_start
+
+    def _resume_interrupted_run(
+        self,
+        pipeline: dlt.Pipeline,
+        progress: dict,
+        known_activities: Optional[Dict[str, ActivityIdIndex]],
+    ) -> None:
+        """
+        Finish the activities left over by a run stopped at the daily limit.
+
+        The activity window of the stopped run is listed again, and every
+        child resource continues after the last activity it completed.
+
+        Args:
+            pipeline: Pipeline to run.
+            progress: Per-resource progress saved by the stopped run.
+            known_activities: Per-resource index of activities to skip.
+
+        Raises:
+            RateLimitExceededError: If the daily limit stops the run again.
+        """
+        tracker = ResumeTracker.from_dict(progress)
+        resume_range = tracker.resume_range()
+        if resume_range is not None:
+            start_date, end_date = resume_range
+            span = trace.get_current_span()
+            span.set_attribute("strava.resume.start_date", start_date)
+            span.set_attribute("strava.resume.end_date", end_date)
+            logger.info(f"Resuming interrupted run for {start_date}..{end_date}")
+            self._extract_and_load(pipeline, start_date, end_date, known_activities, tracker)
+        get_rate_limiter().clear_resume_progress()
+
     def run(self) -> LoadInfo:
         """
         Execute the pipeline.
 
+        If the previous run was stopped by the daily rate limit, the activities
+        it left unfinished are completed first. With ``activity_ids`` only
+        those activities are fetched, without resuming or chunking.
+
         Returns:
             Load info from dlt.
 
         Raises:
             PipelineError: If pipeline execution fails.
+            RateLimitExceededError: If the daily rate limit stopped the run.
         """
         start_time = datetime.utcnow()
         tracer = trace.get_tracer(__name__)
@@ -119,14 +504,15 @@ class StravaPipeline:
         with tracer.start_as_current_span("strava.pipeline.run") as span:
             span.set_attribute("strava.start_date", self.start_date or "")
             span.set_attribute("strava.end_date", self.end_date or "")
-            span.set_attribute("strava.pipeline_name", self.settings.pipeline.name)
-            span.set_attribute("dlt.pipeline_name", self.settings.pipeline.name)
-            span.set_attribute("dlt.dataset_name", self.settings.pipeline.dataset_name)
+            span.set_attribute("strava.pipeline_name", self.pipeline_name)
+            span.set_attribute("strava.rate_limit.lane", self.settings.rate_limiting.lane)
+            span.set_attribute("dlt.pipeline_name", self.pipeline_name)
+            span.set_attribute("dlt.dataset_name", self.dataset_name)
             span.set_attribute("dlt.destination", self.settings.pipeline.destination)
             _set_airflow_span_attributes(span)
 
-            os.environ["DLT_PIPELINE_NAME"] = self.settings.pipeline.name
-            os.environ["DLT_DATASET_NAME"] = self.settings.pipeline.dataset_name
+            os.environ["DLT_PIPELINE_NAME"] = self.pipeline_name
+            os.environ["DLT_DATASET_NAME"] = self.dataset_name
             os.environ["DLT_DESTINATION"] = self.settings.pipeline.destination
 
             trace_id = format(span.get_span_context().trace_id, "032x")
@@ -137,17 +523,44 @@ class StravaPipeline:
                 f"start_date={self.start_date}, end_date={self.end_date})"
             )
 
+            pool: Optional[CredentialPool] = None
             try:
                 with tracer.start_as_current_span("strava.pipeline.create"):
                     pipeline = self._create_pipeline()
+                    pool = get_credential_pool()
 
-                with tracer.start_as_current_span("strava.pipeline.execute"):
-                    source = strava_source(
-                        start_date=self.start_date, end_date=self.end_date
-                    )
+                with tracer.start_as_current_span("strava.pipeline.known_activities"):
+                    known_activities = self._load_known_activities(pipeline)
+
+                resume_progress = get_rate_limiter().get_resume_progress()
+                if resume_progress and self.activity_ids is None:
+                    with tracer.start_as_current_span("strava.pipeline.resume"):
+                        self._resume_interrupted_run(pipeline, resume_progress, known_activities)
 
-                    logger.info("Executing pipeline run...")
-                    load_info = pipeline.run(source)
+                with tracer.start_as_current_span("strava.pipeline.execute"):
+                    chunk_activities = self._commit_chunk_activities()
+                    if self.activity_ids is not None:
+                        span.set_attribute("strava.activity_ids", len(self.activity_ids))
+                        load_info = self._extract_and_load(
+                            pipeline,
+                            None,
+                            None,
+                            known_activities,
+                            ResumeTracker(),
+                            activity_ids=self.activity_ids,
+                        )
+                    elif chunk_activities is None:
+                        load_info = self._extract_and_load(
+                            pipeline,
+                            self.start_date,
+                            self.end_date,
+                            known_activities,
+                            ResumeTracker(),
+                        )
+                    else:
+                        load_info = self._extract_and_load_in_chunks(
+                            pipeline, known_activities, chunk_activities
+                        )
 
                 duration = (datetime.utcnow() - start_time).total_seconds()
                 logger.info(f"Pipeline completed successfully in {duration:.2f}s")
@@ -177,11 +590,31 @@ class StravaPipeline:
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise PipelineError(f"Pipeline execution failed: {e}") from e
 
+            finally:
+                if pool is None:
+                    get_rate_limiter().flush_state()
+                else:
+                    pool.flush_state()
+                    pool.log_usage()
+                    for name, usage in pool.usage().items():
+                        for key, value in usage.items():
+                            span.set_attribute(f"strava.credential_pool.{name}.{key}", value)
+                archive = get_http_archive()
+                if archive is not None:
+                    logger.info(
+                        f"HTTP archive {archive.path}: {archive.recorded} responses recorded, "
+                        f"{archive.replayed} replayed"
+                    )
+                    span.set_attribute("strava.http_archive.mode", self.settings.http_archive.mode)
+                    span.set_attribute("strava.http_archive.recorded", archive.recorded)
+                    span.set_attribute("strava.http_archive.replayed", archive.replayed)
+
 
 def run_pipeline(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     configure_logging: bool = True,
+    force_refetch: bool = False,
 ) -> LoadInfo:
     """
     Convenience function to run the pipeline.
@@ -189,6 +622,7 @@ def run_pipeline(
     Args:
         start_date: ISO date string for start of data range.
         end_date: ISO date string for end of data range.
+        force_refetch: Refetch child data of activities already loaded.
 
     Returns:
         Load info from pipeline execution.
@@ -221,7 +655,9 @@ def run_pipeline(
             )
 
         # Create and run pipeline
-        pipeline = StravaPipeline(start_date=start_date, end_date=end_date)
+        pipeline = StravaPipeline(
+            start_date=start_date, end_date=end_date, force_refetch=force_refetch
+        )
         return pipeline.run()
     finally:
         detach_trace_context(token)
@@ -0,0 +1,213 @@
+"""Request-budget planning for Strava extraction date ranges."""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from dlt.common.pendulum import pendulum
+from dlt.sources.helpers.rest_client import RESTClient
+from dlt.sources.rest_api.config_setup import (
+    create_response_hooks as create_dlt_response_hooks,
+)
+
+from .auth.oauth import get_auth
+from .client.http_session import create_session
+from .client.paginator import StravaPagePaginator
+from .client.response_handler import create_rate_limit_response_action
+from .config.settings import get_settings
+from .sources.child_resources import (
+    ParentMatch,
+    get_skip_rules,
+    is_child_resource,
+    matches_parent,
+)
+from .sources.known_activities import ActivityIdIndex
+from .sources.strava_source import (
+    get_activity_list_config,
+    get_rate_limiter,
+    load_resource_config,
+)
+from .utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class PlannedActivity:
+    """One activity in a planned range and the child requests it will cost."""
+
+    id: int
+    start_date: str
+    child_requests: int
+
+
+@dataclass
+class RequestPlan:
+    """Estimated request cost of extracting a date range."""
+
+    start_date: str
+    end_date: str
+    page_size: int
+    activities: List[PlannedActivity] = field(default_factory=list)
+
+    @property
+    def list_requests(self) -> int:
+        """Activity list pages, including the empty page that ends pagination."""
+        return list_requests_for(len(self.activities), self.page_size)
+
+    @property
+    def child_requests(self) -> int:
+        """Per-activity child requests not skipped as already loaded or by skip_when rules."""
+        return sum(activity.child_requests for activity in self.activities)
+
+    @property
+    def total_requests(self) -> int:
+        """Estimated requests for the whole range."""
+        return self.list_requests + self.child_requests
+
+    def days_needed(self, daily_budget: int) -> int:
+        """Minimum number of daily quota windows needed for the range."""
+        return max(1, -(-self.total_requests // max(daily_budget, 1)))
+
+
+def list_requests_for(activity_count: int, page_size: int) -> int:
+    """Get the list requests needed to page through a number of activities."""
+    return activity_count // page_size + 1
+
+
+def daily_request_budget() -> int:
+    """
+    Get the number of requests one day of quota allows.
+
+    The safety reserve is left unused, and in the backfill lane also the
+    share of the daily limit left to the fresh lane.
+    """
+    settings = get_settings()
+    if settings.backfill.daily_budget is not None:
+        return settings.backfill.daily_budget
+    rate_config = settings.rate_limiting
+    daily_limit = min(rate_config.daily_limit, rate_config.read_daily_limit)
+    held_back = 0
+    if rate_config.lane == "backfill":
+        held_back = math.ceil(daily_limit * rate_config.fresh_lane_share)
+    return daily_limit - rate_config.pacing_reserve - held_back
+
+
+def _child_fetch_resources(resource_configs: List[dict]) -> Dict[str, List[ParentMatch]]:
+    """Get the resources costing one request per activity, with their skip rules."""
+    return {
+        res_config["name"]: get_skip_rules(res_config)
+        for res_config in resource_configs
+        if is_child_resource(res_config)
+    }
+
+
+def _to_timestamp(value: str) -> int:
+    return int(pendulum.parse(value).timestamp())  # type: ignore[union-attr]
+
+
+def list_activity_pages(
+    start_date: str, end_date: str, resource_name: str
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Page through the activity list endpoint for a date range.
+
+    Only the list endpoint is called (one request per page of up to 200
+    activities), paced and counted by the shared rate limiter. Pagination
+    stops early at the daily limit; check ``get_rate_limiter().stopped``.
+
+    Args:
+        start_date: ISO date string for start of data range.
+        end_date: ISO date string for end of data range.
+        resource_name: Name the requests are logged and paced under.
+
+    Yields:
+        Pages of activity summaries.
+
+    Raises:
+        ConfigurationError: If resources.yaml has no incremental list resource.
+        RateLimitExceededError: If the daily limit is exhausted before the first page.
+    """
+    settings = get_settings()
+    list_config = get_activity_list_config(load_resource_config())
+
+    rate_limiter = get_rate_limiter()
+    rate_limiter.check_resume_status()
+    hooks = create_dlt_response_hooks(
+        [create_rate_limit_response_action(rate_limiter, resource_name=resource_name)]
+    )
+    client = RESTClient(
+        base_url=settings.api.base_url, auth=get_auth(), session=create_session(settings.api)
+    )
+    yield from client.paginate(
+        path=list_config["endpoint"]["path"],
+        params={
+            list_config["incremental"]["start_param"]: _to_timestamp(start_date),
+            list_config["incremental"]["end_param"]: _to_timestamp(end_date),
+            "per_page": settings.pagination.max_page_size,
+        },
+        paginator=StravaPagePaginator(
+            resource_name=resource_name,
+            base_page=settings.pagination.base_page,
+            rate_limiter=rate_limiter,
+        ),
+        hooks=hooks,
+    )
+
+
+def plan_range(
+    start_date: str,
+    end_date: Optional[str] = None,
+    known_activities: Optional[Dict[str, ActivityIdIndex]] = None,
+) -> RequestPlan:
+    """
+    Estimate the request cost of a date range from the activity list endpoint.
+
+    Pages through the activity list endpoint for the range (one request per
+    page of up to 200 activities) and counts the child requests every
+    activity will need, minus those skipped as already loaded or by the
+    resources' ``skip_when`` rules.
+
+    Args:
+        start_date: ISO date string for start of data range.
+        end_date: ISO date string for end of data range. Defaults to now.
+        known_activities: Per-resource index of activities already loaded.
+
+    Returns:
+        Request plan for the range.
+
+    Raises:
+        ConfigurationError: If resources.yaml has no incremental list resource.
+        RateLimitExceededError: If the daily limit is exhausted.
+    """
+    end_date = end_date or pendulum.now("UTC").to_iso8601_string()
+    page_size = get_settings().pagination.max_page_size
+    child_resources = _child_fetch_resources(load_resource_config())
+    known_activities = known_activities or {}
+
+    plan = RequestPlan(start_date=start_date, end_date=end_date, page_size=page_size)
+    for page in list_activity_pages(start_date, end_date, resource_name="plan"):
+        for activity in page:
+            child_requests = sum(
+                1
+                for name, skip_rules in child_resources.items()
+                if activity["id"] not in known_activities.get(name, ())
+                and not any(matches_parent(rule, activity) for rule in skip_rules)
+            )
+            plan.activities.append(
+                PlannedActivity(
+                    id=activity["id"],
+                    start_date=activity["start_date"],
+                    child_requests=child_requests,
+                )
+            )
+
+    # Pagination ends early once the daily limit is hit; a partial plan is useless
+    get_rate_limiter().raise_if_stopped()
+
+    plan.activities.sort(key=lambda activity: activity.start_date)
+    logger.info(
+        f"Planned {start_date}..{end_date}: {len(plan.activities)} activities, "
+        f"{plan.total_requests} requests"
+    )
+    return plan
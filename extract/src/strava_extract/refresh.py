@@ -0,0 +1,144 @@
+"""Summary-only refresh of mutable activity columns."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from dlt.common.pendulum import pendulum
+from opentelemetry import trace
+
+from .config.settings import get_settings
+from .pipeline import StravaPipeline
+from .planner import list_activity_pages
+from .sources.strava_source import (
+    get_activity_list_config,
+    get_rate_limiter,
+    load_resource_config,
+)
+from .strava_schema_contract import get_table_contract, normalize_page
+from .utils.exceptions import ConfigurationError
+from .utils.logging import get_logger
+from .utils.validators import validate_date_range, validate_date_string
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class RefreshResult:
+    """Outcome of a summary refresh."""
+
+    start_date: str
+    end_date: str
+    activities: int  # Activities listed in the window
+    updated: int  # Loaded activities whose columns changed
+    requests: int  # List requests sent
+
+
+class SummaryRefresher:
+    """
+    Refreshes the columns of loaded activities that change after upload.
+
+    Kudos, comments, achievements, name, gear and visibility change after an
+    activity is first loaded. Instead of re-running the source (one detail,
+    streams and zones request per activity), only the activity list endpoint
+    is paged over a trailing window, one request per 200 activities, and the
+    configured ``refresh.columns`` of the activities already loaded are
+    updated in place. No child resource runs, activities not loaded yet are
+    left to the next regular run and the incremental state is untouched.
+    """
+
+    def __init__(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        lookback_days: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+    ):
+        """
+        Initialize summary refresher.
+
+        Args:
+            start_date: ISO date string for start of the window. Defaults to
+                ``lookback_days`` before now.
+            end_date: ISO date string for end of the window. Defaults to now.
+            lookback_days: Trailing window in days. Defaults from config.
+            columns: Columns to refresh. Defaults from config.
+
+        Raises:
+            ConfigurationError: If a column is not a scalar column of the activities table.
+            ValidationError: If dates are invalid.
+        """
+        validate_date_string(start_date, "start_date")
+        validate_date_string(end_date, "end_date")
+        validate_date_range(start_date, end_date)
+
+        settings = get_settings()
+        now = pendulum.now("UTC")
+        days = settings.refresh.lookback_days if lookback_days is None else lookback_days
+        self.start_date = start_date or now.subtract(days=days).to_iso8601_string()
+        self.end_date = end_date or now.to_iso8601_string()
+        self.columns = list(columns or settings.refresh.columns)
+
+        list_name = get_activity_list_config(load_resource_config())["name"]
+        contract = get_table_contract(list_name, flatten=settings.pipeline.flatten_nested)
+        if not contract:
+            raise ConfigurationError(f"Schema contract missing for resource '{list_name}'")
+        scalar_columns = {
+            column.name
+            for column in contract.columns
+            if not column.is_system and column.data_type != "json" and column.name != "id"
+        }
+        unknown = [column for column in self.columns if column not in scalar_columns]
+        if unknown or not self.columns:
+            raise ConfigurationError(
+                f"refresh.columns must be scalar columns of '{list_name}', got {unknown or 'none'}"
+            )
+        self.contract = contract
+
+    def run(self) -> RefreshResult:
+        """
+        List the window and update the loaded activities.
+
+        Returns:
+            Refresh result.
+
+        Raises:
+            RateLimitExceededError: If the daily limit stopped the listing (the
+                pages listed before it are still applied).
+        """
+        tracer = trace.get_tracer(__name__)
+        with tracer.start_as_current_span("strava.refresh") as span:
+            span.set_attribute("strava.start_date", self.start_date)
+            span.set_attribute("strava.end_date", self.end_date)
+            span.set_attribute("strava.refresh.columns", ",".join(self.columns))
+            logger.info(
+                f"Refreshing {', '.join(self.columns)} of activities "
+                f"{self.start_date}..{self.end_date}"
+            )
+
+            requests = 0
+
+            def pages() -> Iterator[List[Dict[str, Any]]]:
+                # One request per page, including the empty page ending pagination.
+                # Pages are normalized like the extract does, so flattened columns
+                # (e.g. athlete__id) are read from their nested paths.
+                nonlocal requests
+                for page in list_activity_pages(
+                    self.start_date, self.end_date, resource_name="refresh"
+                ):
+                    requests += 1
+                    yield normalize_page(page, self.contract)
+
+            activities, updated = StravaPipeline().update_activities(pages(), self.columns)
+            span.set_attribute("strava.refresh.activities", activities)
+            span.set_attribute("strava.refresh.updated", updated)
+            span.set_attribute("strava.refresh.requests", requests)
+            get_rate_limiter().flush_state()
+            get_rate_limiter().raise_if_stopped()
+
+            return RefreshResult(
+                start_date=self.start_date,
+                end_date=self.end_date,
+                activities=activities,
+                updated=updated,
+                requests=requests,
+            )
@@ -0,0 +1,194 @@
+"""Arrow tables built from pages of raw records and their schema contracts."""
+
+import json
+from array import array
+from typing import Any, Dict, List, Tuple
+
+from ..strava_schema_contract import ColumnContract, TableContract, extract_path
+from ..utils.exceptions import ConfigurationError
+from .stream_parser import samples_to_list
+
+try:
+    import pyarrow as pa  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+# DuckDB element types of typed list columns -> Arrow types
+_ELEMENT_TYPES = {
+    "bigint": "int64",
+    "double": "float64",
+    "boolean": "bool_",
+    "varchar": "string",
+}
+
+_arrow_schemas: Dict[Tuple[str, bool], "pa.Schema"] = {}
+
+
+def require_pyarrow() -> None:
+    """
+    Check that pyarrow is installed.
+
+    Raises:
+        ConfigurationError: If pyarrow is missing.
+    """
+    if pa is None:
+        raise ConfigurationError(
+            "pipeline.item_format 'arrow' requires pyarrow (pip install pyarrow)"
+        )
+
+
+def _element_type(element_type: str) -> "pa.DataType":
+    # "double[2]" is a fixed-size list of two doubles
+    base, _, size = element_type.partition("[")
+    arrow_type = getattr(pa, _ELEMENT_TYPES[base.lower()])()
+    if size:
+        return pa.list_(arrow_type, int(size.rstrip("]")))
+    return arrow_type
+
+
+def _arrow_type(column: ColumnContract) -> "pa.DataType":
+    if column.element_type is not None:
+        return pa.list_(_element_type(column.element_type))
+    if column.data_type == "timestamp":
+        return pa.timestamp("us", tz=None if column.timezone is False else "UTC")
+    return {
+        "text": pa.string(),
+        "bigint": pa.int64(),
+        "double": pa.float64(),
+        "bool": pa.bool_(),
+        # Other JSON values are loaded as serialized text
+        "json": pa.string(),
+    }[column.data_type]
+
+
+def arrow_schema(contract: TableContract) -> "pa.Schema":
+    """
+    Build the Arrow schema of a table contract's loaded columns.
+
+    Typed list columns become Arrow lists of their element type, other
+    ``json`` columns serialized strings, and timestamps microsecond
+    timestamps (UTC unless the contract sets ``timezone=False``).
+
+    Args:
+        contract: Table contract.
+
+    Returns:
+        Arrow schema, cached per table and flattening.
+    """
+    key = (contract.name, contract.is_flattened)
+    schema = _arrow_schemas.get(key)
+    if schema is None:
+        schema = pa.schema(
+            [
+                pa.field(column.name, _arrow_type(column), nullable=column.nullable)
+                for column in contract.columns
+                if not column.is_system
+            ]
+        )
+        _arrow_schemas[key] = schema
+    return schema
+
+
+def _list_width(column: ColumnContract) -> int:
+    _, _, size = column.element_type.partition("[")  # type: ignore[union-attr]
+    return int(size.rstrip("]")) if size else 1
+
+
+def _buffers_to_array(
+    values: List[Any], column: ColumnContract, arrow_type: "pa.DataType"
+) -> "pa.Array":
+    # Typed sample buffers are concatenated and wrapped without per-value conversion
+    width = _list_width(column)
+    flat = array(next(value.typecode for value in values if value is not None))
+    offsets = [0]
+    for value in values:
+        if value is not None:
+            flat.extend(value)
+        offsets.append(len(flat) // width)
+    value_type = {"q": pa.int64(), "d": pa.float64(), "b": pa.int8()}[flat.typecode]
+    samples = pa.Array.from_buffers(value_type, len(flat), [None, pa.py_buffer(flat)])
+    if flat.typecode == "b":
+        samples = samples.cast(pa.bool_())
+    if width > 1:
+        samples = pa.FixedSizeListArray.from_arrays(samples, width)
+    lists = pa.ListArray.from_arrays(
+        pa.array(offsets, pa.int32()),
+        samples,
+        mask=pa.array([value is None for value in values]),
+    )
+    return lists.cast(arrow_type)
+
+
+def _to_array(values: List[Any], column: ColumnContract, arrow_type: "pa.DataType") -> "pa.Array":
+    if column.element_type is not None and any(isinstance(value, array) for value in values):
+        typecodes = {value.typecode for value in values if isinstance(value, array)}
+        if len(typecodes) == 1 and all(
+            value is None or isinstance(value, array) for value in values
+        ):
+            return _buffers_to_array(values, column, arrow_type)
+        width = _list_width(column)
+        values = [
+            samples_to_list(value, width) if isinstance(value, array) else value
+            for value in values
+        ]
+    if column.data_type == "json" and column.element_type is None:
+        values = [
+            None if value is None else json.dumps(value, separators=(",", ":"))
+            for value in values
+        ]
+    elif column.data_type == "timestamp":
+        # ISO 8601 strings are parsed by Arrow; naive columns keep the UTC wall time
+        return pa.array(values, type=pa.string()).cast(pa.timestamp("us", tz="UTC")).cast(
+            arrow_type
+        )
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # e.g. integral floats for bigint columns
+        return pa.array(values).cast(arrow_type)
+
+
+def page_to_arrow(records: List[Dict[str, Any]], contract: TableContract) -> "pa.Table":
+    """
+    Convert a page of raw records into an Arrow table of the contract's columns.
+
+    Takes the place of normalize_page: unknown fields are ignored, missing
+    ones get their defaults, flattened columns are read from their source
+    paths, and list fields routed by the contract's ``list_split`` (stream
+    samples) are converted to typed Arrow lists without going through dlt's
+    per-row normalizer. Samples parsed into ``array`` buffers (see
+    stream_parser) are wrapped as Arrow buffers without conversion.
+
+    Args:
+        records: Raw records.
+        contract: Table contract of the records.
+
+    Returns:
+        Arrow table with the contract's schema.
+    """
+    schema = arrow_schema(contract)
+    split = contract.list_split
+    targets = (
+        [
+            split.column_for(record) if record.get(split.source) is not None else None
+            for record in records
+        ]
+        if split is not None
+        else []
+    )
+
+    arrays = []
+    columns = [column for column in contract.columns if not column.is_system]
+    for column, field in zip(columns, schema):
+        name = column.name
+        if split is not None and name in split.target_columns:
+            values = [
+                record[split.source] if target == name else None
+                for record, target in zip(records, targets)
+            ]
+        elif column.source is not None:
+            values = [extract_path(record, column.source) for record in records]
+        else:
+            values = [record.get(name, column.default) for record in records]
+        arrays.append(_to_array(values, column, field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
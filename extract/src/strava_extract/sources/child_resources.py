@@ -0,0 +1,787 @@
+"""Per-activity child resources fetched with bounded parallelism."""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import dlt
+from dlt.common.jsonpath import find_values
+from dlt.extract.resource import DltResource
+from dlt.sources.helpers.rest_client import RESTClient
+from dlt.sources.rest_api.config_setup import (
+    create_response_hooks as create_dlt_response_hooks,
+)
+from dlt.sources.rest_api.config_setup import make_parent_key_name
+
+from ..client.credential_pool import PoolMember
+from ..client.paginator import StravaPagePaginator
+from ..client.rate_limiter import RateLimiter, RateLimitExceededError
+from ..client.response_handler import (
+    create_rate_limit_response_action,
+    create_streaming_response_hooks,
+)
+from ..config.settings import get_settings
+from ..strava_schema_contract import get_table_contract
+from ..utils.exceptions import ConfigurationError
+from ..utils.logging import get_logger
+from .known_activities import ActivityIdIndex, EmptyFetchLog
+from .resume import CURSOR_FIELD, ResumeTracker
+
+logger = get_logger(__name__)
+
+
+def get_resolved_params(res_config: dict) -> Dict[str, dict]:
+    """
+    Get the endpoint params resolved from a parent resource.
+
+    Args:
+        res_config: Resource definition from resources.yaml.
+
+    Returns:
+        Mapping of param name to its resolve config (empty for top-level resources).
+    """
+    params = res_config.get("endpoint", {}).get("params", {})
+    return {
+        name: value
+        for name, value in params.items()
+        if isinstance(value, dict) and value.get("type") == "resolve"
+    }
+
+
+def is_child_resource(res_config: dict) -> bool:
+    """Check whether a resource is fetched once per parent record."""
+    return bool(get_resolved_params(res_config))
+
+
+def is_derived_resource(res_config: dict) -> bool:
+    """Check whether a resource is split out of another resource's responses."""
+    return "derived_from" in res_config
+
+
+def is_lookup_resource(res_config: dict) -> bool:
+    """Check whether a resource fetches one parent record by ID (``lookup: true``)."""
+    return bool(res_config.get("lookup", False)) and is_child_resource(res_config)
+
+
+def get_activity_tables(resource_configs: List[dict]) -> Dict[str, str]:
+    """
+    Get the destination tables holding rows of an activity.
+
+    Top-level resources are keyed by their ``id``; child and derived
+    resources by the parent key column of the activity they were fetched for
+    (e.g. ``_activities_id``), or by ``id`` when they load a ``lookup``
+    resource's whole response (the activity itself). Used to delete the
+    rows of deleted activities.
+
+    Args:
+        resource_configs: Resource definitions from resources.yaml.
+
+    Returns:
+        Table name -> activity ID column.
+    """
+    configs = {res_config["name"]: res_config for res_config in resource_configs}
+    tables: Dict[str, str] = {}
+    for res_config in resource_configs:
+        if is_fetch_only(res_config):
+            continue
+        fetched = res_config
+        if is_derived_resource(res_config):
+            fetched = configs[res_config["derived_from"]["resource"]]
+        if not is_child_resource(fetched):
+            tables[res_config["name"]] = "id"
+            continue
+        resolved = next(iter(get_resolved_params(fetched).values()))
+        parent_key = make_parent_key_name(resolved["resource"], resolved["field"])
+        contract = get_table_contract(res_config["name"])
+        if contract and parent_key in contract.column_names:
+            tables[res_config["name"]] = parent_key
+        elif (
+            is_lookup_resource(fetched)
+            and is_derived_resource(res_config)
+            and res_config["derived_from"].get("data_selector", "$") == "$"
+        ):
+            tables[res_config["name"]] = "id"
+    return tables
+
+
+def get_known_activity_tables(resource_configs: List[dict]) -> Dict[str, tuple[str, str]]:
+    """
+    Get the destination tables telling which activities a child resource already has.
+
+    ``skip_known: true`` uses the resource's own table and parent key column
+    (e.g. ``activity_streams._activities_id``); a mapping with ``table`` and
+    ``column`` points elsewhere, e.g. for fetch_only resources.
+
+    Args:
+        resource_configs: Resource definitions from resources.yaml.
+
+    Returns:
+        Resource name -> (table name, activity ID column).
+    """
+    tables: Dict[str, tuple[str, str]] = {}
+    for res_config in resource_configs:
+        skip_known = res_config.get("skip_known")
+        if not skip_known or not is_child_resource(res_config):
+            continue
+        if isinstance(skip_known, dict):
+            tables[res_config["name"]] = (skip_known["table"], skip_known["column"])
+        else:
+            resolved = next(iter(get_resolved_params(res_config).values()))
+            tables[res_config["name"]] = (
+                res_config["name"],
+                make_parent_key_name(resolved["resource"], resolved["field"]),
+            )
+    return tables
+
+
+def _query_value(value: Any) -> Any:
+    """Render YAML booleans the way Strava expects them in a query string."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _expand_keyed_by_type(page: List[Any]) -> List[Any]:
+    """
+    Turn ``key_by_type=true`` stream responses back into one record per type.
+
+    ``{"time": {"data": [...], ...}, ...}`` becomes
+    ``[{"type": "time", "data": [...], ...}, ...]``, the shape returned
+    without ``key_by_type``, so the table is the same either way.
+    """
+    records: List[Any] = []
+    for record in page:
+        if isinstance(record, dict) and record and all(
+            isinstance(value, dict) for value in record.values()
+        ):
+            records.extend({"type": key, **value} for key, value in record.items())
+        else:
+            records.append(record)
+    return records
+
+
+ParentMatch = Dict[str, frozenset]
+
+
+def _parse_match(res_config: dict, option: str, match: Any) -> ParentMatch:
+    """Parse a parent field -> value (or list of values) mapping."""
+    if not isinstance(match, dict) or not match:
+        raise ConfigurationError(
+            f"Resource '{res_config['name']}': {option} needs a mapping of parent "
+            f"fields to values, got {match!r}"
+        )
+    return {
+        field: frozenset(values if isinstance(values, list) else [values])
+        for field, values in match.items()
+    }
+
+
+def matches_parent(match: ParentMatch, item: Dict[str, Any]) -> bool:
+    """Check whether every field of a parent record has one of the matched values."""
+    return all(item.get(field) in values for field, values in match.items())
+
+
+class _ParamOverride(NamedTuple):
+    """Endpoint params applied to parent records whose fields match."""
+
+    match: ParentMatch
+    params: Dict[str, Any]
+    drop_keys: frozenset
+
+
+def get_param_overrides(res_config: dict) -> List[_ParamOverride]:
+    """
+    Get the per-parent endpoint param overrides of a resource.
+
+    ``param_overrides`` is a list of entries with a ``match`` mapping
+    (parent field -> value or list of values) and ``params`` to set and/or
+    ``drop_keys`` to remove from the comma-separated ``keys`` param. Every
+    matching entry is applied in order over the endpoint params.
+
+    Args:
+        res_config: Resource definition from resources.yaml.
+
+    Returns:
+        Param overrides in order.
+
+    Raises:
+        ConfigurationError: If an entry has no ``match`` mapping, or neither
+            a ``params`` mapping nor a ``drop_keys`` list.
+    """
+    overrides = []
+    for entry in res_config.get("param_overrides", []):
+        if not isinstance(entry, dict):
+            raise ConfigurationError(
+                f"Resource '{res_config['name']}': invalid param_overrides entry {entry!r}"
+            )
+        params = entry.get("params", {})
+        drop_keys = entry.get("drop_keys", [])
+        if not isinstance(params, dict) or not isinstance(drop_keys, list) or not (
+            params or drop_keys
+        ):
+            raise ConfigurationError(
+                f"Resource '{res_config['name']}': param_overrides entries need a "
+                f"'params' mapping or a 'drop_keys' list, got {entry!r}"
+            )
+        overrides.append(
+            _ParamOverride(
+                match=_parse_match(res_config, "param_overrides match", entry.get("match")),
+                params=dict(params),
+                drop_keys=frozenset(drop_keys),
+            )
+        )
+    return overrides
+
+
+def get_skip_rules(res_config: dict) -> List[ParentMatch]:
+    """
+    Get the parent records a resource sends no request for.
+
+    ``skip_when`` is a list of parent field -> value (or list of values)
+    mappings; a parent record matching any of them is skipped, e.g. manual
+    activities for streams.
+
+    Args:
+        res_config: Resource definition from resources.yaml.
+
+    Returns:
+        Skip rules.
+
+    Raises:
+        ConfigurationError: If a rule is not a non-empty mapping.
+    """
+    return [
+        _parse_match(res_config, "skip_when", rule) for rule in res_config.get("skip_when", [])
+    ]
+
+
+class _MemberRoute(NamedTuple):
+    """REST client and response hooks of one credential pool member."""
+
+    member: PoolMember
+    client: RESTClient
+    hooks: Optional[Dict[str, Any]]
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self.member.rate_limiter
+
+
+class ChildResourceFetcher:
+    """
+    Fetches one child resource for a page of parent records in parallel.
+
+    Each resource owns a thread pool of ``concurrency`` workers, and all
+    child resources share one semaphore that caps the number of requests
+    in flight across the whole source. Requests are sharded by parent ID
+    across the credential pool members; each member's response hooks pace
+    and count its requests on its own rate limiter, and a member that hits
+    its daily limit hands its shard to the next member.
+    Parent records found in the ``known`` index, or covered by the resource's
+    resume point, are skipped without a request. Once no member has quota
+    left, the fetcher yields what it completed and sends nothing more.
+    Endpoint params can differ per parent record through ``param_overrides``
+    (e.g. a lower streams resolution for rides), and parent records matching
+    a ``skip_when`` rule (e.g. manual activities for streams) get no request.
+    """
+
+    def __init__(
+        self,
+        res_config: dict,
+        clients: Sequence[Tuple[PoolMember, RESTClient]],
+        global_limit: BoundedSemaphore,
+        known: Optional[ActivityIdIndex] = None,
+        resume: Optional[ResumeTracker] = None,
+        empty_fetches: Optional[EmptyFetchLog] = None,
+    ):
+        """
+        Initialize child resource fetcher.
+
+        Args:
+            res_config: Resource definition from resources.yaml.
+            clients: Credential pool members with the REST client each uses.
+            global_limit: Semaphore bounding concurrent child requests source-wide.
+            known: Parent IDs whose child data is already loaded.
+            resume: Tracker recording progress and holding the resume point.
+            empty_fetches: Log of the parent records whose fetch returned no rows.
+
+        Raises:
+            ConfigurationError: If no client is given or the resource resolves
+                params from more than one parent.
+        """
+        settings = get_settings()
+        endpoint = res_config["endpoint"]
+
+        self.name: str = res_config["name"]
+        self.concurrency = max(1, int(res_config.get("concurrency", 1)))
+        if not clients:
+            raise ConfigurationError(f"Resource '{self.name}' has no REST client")
+        self._global_limit = global_limit
+        self._path: str = endpoint["path"]
+        self._data_selector: Optional[str] = endpoint.get("data_selector")
+        self._maximum_page = endpoint.get("pagination", {}).get("maximum_page")
+        self._base_page = settings.pagination.base_page
+
+        resolved = get_resolved_params(res_config)
+        self._resolved_fields = {name: value["field"] for name, value in resolved.items()}
+        parent_names = {value["resource"] for value in resolved.values()}
+        if len(parent_names) != 1:
+            raise ConfigurationError(
+                f"Resource '{self.name}' must resolve params from exactly one parent"
+            )
+        self.parent_name: str = parent_names.pop()
+        self.parent_id_field: str = next(iter(self._resolved_fields.values()))
+        self._known = known
+        self._resume = resume
+        self._empty_fetches = empty_fetches
+        self._resume_point = resume.resume_point(self.name) if resume else None
+
+        self._params: Dict[str, Any] = {"per_page": settings.pagination.default_page_size}
+        self._params.update(
+            {
+                name: value
+                for name, value in endpoint.get("params", {}).items()
+                if name not in resolved
+            }
+        )
+        self._param_overrides = get_param_overrides(res_config)
+        self._skip_rules = get_skip_rules(res_config)
+
+        self._parent_keys = {
+            make_parent_key_name(self.parent_name, field): field
+            for field in res_config.get("include_from_parent", [])
+        }
+
+        self._routes: List[_MemberRoute] = []
+        for member, client in clients:
+            resource_name = self.name if len(clients) == 1 else f"{self.name}[{member.name}]"
+            hooks: Optional[Dict[str, Any]]
+            if res_config.get("streaming_parse", False):
+                # dlt's action hooks would read the body the client streams
+                hooks = create_streaming_response_hooks(
+                    rate_limiter=member.rate_limiter,
+                    resource_name=resource_name,
+                    response_actions=endpoint.get("response_actions", []),
+                )
+            else:
+                rate_limit_action = create_rate_limit_response_action(
+                    rate_limiter=member.rate_limiter,
+                    resource_name=resource_name,
+                )
+                hooks = create_dlt_response_hooks(
+                    [rate_limit_action, *endpoint.get("response_actions", [])]
+                )
+            self._routes.append(_MemberRoute(member, client, hooks))
+
+    @property
+    def stopped(self) -> bool:
+        """Whether every credential pool member hit its daily limit."""
+        return all(route.rate_limiter.stopped for route in self._routes)
+
+    def _routes_for(self, parent_id: Any) -> List[_MemberRoute]:
+        """Get the members to try for a parent record, its shard owner first."""
+        if len(self._routes) == 1 or not isinstance(parent_id, int):
+            return self._routes
+        start = parent_id % len(self._routes)
+        return self._routes[start:] + self._routes[:start]
+
+    def params_for(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the endpoint params of the request for a parent record.
+
+        Args:
+            item: Parent record.
+
+        Returns:
+            Query params, with every matching param override applied.
+        """
+        params = dict(self._params)
+        drop_keys: set = set()
+        for override in self._param_overrides:
+            if matches_parent(override.match, item):
+                params.update(override.params)
+                drop_keys.update(override.drop_keys)
+        if drop_keys and isinstance(params.get("keys"), str):
+            params["keys"] = ",".join(
+                key for key in params["keys"].split(",") if key not in drop_keys
+            )
+        return {name: _query_value(value) for name, value in params.items()}
+
+    def is_skipped(self, item: Dict[str, Any]) -> bool:
+        """Check whether a parent record matches a ``skip_when`` rule."""
+        return any(matches_parent(rule, item) for rule in self._skip_rules)
+
+    def _fetch_with(
+        self,
+        route: _MemberRoute,
+        path: str,
+        params: Dict[str, Any],
+        parent_record: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        paginator = StravaPagePaginator(
+            resource_name=self.name,
+            base_page=self._base_page,
+            maximum_page=self._maximum_page,
+            rate_limiter=route.rate_limiter,
+        )
+        keyed_by_type = params.get("key_by_type") == "true"
+        records: List[Dict[str, Any]] = []
+        pages = 0
+        with self._global_limit:
+            route.rate_limiter.raise_if_stopped()
+            for page in route.client.paginate(
+                path=path,
+                params=params,
+                paginator=paginator,
+                data_selector="$" if keyed_by_type else self._data_selector,
+                hooks=route.hooks,
+            ):
+                pages += 1
+                page_records = _expand_keyed_by_type(page) if keyed_by_type else page
+                for record in page_records:
+                    record.update(parent_record)
+                records.extend(page_records)
+        if paginator.stopped_by_rate_limit or (not pages and route.rate_limiter.stopped):
+            # Pages are missing, or the request itself hit the daily limit (a
+            # 429 ends pagination without a page); let the next member fetch
+            # the record again
+            route.rate_limiter.raise_if_stopped()
+        return records
+
+    def fetch(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Fetch all child records for one parent record.
+
+        Args:
+            item: Parent record.
+
+        Returns:
+            Child records with the included parent fields attached.
+
+        Raises:
+            RateLimitExceededError: If every credential pool member hit its daily limit.
+        """
+        path = self._path.format(
+            **{name: item[field] for name, field in self._resolved_fields.items()}
+        )
+        parent_record = {key: item[field] for key, field in self._parent_keys.items()}
+        params = self.params_for(item)
+
+        stop_error: Optional[RateLimitExceededError] = None
+        for route in self._routes_for(item[self.parent_id_field]):
+            if route.rate_limiter.stopped:
+                stop_error = stop_error or route.rate_limiter.stop_error
+                continue
+            try:
+                return self._fetch_with(route, path, params, parent_record)
+            except RateLimitExceededError as e:
+                stop_error = stop_error or e
+                if len(self._routes) > 1:
+                    logger.warning(
+                        f"Credential pool member '{route.member.name}' reached its daily "
+                        f"limit, failing over '{self.name}' requests"
+                    )
+        assert stop_error is not None
+        raise stop_error
+
+    def _record_completed(self, item: Dict[str, Any], records: List[Dict[str, Any]]) -> None:
+        if not records and self._empty_fetches is not None:
+            self._empty_fetches.add(self.name, item[self.parent_id_field])
+        start_date = item.get(CURSOR_FIELD)
+        if self._resume is not None and isinstance(start_date, str):
+            self._resume.record_completed(self.name, item[self.parent_id_field], start_date)
+
+    def _is_resumed(self, item: Dict[str, Any]) -> bool:
+        start_date = item.get(CURSOR_FIELD)
+        return isinstance(start_date, str) and self._resume_point.covers(  # type: ignore[union-attr]
+            item[self.parent_id_field], start_date
+        )
+
+    def fetch_page(self, items: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Fetch child records for a page of parent records.
+
+        Results are yielded in parent order. If any request fails, requests
+        that have not started yet are cancelled and the error is re-raised,
+        except for a daily rate limit stop, which ends the resource quietly
+        after the last completed parent record.
+
+        Args:
+            items: Page of parent records.
+
+        Yields:
+            Child records of one parent record.
+        """
+        if self._resume is not None:
+            self._resume.record_parents(self.name, items)
+        if self.stopped:
+            return
+
+        if self._resume_point is not None:
+            pending = [item for item in items if not self._is_resumed(item)]
+            if len(pending) < len(items):
+                logger.info(
+                    f"Resuming '{self.name}' after activity {self._resume_point.activity_id}: "
+                    f"skipping {len(items) - len(pending)} of {len(items)} records"
+                )
+            items = pending
+
+        if self._skip_rules:
+            pending = [item for item in items if not self.is_skipped(item)]
+            if len(pending) < len(items):
+                logger.info(
+                    f"Skipping {len(items) - len(pending)} of {len(items)} "
+                    f"'{self.parent_name}' records matching '{self.name}' skip_when rules"
+                )
+            items = pending
+
+        if self._known:
+            pending = [item for item in items if item[self.parent_id_field] not in self._known]
+            if len(pending) < len(items):
+                logger.info(
+                    f"Skipping {len(items) - len(pending)} of {len(items)} already loaded "
+                    f"'{self.parent_name}' records for '{self.name}'"
+                )
+            items = pending
+
+        try:
+            if self.concurrency == 1:
+                for item in items:
+                    records = self.fetch(item)
+                    if records:
+                        yield records
+                    self._record_completed(item, records)
+                return
+
+            executor = ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix=f"strava-{self.name}"
+            )
+            try:
+                futures = [executor.submit(self.fetch, item) for item in items]
+                for item, future in zip(items, futures):
+                    records = future.result()
+                    if records:
+                        yield records
+                    self._record_completed(item, records)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+        except RateLimitExceededError:
+            logger.warning(f"'{self.name}' stopped at the daily rate limit")
+
+
+def _table_hints(res_config: dict, schema_contract: dict) -> Dict[str, Any]:
+    """Build dlt table hints for a resource loaded into its own table."""
+    name = res_config["name"]
+    contract = get_table_contract(name, flatten=get_settings().pipeline.flatten_nested)
+    if not contract:
+        raise ConfigurationError(f"Schema contract missing for resource '{name}'")
+
+    hints: Dict[str, Any] = {
+        "name": name,
+        "primary_key": res_config["primary_key"],
+        "write_disposition": res_config.get("write_disposition", "merge"),
+        "columns": contract.to_dlt_columns(),
+        "schema_contract": schema_contract,
+    }
+    if "max_table_nesting" in res_config:
+        hints["max_table_nesting"] = res_config["max_table_nesting"]
+    return hints
+
+
+def is_fetch_only(res_config: dict) -> bool:
+    """Check whether a resource only feeds derived resources and has no table."""
+    return bool(res_config.get("fetch_only", False))
+
+
+def build_child_resource(
+    res_config: dict,
+    parent: DltResource,
+    clients: Sequence[Tuple[PoolMember, RESTClient]],
+    global_limit: BoundedSemaphore,
+    schema_contract: dict,
+    known: Optional[ActivityIdIndex] = None,
+    resume: Optional[ResumeTracker] = None,
+    empty_fetches: Optional[EmptyFetchLog] = None,
+) -> DltResource:
+    """
+    Build a dlt transformer fetching a child resource for every parent record.
+
+    Resources marked ``fetch_only`` are not loaded themselves; they are
+    deselected and only feed the resources derived from them.
+
+    Args:
+        res_config: Resource definition from resources.yaml.
+        parent: Parent resource feeding the transformer.
+        clients: Credential pool members with the REST client each uses.
+        global_limit: Semaphore bounding concurrent child requests source-wide.
+        schema_contract: dlt schema contract for the table.
+        known: Parent IDs whose child data is already loaded (skipped).
+        resume: Tracker recording progress and holding the resume point.
+        empty_fetches: Log of the parent records whose fetch returned no rows.
+
+    Returns:
+        dlt transformer resource.
+
+    Raises:
+        ConfigurationError: If the resource has no schema contract.
+    """
+    fetcher = ChildResourceFetcher(
+        res_config,
+        clients,
+        global_limit,
+        known=known,
+        resume=resume,
+        empty_fetches=empty_fetches,
+    )
+    if fetcher.parent_name != parent.name:
+        raise ConfigurationError(
+            f"Resource '{fetcher.name}' resolves from '{fetcher.parent_name}', "
+            f"got parent '{parent.name}'"
+        )
+
+    if is_fetch_only(res_config):
+        hints: Dict[str, Any] = {"name": fetcher.name, "selected": False}
+    else:
+        hints = _table_hints(res_config, schema_contract)
+
+    logger.info(
+        f"Child resource '{fetcher.name}' fetches from '{parent.name}' "
+        f"with concurrency={fetcher.concurrency}"
+    )
+
+    def fetch_children(items: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        yield from fetcher.fetch_page(items)
+
+    return dlt.transformer(fetch_children, data_from=parent, **hints)
+
+
+def build_lookup_resource(
+    res_config: dict,
+    parent_ids: Sequence[int],
+    clients: Sequence[Tuple[PoolMember, RESTClient]],
+    global_limit: BoundedSemaphore,
+    schema_contract: dict,
+    page_size: int,
+) -> DltResource:
+    """
+    Build a dlt resource fetching a ``lookup`` resource for a list of parent IDs.
+
+    Used to fetch single activities (e.g. queued by webhook events) instead
+    of listing them: the resource is requested once per ID, as if fed parent
+    records holding only the ID, with the same parallelism, credential pool
+    sharding and response actions (404s of deleted activities are ignored).
+
+    Args:
+        res_config: Resource definition with ``lookup: true``.
+        parent_ids: Parent IDs to fetch.
+        clients: Credential pool members with the REST client each uses.
+        global_limit: Semaphore bounding concurrent child requests source-wide.
+        schema_contract: dlt schema contract for the table.
+        page_size: Parent IDs fetched per page.
+
+    Returns:
+        dlt resource named after the lookup resource.
+
+    Raises:
+        ConfigurationError: If the resource has no schema contract.
+    """
+    fetcher = ChildResourceFetcher(res_config, clients, global_limit)
+    if is_fetch_only(res_config):
+        hints: Dict[str, Any] = {"name": fetcher.name, "selected": False}
+    else:
+        hints = _table_hints(res_config, schema_contract)
+
+    logger.info(
+        f"Lookup resource '{fetcher.name}' fetches {len(parent_ids)} '{fetcher.parent_name}' "
+        f"records by ID with concurrency={fetcher.concurrency}"
+    )
+
+    def fetch_by_id() -> Iterator[List[Dict[str, Any]]]:
+        for start in range(0, len(parent_ids), page_size):
+            page = [
+                {fetcher.parent_id_field: parent_id}
+                for parent_id in parent_ids[start : start + page_size]
+            ]
+            yield from fetcher.fetch_page(page)
+
+    return dlt.resource(fetch_by_id, **hints)
+
+
+def build_lookup_parent(
+    res_config: dict, lookup: DltResource, schema_contract: dict
+) -> DltResource:
+    """
+    Build a top-level resource loaded from the responses of a lookup resource.
+
+    Single-activity responses are a superset of the activity list's records,
+    so the lookup responses fill the list resource's table (trimmed to its
+    contract) and feed its child resources without listing requests.
+
+    Args:
+        res_config: Resource definition of the top-level resource.
+        lookup: Lookup resource built by build_lookup_resource().
+        schema_contract: dlt schema contract for the table.
+
+    Returns:
+        dlt transformer named after the top-level resource.
+
+    Raises:
+        ConfigurationError: If the resource has no schema contract.
+    """
+    hints = _table_hints(res_config, schema_contract)
+
+    def copy_records(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Normalization trims records in place; the lookup's records feed other tables
+        return [dict(item) for item in items]
+
+    return dlt.transformer(copy_records, data_from=lookup, **hints)
+
+
+def build_derived_resource(
+    res_config: dict,
+    source: DltResource,
+    source_config: dict,
+    schema_contract: dict,
+) -> DltResource:
+    """
+    Build a dlt transformer splitting records out of another resource's responses.
+
+    Lets one request per activity feed several tables: every derived resource
+    selects its records from the source resource's response with a JSONPath
+    and inherits the parent columns (e.g. ``_activities_id``) of the source.
+
+    Args:
+        res_config: Resource definition with a ``derived_from`` section.
+        source: Resource whose records are split.
+        source_config: Resource definition of the source resource.
+        schema_contract: dlt schema contract for the table.
+
+    Returns:
+        dlt transformer resource.
+
+    Raises:
+        ConfigurationError: If the resource has no schema contract.
+    """
+    data_selector: str = res_config["derived_from"].get("data_selector", "$")
+    hints = _table_hints(res_config, schema_contract)
+
+    parent_name = next(iter(get_resolved_params(source_config).values()))["resource"]
+    parent_keys = [
+        make_parent_key_name(parent_name, field)
+        for field in source_config.get("include_from_parent", [])
+    ]
+
+    logger.info(f"Derived resource '{res_config['name']}' splits '{source.name}' by {data_selector}")
+
+    def split_records(items: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        for item in items:
+            inherited = {key: item[key] for key in parent_keys if key in item}
+            records = []
+            for record in find_values(data_selector, item):
+                if isinstance(record, dict):
+                    record = {**record, **inherited}
+                records.append(record)
+            if records:
+                yield records
+
+    return dlt.transformer(split_records, data_from=source, **hints)
@@ -0,0 +1,203 @@
+"""Index of activities whose child data is already loaded in the destination."""
+
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import dlt
+from dlt.destinations.exceptions import DatabaseUndefinedRelation
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Child fetches that completed without rows (ignored 404s, activities without
+# zones); they leave no row in the resource's table, so they are kept here
+EMPTY_FETCHES_TABLE = "_strava_empty_child_fetches"
+
+
+class ActivityIdIndex:
+    """
+    Compact, read-only set of activity IDs.
+
+    IDs are kept in a sorted ``array('q')`` (8 bytes per ID instead of
+    roughly 60 for a Python set entry) and looked up by binary search.
+    """
+
+    def __init__(self, activity_ids: Iterable[int] = ()):
+        """
+        Initialize index.
+
+        Args:
+            activity_ids: Activity IDs to index (duplicates are fine).
+        """
+        self._ids = array("q", sorted(set(activity_ids)))
+
+    def __contains__(self, activity_id: object) -> bool:
+        if not isinstance(activity_id, int):
+            return False
+        position = bisect_left(self._ids, activity_id)
+        return position < len(self._ids) and self._ids[position] == activity_id
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the IDs."""
+        return self._ids.itemsize * len(self._ids)
+
+
+class EmptyFetchLog:
+    """
+    Activities whose child request completed without rows, per resource.
+
+    Filled by the child fetchers during extraction (thread-safe) and written
+    to the destination by record_empty_fetches() after the load.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty log."""
+        self._fetches: List[Tuple[str, int]] = []
+        self._lock = Lock()
+
+    def add(self, resource_name: str, activity_id: int) -> None:
+        """Record a child fetch that returned no rows."""
+        with self._lock:
+            self._fetches.append((resource_name, int(activity_id)))
+
+    def items(self) -> List[Tuple[str, int]]:
+        """Get the recorded (resource name, activity ID) pairs."""
+        with self._lock:
+            return list(self._fetches)
+
+    def __len__(self) -> int:
+        return len(self._fetches)
+
+
+def record_empty_fetches(
+    pipeline: dlt.Pipeline, log: EmptyFetchLog, resource_names: Set[str]
+) -> int:
+    """
+    Store the empty child fetches of known-activity resources in the destination.
+
+    Args:
+        pipeline: Pipeline whose destination dataset is written.
+        log: Empty fetches of the run.
+        resource_names: Resources whose known activities are tracked (``skip_known``).
+
+    Returns:
+        Number of fetches stored (including ones already stored).
+    """
+    fetches = [fetch for fetch in log.items() if fetch[0] in resource_names]
+    if not fetches:
+        return 0
+    with pipeline.sql_client() as client:
+        if not client.has_dataset():
+            client.create_dataset()
+        table = client.make_qualified_table_name(EMPTY_FETCHES_TABLE)
+        client.execute_sql(
+            f"CREATE TABLE IF NOT EXISTS {table} (resource VARCHAR NOT NULL, "
+            f"activity_id BIGINT NOT NULL, PRIMARY KEY (resource, activity_id))"
+        )
+        client.execute_sql(
+            f"INSERT OR IGNORE INTO {table} (resource, activity_id) VALUES "
+            + ", ".join(["(%s, %s)"] * len(fetches)),
+            *chain.from_iterable(fetches),
+        )
+    logger.info(f"Recorded {len(fetches)} child fetches without rows in {EMPTY_FETCHES_TABLE}")
+    return len(fetches)
+
+
+def load_empty_fetches(pipeline: dlt.Pipeline) -> Dict[str, List[int]]:
+    """
+    Load the stored child fetches that returned no rows.
+
+    Args:
+        pipeline: Pipeline whose destination dataset is queried.
+
+    Returns:
+        Resource name -> activity IDs; empty if none were stored yet.
+    """
+    try:
+        with pipeline.sql_client() as client:
+            rows = client.execute_sql(
+                f"SELECT resource, activity_id "
+                f"FROM {client.make_qualified_table_name(EMPTY_FETCHES_TABLE)}"
+            ) or []
+    except DatabaseUndefinedRelation:
+        return {}
+    fetches: Dict[str, List[int]] = {}
+    for resource_name, activity_id in rows:
+        fetches.setdefault(resource_name, []).append(int(activity_id))
+    return fetches
+
+
+def load_activity_id_index(
+    pipeline: dlt.Pipeline,
+    table_name: str,
+    column_name: str,
+    extra_ids: Optional[Iterable[int]] = None,
+) -> ActivityIdIndex:
+    """
+    Load the distinct activity IDs of a destination table.
+
+    A missing dataset or table (first run) yields an index of ``extra_ids`` only.
+
+    Args:
+        pipeline: Pipeline whose destination dataset is queried.
+        table_name: Table holding the child rows.
+        column_name: Column holding the activity ID.
+        extra_ids: Further known activity IDs (e.g. fetches without rows).
+
+    Returns:
+        Index of the activity IDs present in the table, plus ``extra_ids``.
+
+    Raises:
+        DatabaseException: If the query fails for another reason than a
+            missing table.
+    """
+    try:
+        with pipeline.sql_client() as client:
+            query = (
+                f"SELECT DISTINCT {client.escape_column_name(column_name)} "
+                f"FROM {client.make_qualified_table_name(table_name)} "
+                f"WHERE {client.escape_column_name(column_name)} IS NOT NULL"
+            )
+            rows = client.execute_sql(query) or []
+    except DatabaseUndefinedRelation as e:
+        logger.info(f"No known activities loaded from '{table_name}': {e}")
+        rows = []
+
+    return ActivityIdIndex(chain((int(row[0]) for row in rows), extra_ids or ()))
+
+
+def load_known_activities(
+    pipeline: dlt.Pipeline, tables: Dict[str, tuple[str, str]]
+) -> Dict[str, ActivityIdIndex]:
+    """
+    Load the known-activity index of every child resource.
+
+    Activities whose child fetch returned no rows count as known too.
+
+    Args:
+        pipeline: Pipeline whose destination dataset is queried.
+        tables: Resource name -> (table name, activity ID column).
+
+    Returns:
+        Resource name -> index of activities already loaded.
+    """
+    empty_fetches = load_empty_fetches(pipeline) if tables else {}
+    known: Dict[str, ActivityIdIndex] = {}
+    for resource_name, (table_name, column_name) in tables.items():
+        index = load_activity_id_index(
+            pipeline, table_name, column_name, empty_fetches.get(resource_name)
+        )
+        known[resource_name] = index
+        logger.info(
+            f"Known activities for '{resource_name}': {len(index)} "
+            f"(from {table_name}.{column_name}, {index.nbytes} bytes)"
+        )
+    return known
@@ -0,0 +1,180 @@
+"""Per-resource progress tracking for resuming after a daily rate limit stop."""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from dlt.common.pendulum import pendulum
+
+# Parent field ordering the activity list (the incremental cursor)
+CURSOR_FIELD = "start_date"
+
+
+def utc_iso(value: str, offset: timedelta = timedelta(0)) -> str:
+    """Convert an ISO date/datetime to a naive UTC ISO datetime string (as the CLI accepts)."""
+    moment = pendulum.parse(value).in_timezone("UTC") + offset  # type: ignore[union-attr]
+    return moment.naive().isoformat()
+
+
+def boundary_before(start_date: str) -> str:
+    """Get the range boundary just before an activity start (Strava's `after` is exclusive)."""
+    return utc_iso(start_date, -timedelta(seconds=1))
+
+
+def boundary_after(start_date: str) -> str:
+    """Get the range boundary just after an activity start (Strava's `before` is exclusive)."""
+    return utc_iso(start_date, timedelta(seconds=1))
+
+
+@dataclass(frozen=True)
+class ResumePoint:
+    """Last parent activity whose child data a resource has completed."""
+
+    activity_id: int
+    start_date: str
+
+    def covers(self, activity_id: int, start_date: str) -> bool:
+        """Check whether an activity is at or before this point in list order."""
+        return (start_date, activity_id) <= (self.start_date, self.activity_id)
+
+    def to_dict(self) -> dict:
+        """Convert point to dictionary."""
+        return {"activity_id": self.activity_id, "start_date": self.start_date}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ResumePoint":
+        """Create point from dictionary."""
+        return cls(activity_id=int(data["activity_id"]), start_date=str(data["start_date"]))
+
+
+class ResumeTracker:
+    """
+    Tracks how far every child resource got through the parent activities of a run.
+
+    Child resources fetch activities in list order (oldest first), so the
+    progress of a resource is the last activity it completed. When a run is
+    stopped by the daily rate limit, the progress is saved together with the
+    window of activities that were listed; the next run lists that window
+    again and every resource continues after its own resume point instead of
+    refetching everything since the incremental ``last_value``.
+    """
+
+    def __init__(
+        self,
+        window_start: Optional[str] = None,
+        window_end: Optional[str] = None,
+        resume_points: Optional[Dict[str, ResumePoint]] = None,
+    ):
+        """
+        Initialize tracker.
+
+        Args:
+            window_start: Start date of the first activity listed by the stopped run(s).
+            window_end: Start date of the last activity listed by the stopped run(s).
+            resume_points: Per-resource progress of the stopped run(s) to continue from.
+        """
+        self.window_start = window_start
+        self.window_end = window_end
+        self._resume_points: Dict[str, ResumePoint] = dict(resume_points or {})
+        self._progress: Dict[str, ResumePoint] = dict(self._resume_points)
+        self._resources: set[str] = set(self._resume_points)
+        self._lock = Lock()
+
+    def resume_point(self, resource_name: str) -> Optional[ResumePoint]:
+        """Get the point a resource continues from (set by the stopped run)."""
+        return self._resume_points.get(resource_name)
+
+    def record_parents(self, resource_name: str, items: Iterable[Dict[str, Any]]) -> None:
+        """
+        Record a page of parent activities a resource was handed.
+
+        Args:
+            resource_name: Child resource name.
+            items: Parent records.
+        """
+        with self._lock:
+            self._resources.add(resource_name)
+            for item in items:
+                start_date = item.get(CURSOR_FIELD)
+                if not isinstance(start_date, str):
+                    continue
+                if self.window_start is None or start_date < self.window_start:
+                    self.window_start = start_date
+                if self.window_end is None or start_date > self.window_end:
+                    self.window_end = start_date
+
+    def record_completed(self, resource_name: str, activity_id: int, start_date: str) -> None:
+        """
+        Record that a resource has completed the child data of an activity.
+
+        Args:
+            resource_name: Child resource name.
+            activity_id: Parent activity ID.
+            start_date: Parent activity start date.
+        """
+        with self._lock:
+            current = self._progress.get(resource_name)
+            if current is None or not current.covers(activity_id, start_date):
+                self._progress[resource_name] = ResumePoint(activity_id, start_date)
+
+    def last_completed(self) -> Optional[Tuple[str, ResumePoint]]:
+        """Get the most recent completion of any resource as (resource name, point)."""
+        with self._lock:
+            if not self._progress:
+                return None
+            return max(
+                self._progress.items(),
+                key=lambda entry: (entry[1].start_date, entry[1].activity_id),
+            )
+
+    def resume_range(self) -> Optional[Tuple[str, str]]:
+        """
+        Get the date range a resumed run has to list again.
+
+        Starts just before the earliest resume point (or the window start for
+        resources that completed nothing) and ends just after the window end.
+
+        Returns:
+            (start, end) as naive UTC ISO strings, or None if nothing was listed.
+        """
+        if self.window_start is None or self.window_end is None:
+            return None
+        starts = [
+            self._resume_points[name].start_date
+            if name in self._resume_points
+            else self.window_start
+            for name in self._resources
+        ] or [self.window_start]
+        return boundary_before(min(starts)), boundary_after(self.window_end)
+
+    def to_dict(self) -> dict:
+        """Convert tracker progress to dictionary."""
+        with self._lock:
+            resources: Dict[str, Optional[dict]] = {
+                name: None for name in sorted(self._resources)
+            }
+            resources.update(
+                {name: point.to_dict() for name, point in sorted(self._progress.items())}
+            )
+            return {
+                "window_start": self.window_start,
+                "window_end": self.window_end,
+                "resources": resources,
+            }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ResumeTracker":
+        """Create a tracker continuing from saved progress."""
+        resources = data.get("resources") or {}
+        tracker = cls(
+            window_start=data.get("window_start"),
+            window_end=data.get("window_end"),
+            resume_points={
+                name: ResumePoint.from_dict(point)
+                for name, point in resources.items()
+                if point is not None
+            },
+        )
+        tracker._resources.update(resources)
+        return tracker
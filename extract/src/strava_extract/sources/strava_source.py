@@ -1,28 +1,57 @@
 """DLT source definition for Strava API extraction."""
 
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from threading import BoundedSemaphore
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
 
 import dlt
 import yaml
 from dlt.common.pendulum import pendulum
+from dlt.extract.resource import DltResource
+from dlt.sources.helpers.rest_client import RESTClient
 from dlt.sources.rest_api import RESTAPIConfig, rest_api_resources
 from packaging.version import Version
+from requests import Session
 
+from ..client.credential_pool import CredentialPool, PoolMember, create_credential_pool
+from ..client.http_session import create_session
 from ..client.paginator import StravaPagePaginator
 from ..client.rate_limiter import RateLimiter, RateLimitExceededError
 from ..client.response_handler import create_rate_limit_response_action
 from ..config.settings import get_settings
-from ..strava_schema_contract import get_table_contract, normalize_record
+from ..strava_schema_contract import (
+    get_table_contract,
+    normalize_page,
+    normalize_record,
+)
 from ..utils.exceptions import ConfigurationError
 from ..utils.logging import get_logger
+from .arrow_pages import page_to_arrow, require_pyarrow
+from .child_resources import (
+    build_child_resource,
+    build_derived_resource,
+    build_lookup_parent,
+    build_lookup_resource,
+    get_resolved_params,
+    is_child_resource,
+    is_derived_resource,
+    is_fetch_only,
+    is_lookup_resource,
+)
+from .known_activities import ActivityIdIndex, EmptyFetchLog
+from .resume import ResumeTracker
+from .stream_parser import StreamingRESTClient
 
 logger = get_logger(__name__)
 
 # Shared rate limiter instance (singleton per process)
 _rate_limiter: Optional[RateLimiter] = None
+_credential_pool: Optional[CredentialPool] = None
 _MIN_DLT_VERSION = Version("1.3.0")
-_SCHEMA_CONTRACT = {"tables": "freeze", "columns": "freeze", "data_type": "freeze"}
+# New tables are allowed so resources added to resources.yaml can create their
+# tables; columns and data types stay frozen to the explicit contracts.
+_SCHEMA_CONTRACT = {"tables": "evolve", "columns": "freeze", "data_type": "freeze"}
 
 
 def _ensure_supported_dlt_version() -> None:
@@ -46,10 +75,26 @@ def get_rate_limiter() -> RateLimiter:
     return _rate_limiter
 
 
+def get_credential_pool() -> CredentialPool:
+    """
+    Get or create singleton credential pool.
+
+    The default credentials use the shared rate limiter of get_rate_limiter().
+
+    Returns:
+        CredentialPool instance.
+    """
+    global _credential_pool
+    if _credential_pool is None:
+        _credential_pool = create_credential_pool(get_rate_limiter())
+    return _credential_pool
+
+
 def reset_rate_limiter() -> None:
-    """Reset the rate limiter singleton (useful for testing)."""
-    global _rate_limiter
+    """Reset the rate limiter and credential pool singletons (useful for testing)."""
+    global _rate_limiter, _credential_pool
     _rate_limiter = None
+    _credential_pool = None
 
 
 def load_resource_config() -> list:
@@ -80,6 +125,47 @@ def load_resource_config() -> list:
     return data.get("resources", [])
 
 
+def get_activity_list_config(resource_configs: List[dict]) -> dict:
+    """
+    Get the incremental top-level resource listing activities.
+
+    Args:
+        resource_configs: Resource definitions from resources.yaml.
+
+    Returns:
+        Resource definition of the activity list.
+
+    Raises:
+        ConfigurationError: If no incremental top-level resource is defined.
+    """
+    for res_config in resource_configs:
+        if res_config.get("incremental", {}).get("enabled") and not is_child_resource(res_config):
+            return res_config
+    raise ConfigurationError("No incremental activity list resource in resources.yaml")
+
+
+def get_lookup_config(resource_configs: List[dict]) -> dict:
+    """
+    Get the child resource fetching a single activity by ID.
+
+    Args:
+        resource_configs: Resource definitions from resources.yaml.
+
+    Returns:
+        Resource definition with ``lookup: true``.
+
+    Raises:
+        ConfigurationError: If no lookup resource of the activity list is defined.
+    """
+    list_name = get_activity_list_config(resource_configs)["name"]
+    for res_config in resource_configs:
+        if is_lookup_resource(res_config) and any(
+            param["resource"] == list_name for param in get_resolved_params(res_config).values()
+        ):
+            return res_config
+    raise ConfigurationError(f"No lookup resource of '{list_name}' in resources.yaml")
+
+
 def check_rate_limit_status() -> None:
     """
     Check if we can proceed or need to wait for rate limit reset.
@@ -87,25 +173,39 @@ def check_rate_limit_status() -> None:
     Raises:
         RateLimitExceededError: If daily limit was hit and should wait
     """
-    rate_limiter = get_rate_limiter()
-    rate_limiter.check_resume_status()
+    get_credential_pool().check_resume_status()
 
 
-def _apply_schema_contracts(resources):
+def _apply_schema_contracts(resources, arrow_resources=frozenset()):
     def _make_normalizer(contract):
-        # Keep a single-arg signature so dlt doesn't pass meta as the second arg.
-        def _normalize(item):
-            return normalize_record(item, contract)
+        # Pages are normalized whole rather than through add_map, which calls
+        # the function once per record.
+        def _normalize(items, meta=None):
+            if isinstance(items, list):
+                return normalize_page(items, contract)
+            return normalize_record(items, contract)
 
         return _normalize
 
+    def _make_arrow_converter(contract):
+        def _to_arrow(items, meta=None):
+            if isinstance(items, list):
+                return page_to_arrow(items, contract) if items else items
+            return page_to_arrow([items], contract)
+
+        return _to_arrow
+
+    flatten = get_settings().pipeline.flatten_nested
     for resource in resources:
-        contract = get_table_contract(resource.name)
+        contract = get_table_contract(resource.name, flatten=flatten)
         if not contract:
             raise ConfigurationError(
                 f"Schema contract missing for resource '{resource.name}'"
             )
-        resource.add_map(_make_normalizer(contract))
+        if resource.name in arrow_resources:
+            resource.add_step(_make_arrow_converter(contract))
+        else:
+            resource.add_step(_make_normalizer(contract))
     return resources
 
 
@@ -115,6 +215,9 @@ def build_rest_api_config(
     """
     Build REST API configuration from resource definitions.
 
+    Only top-level resources are included; per-activity child resources are
+    built by build_child_resources() so they can be fetched in parallel.
+
     Args:
         start_date: ISO date string for incremental start.
         end_date: ISO date string for incremental end.
@@ -152,6 +255,8 @@ def build_rest_api_config(
     # Build resources with runtime configuration
     resources = []
     for res_config in resource_configs:
+        if is_child_resource(res_config) or is_derived_resource(res_config):
+            continue
         resource_name = res_config["name"]
 
         # Create response action for 429 handling
@@ -173,14 +278,12 @@ def build_rest_api_config(
                     maximum_page=res_config["endpoint"]
                     .get("pagination", {})
                     .get("maximum_page"),
+                    rate_limiter=rate_limiter,
                 ),
                 # Add response actions including rate limit handler
                 "response_actions": [
-                    # Handle 429 rate limits reactively
-                    {
-                        "status_code": 429,
-                        "action": rate_limit_action,
-                    },
+                    # Runs for every response: header pacing and 429 handling
+                    rate_limit_action,
                 ],
             },
         }
@@ -195,7 +298,9 @@ def build_rest_api_config(
         if "include_from_parent" in res_config:
             resource["include_from_parent"] = res_config["include_from_parent"]
 
-        contract = get_table_contract(resource_name)
+        contract = get_table_contract(
+            resource_name, flatten=settings.pipeline.flatten_nested
+        )
         if not contract:
             raise ConfigurationError(
                 f"Schema contract missing for resource '{resource_name}'"
@@ -221,6 +326,7 @@ def build_rest_api_config(
                 "cursor_path": inc_config["cursor_path"],
                 "initial_value": load_from_date,
                 "end_value": load_until_date,
+                "lag": inc_config.get("lag_seconds"),
                 "convert": lambda ts: (
                     None
                     if ts is None
@@ -230,14 +336,16 @@ def build_rest_api_config(
 
         resources.append(resource)
 
-    # Import and create auth instance from environment variables
-    from ..auth.oauth import get_auth
-
-    auth = get_auth()
+    # Top-level resources use the default credentials
+    auth = get_credential_pool().primary.auth
 
     # Build full config
     config: RESTAPIConfig = {
-        "client": {"base_url": settings.api.base_url, "auth": auth},
+        "client": {
+            "base_url": settings.api.base_url,
+            "auth": auth,
+            "session": create_session(settings.api),
+        },
         "resource_defaults": {
             "primary_key": "id",
             "write_disposition": "merge",
@@ -254,8 +362,199 @@ def build_rest_api_config(
     return config
 
 
+def get_arrow_resource_names(resource_configs: List[dict]) -> Set[str]:
+    """
+    Get the resources whose pages are converted to Arrow tables.
+
+    With ``pipeline.item_format: arrow`` every resource except those feeding
+    child resources, which read its records as dicts.
+
+    Args:
+        resource_configs: Resource definitions from resources.yaml.
+
+    Returns:
+        Resource names (empty for dict items).
+
+    Raises:
+        ConfigurationError: If Arrow items are configured without pyarrow.
+    """
+    if get_settings().pipeline.item_format != "arrow":
+        return set()
+    require_pyarrow()
+    feeding = {
+        param["resource"]
+        for res_config in resource_configs
+        for param in get_resolved_params(res_config).values()
+    }
+    return {res_config["name"] for res_config in resource_configs} - feeding
+
+
+def _pool_clients(
+    pool: CredentialPool,
+    session: Session,
+    client_factory: Callable[..., RESTClient] = RESTClient,
+) -> List[Tuple[PoolMember, RESTClient]]:
+    settings = get_settings()
+    return [
+        (
+            member,
+            client_factory(base_url=settings.api.base_url, auth=member.auth, session=session),
+        )
+        for member in pool.members
+    ]
+
+
+def build_lookup_resources(
+    activity_ids: Sequence[int],
+    pool: CredentialPool,
+    session: Session,
+    global_limit: BoundedSemaphore,
+) -> Dict[str, DltResource]:
+    """
+    Build the top-level resources for a list of activity IDs instead of a date range.
+
+    The ``lookup`` resource (the activity detail request) is fetched once per
+    ID, and the activity list's table is loaded from its responses, so every
+    child and derived resource runs as after a listing.
+
+    Args:
+        activity_ids: Activities to fetch.
+        pool: Credential pool whose members share the requests.
+        session: HTTP session shared with the child resources.
+        global_limit: Semaphore bounding concurrent requests source-wide.
+
+    Returns:
+        Lookup and activity list resources by name.
+
+    Raises:
+        ConfigurationError: If no lookup resource is defined.
+    """
+    resource_configs = load_resource_config()
+    lookup_config = get_lookup_config(resource_configs)
+    list_config = get_activity_list_config(resource_configs)
+    lookup = build_lookup_resource(
+        lookup_config,
+        list(activity_ids),
+        clients=_pool_clients(pool, session),
+        global_limit=global_limit,
+        schema_contract=_SCHEMA_CONTRACT,
+        page_size=get_settings().pagination.default_page_size,
+    )
+    activities = build_lookup_parent(list_config, lookup, _SCHEMA_CONTRACT)
+    return {lookup.name: lookup, activities.name: activities}
+
+
+def build_child_resources(
+    parents: Dict[str, DltResource],
+    pool: CredentialPool,
+    session: Session,
+    known_activities: Optional[Dict[str, ActivityIdIndex]] = None,
+    resume: Optional[ResumeTracker] = None,
+    global_limit: Optional[BoundedSemaphore] = None,
+    empty_fetches: Optional[EmptyFetchLog] = None,
+) -> List[DltResource]:
+    """
+    Build the per-activity child and derived resources on top of their parents.
+
+    Resources already in ``parents`` (e.g. a lookup resource) are not built again.
+
+    Args:
+        parents: Top-level resources by name.
+        pool: Credential pool whose members share the child requests.
+        session: HTTP session shared with the parent resources.
+        known_activities: Per-resource index of activities to skip.
+        resume: Tracker recording per-resource progress and resume points.
+        global_limit: Semaphore bounding concurrent child requests source-wide.
+            Defaults to one of ``api.max_concurrent_requests``.
+        empty_fetches: Log of the activities whose child fetch returned no rows.
+
+    Returns:
+        dlt transformer resources in resources.yaml order.
+
+    Raises:
+        ConfigurationError: If a resource references an unknown resource.
+    """
+    settings = get_settings()
+    if global_limit is None:
+        global_limit = BoundedSemaphore(max(1, settings.api.max_concurrent_requests))
+    arrow_resources = get_arrow_resource_names(load_resource_config())
+
+    built: Dict[str, DltResource] = dict(parents)
+    configs: Dict[str, dict] = {}
+    children = []
+    for res_config in load_resource_config():
+        name = res_config["name"]
+        configs[name] = res_config
+        if name in parents:
+            continue
+
+        if is_derived_resource(res_config):
+            source_name = res_config["derived_from"]["resource"]
+            if source_name not in built or not is_child_resource(configs[source_name]):
+                raise ConfigurationError(
+                    f"Resource '{name}' must be derived from a child resource "
+                    f"defined before it, got '{source_name}'"
+                )
+            resource = build_derived_resource(
+                res_config,
+                source=built[source_name],
+                source_config=configs[source_name],
+                schema_contract=_SCHEMA_CONTRACT,
+            )
+        elif is_child_resource(res_config):
+            parent_name = next(iter(get_resolved_params(res_config).values()))["resource"]
+            if parent_name not in built:
+                raise ConfigurationError(
+                    f"Resource '{name}' depends on unknown resource '{parent_name}'"
+                )
+            client_factory: Callable[..., RESTClient]
+            if res_config.get("streaming_parse", False):
+                # Stream samples are parsed chunk by chunk, into typed buffers for Arrow
+                client_factory = partial(StreamingRESTClient, compact=name in arrow_resources)
+            else:
+                client_factory = RESTClient
+            resource = build_child_resource(
+                res_config,
+                parent=built[parent_name],
+                clients=_pool_clients(pool, session, client_factory),
+                global_limit=global_limit,
+                schema_contract=_SCHEMA_CONTRACT,
+                known=(known_activities or {}).get(name),
+                resume=resume,
+                empty_fetches=empty_fetches,
+            )
+        else:
+            continue
+
+        built[name] = resource
+        children.append(resource)
+    return children
+
+
+def _with_schema_contracts(
+    parents: Dict[str, DltResource], children: List[DltResource]
+) -> List[DltResource]:
+    fetch_only = {
+        res_config["name"] for res_config in load_resource_config() if is_fetch_only(res_config)
+    }
+    resources = [*parents.values(), *children]
+    _apply_schema_contracts(
+        [r for r in resources if r.name not in fetch_only],
+        get_arrow_resource_names(load_resource_config()),
+    )
+    return resources
+
+
 @dlt.source(name="strava")
-def strava_source(start_date: Optional[str] = None, end_date: Optional[str] = None):
+def strava_source(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    known_activities: Optional[Dict[str, ActivityIdIndex]] = None,
+    resume: Optional[ResumeTracker] = None,
+    max_activities: Optional[int] = None,
+    activity_ids: Optional[Sequence[int]] = None,
+    empty_fetches: Optional[EmptyFetchLog] = None,
+):
     """
     Strava DLT source for extracting activity data.
 
@@ -263,17 +562,41 @@ def strava_source(start_date: Optional[str] = None, end_date: Optional[str] = No
     - activities: Activity metadata
     - activity_streams: Time-series data (heart rate, speed, etc.)
     - activity_zones: Heart rate/power zones
-    - activity_segment_efforts: Segment efforts per activity
-
-    Rate limiting is handled reactively:
-    - On first 429: Sleep 15 minutes then retry
+    - activity_details: Detailed activity columns (description, calories, polyline)
+    - activity_segment_efforts, activity_laps, activity_splits, activity_best_efforts:
+      split out of the same activity detail response (one request per activity)
+
+    Child resources are fetched in a bounded thread pool per resource
+    (``concurrency`` in resources.yaml), capped source-wide by
+    ``api.max_concurrent_requests``. Their requests are sharded by activity
+    across the credential pool; all workers of one application share its
+    rate limiter.
+
+    Rate limiting:
+    - In paced mode: Requests are spaced out from X-RateLimit-* headers
+    - On first 429: Sleep for the time left until the 15-minute window
+      resets (capped at ``short_term_sleep_minutes``), then retry
     - On second 429 for same request: Save state and wait 24 hours
+    - When the daily limit is hit, pagination and child fetching stop and
+      the records fetched so far are still loaded; ``resume`` records how far
+      every child resource got
 
     Args:
         start_date: ISO date string for start of data range (e.g., '2024-01-01').
                    If None, uses incremental state or default lookback period.
         end_date: ISO date string for end of data range (e.g., '2024-12-31').
                  If None, loads data up to current time.
+        known_activities: Per-resource index of activities whose child data is
+                 already loaded; their child requests are skipped.
+        resume: Tracker recording per-resource progress; child resources skip
+                 the activities up to their resume point.
+        max_activities: Stop listing activities after this many (the last page is
+                 not trimmed); used to commit long extracts in chunks.
+        activity_ids: Fetch these activities by ID instead of listing a date range
+                 (e.g. activities queued by webhook events); the incremental
+                 state is left untouched.
+        empty_fetches: Log collecting the activities whose child fetch returned
+                 no rows, so that they count as known on later runs.
 
     Yields:
         DLT resources for Strava data.
@@ -286,8 +609,45 @@ def strava_source(start_date: Optional[str] = None, end_date: Optional[str] = No
     # Check if we should wait for rate limit reset before starting
     check_rate_limit_status()
 
+    if activity_ids is not None:
+        _ensure_supported_dlt_version()
+        logger.info(f"Fetching {len(activity_ids)} activities by ID")
+        session = create_session(get_settings().api)
+        global_limit = BoundedSemaphore(max(1, get_settings().api.max_concurrent_requests))
+        parents = build_lookup_resources(
+            activity_ids, get_credential_pool(), session, global_limit
+        )
+        children = build_child_resources(
+            parents,
+            pool=get_credential_pool(),
+            session=session,
+            known_activities=known_activities,
+            global_limit=global_limit,
+            empty_fetches=empty_fetches,
+        )
+        yield from _with_schema_contracts(parents, children)
+        return
+
     config = build_rest_api_config(start_date, end_date)
 
-    resources = rest_api_resources(config)
-    resources = _apply_schema_contracts(resources)
-    yield from resources
+    if max_activities is not None:
+        list_name = get_activity_list_config(load_resource_config())["name"]
+        # Smaller pages keep the chunk close to max_activities
+        for resource in config["resources"]:
+            if isinstance(resource, dict) and resource["name"] == list_name:
+                resource["endpoint"]["params"]["per_page"] = min(  # type: ignore[index]
+                    max_activities, get_settings().pagination.default_page_size
+                )
+
+    parents = {resource.name: resource for resource in rest_api_resources(config)}
+    if max_activities is not None:
+        parents[list_name].add_limit(max_activities, count_rows=True)
+    children = build_child_resources(
+        parents,
+        pool=get_credential_pool(),
+        session=config["client"].get("session") or create_session(get_settings().api),
+        known_activities=known_activities,
+        resume=resume,
+        empty_fetches=empty_fetches,
+    )
+    yield from _with_schema_contracts(parents, children)
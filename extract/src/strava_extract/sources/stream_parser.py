@@ -0,0 +1,262 @@
+"""Incremental parsing of activity stream responses into compact sample buffers."""
+
+import codecs
+import json
+import re
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from dlt.common import jsonpath
+from dlt.sources.helpers.requests import Response
+from dlt.sources.helpers.rest_client import RESTClient
+
+from ..strava_schema_contract import get_table_contract
+from ..utils.exceptions import ConfigurationError
+
+# Bytes read from the response at a time
+CHUNK_SIZE = 64 * 1024
+
+# array typecodes of the typed stream columns' element types
+_TYPECODES = {"bigint": "q", "double": "d", "double[2]": "d", "boolean": "b"}
+_COMPACT_BOOLS = {"true": 1, "false": 0}
+_BOOLS = {"true": True, "false": False}
+
+_DATA_START = re.compile(r'"data"\s*:\s*\[')
+_STREAM_TYPE = re.compile(r'"type"\s*:\s*"([^"]*)"')
+_KEYED_TYPE = re.compile(r'"([^"]*)"\s*:\s*$')
+_NON_SPACE = re.compile(r"\S")
+_FLAT_END = re.compile(r"\]")
+_NESTED_END = re.compile(r"\]\s*\]")
+# Longest `"data": [` split across two chunks
+_DATA_START_TAIL = 32
+
+Samples = Union[array, List[Any]]
+
+
+def _stream_typecodes() -> Dict[str, str]:
+    contract = get_table_contract("activity_streams")
+    split = contract.list_split if contract is not None else None
+    if contract is None or split is None:
+        raise ConfigurationError("The activity_streams contract has no typed stream columns")
+    element_types = {
+        column.name: column.element_type for column in contract.columns if column.element_type
+    }
+    return {
+        stream_type: _TYPECODES[element_types[column]]
+        for stream_type, column in split.columns.items()
+    }
+
+
+def samples_to_list(samples: Samples, width: int = 1) -> List[Any]:
+    """
+    Convert compact samples back to Python values.
+
+    Args:
+        samples: Sample buffer or list.
+        width: Values per sample (2 for ``[lat, lng]`` pairs stored flat).
+
+    Returns:
+        Samples as a list, pairs as ``[lat, lng]`` lists.
+    """
+    values = samples.tolist() if isinstance(samples, array) else samples
+    if width == 1 or (values and isinstance(values[0], list)):
+        return values
+    pairs = iter(values)
+    return [list(pair) for pair in zip(*[pairs] * width)]
+
+
+class _StreamsParser:
+    """
+    Push parser for Strava stream responses.
+
+    The response text outside ``"data"`` arrays (types, sizes, resolution)
+    is kept as a small skeleton in which every ``data`` array is replaced by
+    its index; the samples are parsed from each chunk as it arrives. With
+    ``compact`` they go into ``array`` buffers typed by stream type
+    (``q`` for time/heartrate/..., ``d`` for distance/altitude/... and flat
+    ``[lat, lng, lat, lng, ...]`` for latlng, ``b`` for moving), otherwise
+    into lists shaped like ``json.loads`` output.
+    """
+
+    def __init__(self, compact: bool):
+        self._compact = compact
+        self._typecodes = _stream_typecodes()
+        self._skeleton: List[str] = []
+        self._streams: List[Tuple[Samples, bool]] = []
+        self._rest = ""
+        # State of the data array being parsed
+        self._samples: Optional[Samples] = None
+        self._nested: Optional[bool] = None
+        self._convert: Any = None
+
+    def feed(self, text: str) -> None:
+        """Parse the next piece of the response text."""
+        text = self._rest + text
+        pos = 0
+        while True:
+            if self._samples is None:
+                pos, more = self._feed_skeleton(text, pos)
+            else:
+                pos, more = self._feed_samples(text, pos)
+            if more:
+                break
+        self._rest = text[pos:]
+
+    def close(self) -> Any:
+        """
+        Finish parsing.
+
+        Returns:
+            The response document, with ``data`` holding the parsed samples.
+
+        Raises:
+            ValueError: If the response ended inside a ``data`` array or is not JSON.
+        """
+        if self._samples is not None:
+            raise ValueError("stream response ended inside a data array")
+        self._skeleton.append(self._rest)
+        document = json.loads("".join(self._skeleton))
+        records = document.values() if isinstance(document, dict) else document
+        for record in records:
+            if isinstance(record, dict) and type(record.get("data")) is int:
+                samples, nested = self._streams[record["data"]]
+                if nested and not isinstance(samples, array):
+                    samples = samples_to_list(samples, 2)
+                record["data"] = samples
+        return document
+
+    def _feed_skeleton(self, text: str, pos: int) -> Tuple[int, bool]:
+        match = _DATA_START.search(text, pos)
+        if match is None:
+            keep = max(pos, len(text) - _DATA_START_TAIL)
+            self._skeleton.append(text[pos:keep])
+            return keep, True
+        self._skeleton.append(text[pos : match.start()])
+        self._start_samples()
+        self._skeleton.append(f'"data":{len(self._streams) - 1}')
+        return match.end(), False
+
+    def _start_samples(self) -> None:
+        # The stream type is the record's "type" field (Strava sends it before
+        # "data") or, with key_by_type, the key of the record
+        head = "".join(self._skeleton)
+        record_start = head.rfind("{")
+        match = _STREAM_TYPE.search(head, record_start + 1)
+        if match is None:
+            match = _KEYED_TYPE.search(head, 0, max(record_start, 0))
+        typecode = self._typecodes.get(match.group(1), "d") if match else None
+
+        if typecode is None:
+            # Type unknown: plain JSON values
+            self._samples, self._convert = [], json.loads
+        else:
+            bools = _COMPACT_BOOLS if self._compact else _BOOLS
+            converters = {"q": int, "d": float, "b": lambda token: bools[token.strip()]}
+            self._samples = array(typecode) if self._compact else []
+            self._convert = converters[typecode]
+        self._nested = None
+        self._streams.append((self._samples, False))
+
+    def _feed_samples(self, text: str, pos: int) -> Tuple[int, bool]:
+        if self._nested is None:
+            match = _NON_SPACE.search(text, pos)
+            if match is None:
+                return len(text), True
+            self._nested = text[match.start()] == "["
+            self._streams[-1] = (self._streams[-1][0], self._nested)
+
+        end = (_NESTED_END if self._nested else _FLAT_END).search(text, pos)
+        if end is None:
+            # Parse up to the last complete sample; a number may continue in the next chunk
+            cut = text.rfind(",", pos)
+            if cut == -1:
+                return pos, True
+            self._extend(text[pos:cut])
+            return cut + 1, True
+        self._extend(text[pos : end.start()])
+        self._samples = None
+        return end.end(), False
+
+    def _extend(self, text: str) -> None:
+        if self._nested:
+            text = text.replace("[", "").replace("]", "")
+        if not text.strip():
+            return
+        # int() and float() ignore the whitespace around each sample
+        tokens = text.split(",")
+        samples = self._samples
+        size = len(samples)  # type: ignore[arg-type]
+        try:
+            samples.extend(map(self._convert, tokens))  # type: ignore[union-attr]
+        except (KeyError, ValueError):
+            # e.g. null or fractional samples in an integer stream: keep JSON values
+            values = samples[:size]  # type: ignore[index]
+            values = values.tolist() if isinstance(values, array) else values
+            values.extend(map(json.loads, tokens))
+            self._samples, self._convert = values, json.loads
+            self._streams[-1] = (values, bool(self._nested))
+
+
+def parse_streams(chunks: Iterable[bytes], compact: bool = False, encoding: str = "utf-8") -> Any:
+    """
+    Parse a streams response body from its chunks.
+
+    Only one chunk and the samples parsed so far are held at a time, never
+    the whole body, its decoded text and the ``json.loads`` object graph.
+
+    Args:
+        chunks: Response body chunks.
+        compact: Keep samples in typed ``array`` buffers instead of lists.
+        encoding: Text encoding of the body.
+
+    Returns:
+        The response document, as ``json.loads`` would return it except for
+        the ``data`` of each stream when ``compact`` is set.
+    """
+    parser = _StreamsParser(compact)
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b"", final=True))
+    return parser.close()
+
+
+class StreamingRESTClient(RESTClient):
+    """
+    REST client reading stream responses incrementally with parse_streams.
+
+    Requests are sent with ``stream=True`` and each response body is parsed
+    chunk by chunk instead of through ``response.json()``; pagination,
+    hooks and data selectors work as in RESTClient.
+    """
+
+    def __init__(self, *args: Any, compact: bool = False, **kwargs: Any):
+        """
+        Initialize client.
+
+        Args:
+            *args: Arguments for RESTClient.
+            compact: Keep samples in typed ``array`` buffers (for Arrow items).
+            **kwargs: Keyword arguments for RESTClient.
+        """
+        super().__init__(*args, **kwargs)
+        self.compact = compact
+
+    def paginate(self, *args: Any, **kwargs: Any):  # type: ignore[override]
+        kwargs["stream"] = True
+        # Without a selector dlt would detect one from response.json()
+        kwargs["data_selector"] = kwargs.get("data_selector") or "$"
+        return super().paginate(*args, **kwargs)
+
+    def extract_response(self, response: Response, data_selector: jsonpath.TJsonPath) -> List[Any]:
+        try:
+            document = parse_streams(
+                response.iter_content(CHUNK_SIZE), self.compact, response.encoding or "utf-8"
+            )
+        finally:
+            response.close()
+        data: Any = jsonpath.find_values(data_selector, document)
+        data = data[0] if isinstance(data, list) and len(data) == 1 else data
+        if data is None:
+            return []
+        return data if isinstance(data, list) else [data]
@@ -0,0 +1,63 @@
+"""Typed list columns of the destination tables."""
+
+from typing import Dict, Iterable
+
+import dlt
+
+from ..config.settings import get_settings
+from ..strava_schema_contract import get_table_contract
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def convert_typed_list_columns(pipeline: dlt.Pipeline, table_names: Iterable[str]) -> int:
+    """
+    Convert the list columns of the schema contracts to typed DuckDB lists.
+
+    dlt creates list columns as JSON; every column whose contract has an
+    ``element_type`` and is still JSON in the destination is altered in place
+    to ``<element_type>[]`` (e.g. ``DOUBLE[]``, ``DOUBLE[2][]``). Later loads
+    insert into the typed column directly, so the conversion runs once per
+    column. Missing tables and columns are left for a later run. With
+    ``pipeline.flatten_nested`` the flattened list columns (achievements,
+    distribution buckets) are converted too.
+
+    Args:
+        pipeline: Pipeline whose destination dataset is altered.
+        table_names: Tables to check.
+
+    Returns:
+        Number of columns converted.
+    """
+    flatten = get_settings().pipeline.flatten_nested
+    pending: Dict[str, Dict[str, str]] = {}
+    for table_name in table_names:
+        contract = get_table_contract(table_name, flatten=flatten)
+        if contract is not None and contract.typed_list_columns:
+            pending[table_name] = contract.typed_list_columns
+    if not pending:
+        return 0
+
+    converted = 0
+    with pipeline.sql_client() as client:
+        for table_name, columns in pending.items():
+            rows = client.execute_sql(
+                "SELECT column_name, data_type FROM information_schema.columns "
+                "WHERE table_schema = %s AND table_name = %s",
+                client.dataset_name,
+                table_name,
+            ) or []
+            current_types = {row[0]: row[1] for row in rows}
+            qualified_name = client.make_qualified_table_name(table_name)
+            for column_name, db_type in columns.items():
+                if current_types.get(column_name) != "JSON":
+                    continue
+                column = client.escape_column_name(column_name)
+                client.execute_sql(
+                    f"ALTER TABLE {qualified_name} ALTER COLUMN {column} "
+                    f"SET DATA TYPE {db_type} USING CAST({column} AS {db_type})"
+                )
+                converted += 1
+                logger.info(f"Converted {table_name}.{column_name} from JSON to {db_type}")
+    return converted
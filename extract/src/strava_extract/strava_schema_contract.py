@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import cached_property
 from typing import Any, Mapping
 
 
@@ -14,6 +15,20 @@ class ColumnContract:
     default: Any = None
     timezone: bool | None = None
     is_system: bool = False
+    # DuckDB element type of a typed list column (e.g. "double", "double[2]").
+    # dlt has no list type: the column is declared json and converted to
+    # `<element_type>[]` in the destination after it is created.
+    element_type: str | None = None
+    # Path of a flattened column in the raw record, e.g. ("segment", "id") or
+    # ("start_latlng", 0); "*" maps the rest of the path over a list, which
+    # makes the column a typed list.
+    source: tuple[str | int, ...] | None = None
+
+    @property
+    def db_type(self) -> str | None:
+        if self.element_type is None:
+            return None
+        return f"{self.element_type.upper()}[]"
 
     def to_dlt_column(self) -> dict[str, Any]:
         column: dict[str, Any] = {
@@ -26,10 +41,32 @@ class ColumnContract:
         return column
 
 
+@dataclass(frozen=True)
+class ListSplit:
+    """Route a list field into the typed list column matching its record's kind."""
+
+    source: str
+    kind_field: str
+    columns: Mapping[str, str]
+    default_column: str
+
+    def column_for(self, record: Mapping[str, Any]) -> str:
+        kind = record.get(self.kind_field)
+        if kind is None:
+            return self.default_column
+        return self.columns.get(kind, self.default_column)
+
+    @property
+    def target_columns(self) -> frozenset[str]:
+        return frozenset(self.columns.values()) | {self.default_column}
+
+
 @dataclass(frozen=True)
 class TableContract:
     name: str
     columns: tuple[ColumnContract, ...]
+    list_split: ListSplit | None = None
+    is_flattened: bool = False
 
     def to_dlt_columns(self) -> list[dict[str, Any]]:
         return [column.to_dlt_column() for column in self.columns]
@@ -38,6 +75,67 @@ class TableContract:
     def column_names(self) -> set[str]:
         return {column.name for column in self.columns}
 
+    # Loaded columns compiled once per contract for normalization.
+    @cached_property
+    def fields(self) -> tuple[tuple[str, Any], ...]:
+        return tuple(
+            (column.name, column.default)
+            for column in self.columns
+            if not column.is_system and column.source is None
+        )
+
+    @cached_property
+    def paths(self) -> tuple[tuple[str, tuple[str | int, ...]], ...]:
+        return tuple(
+            (column.name, column.source)
+            for column in self.columns
+            if column.source is not None
+        )
+
+    @cached_property
+    def field_names(self) -> frozenset[str]:
+        return frozenset(name for name, _ in self.fields) | {name for name, _ in self.paths}
+
+    @cached_property
+    def field_defaults(self) -> dict[str, Any]:
+        return {**dict(self.fields), **{name: None for name, _ in self.paths}}
+
+    @cached_property
+    def flattened(self) -> TableContract:
+        """Contract with its nested JSON columns replaced by FLATTENED_COLUMNS."""
+        flat = FLATTENED_COLUMNS.get(self.name)
+        if not flat:
+            return self
+        columns: list[ColumnContract] = []
+        for column in self.columns:
+            columns.extend(flat.get(column.name, (column,)))
+        return replace(self, columns=tuple(columns), is_flattened=True)
+
+    @property
+    def typed_list_columns(self) -> dict[str, str]:
+        return {
+            column.name: column.db_type
+            for column in self.columns
+            if column.db_type is not None
+        }
+
+
+# Column holding the samples of every Strava stream type, by element type.
+# latlng samples are [lat, lng] pairs; unknown types fall back to doubles.
+STREAM_DATA_COLUMNS: dict[str, str] = {
+    "time": "data_bigint",
+    "distance": "data_double",
+    "latlng": "data_latlng",
+    "altitude": "data_double",
+    "velocity_smooth": "data_double",
+    "heartrate": "data_bigint",
+    "cadence": "data_bigint",
+    "watts": "data_bigint",
+    "temp": "data_bigint",
+    "moving": "data_bool",
+    "grade_smooth": "data_double",
+}
+
 
 SCHEMA_CONTRACTS: dict[str, TableContract] = {
     "activities": TableContract(
@@ -123,6 +221,43 @@ SCHEMA_CONTRACTS: dict[str, TableContract] = {
             ColumnContract(name="max_heartrate", data_type="double", nullable=True),
         ),
     ),
+    "activity_details": TableContract(
+        name="activity_details",
+        columns=(
+            ColumnContract(name="id", data_type="bigint", nullable=False),
+            ColumnContract(name="resource_state", data_type="bigint", nullable=True),
+            ColumnContract(name="description", data_type="text", nullable=True),
+            ColumnContract(name="calories", data_type="double", nullable=True),
+            ColumnContract(name="device_name", data_type="text", nullable=True),
+            ColumnContract(name="embed_token", data_type="text", nullable=True),
+            ColumnContract(name="map", data_type="json", nullable=True),
+            ColumnContract(name="gear", data_type="json", nullable=True),
+            ColumnContract(name="photos", data_type="json", nullable=True),
+            ColumnContract(name="splits_standard", data_type="json", nullable=True),
+            ColumnContract(name="available_zones", data_type="json", nullable=True),
+            ColumnContract(name="average_cadence", data_type="double", nullable=True),
+            ColumnContract(name="average_temp", data_type="double", nullable=True),
+            ColumnContract(name="weighted_average_watts", data_type="bigint", nullable=True),
+            ColumnContract(name="max_watts", data_type="bigint", nullable=True),
+            ColumnContract(name="perceived_exertion", data_type="double", nullable=True),
+            ColumnContract(name="prefer_perceived_exertion", data_type="bool", nullable=True),
+            ColumnContract(name="hide_from_home", data_type="bool", nullable=True),
+            ColumnContract(name="segment_leaderboard_opt_out", data_type="bool", nullable=True),
+            ColumnContract(name="leaderboard_opt_out", data_type="bool", nullable=True),
+            ColumnContract(
+                name="_dlt_load_id",
+                data_type="text",
+                nullable=False,
+                is_system=True,
+            ),
+            ColumnContract(
+                name="_dlt_id",
+                data_type="text",
+                nullable=False,
+                is_system=True,
+            ),
+        ),
+    ),
     "activity_segment_efforts": TableContract(
         name="activity_segment_efforts",
         columns=(
@@ -170,11 +305,154 @@ SCHEMA_CONTRACTS: dict[str, TableContract] = {
             ColumnContract(name="max_heartrate", data_type="double", nullable=True),
         ),
     ),
+    "activity_laps": TableContract(
+        name="activity_laps",
+        columns=(
+            ColumnContract(name="id", data_type="bigint", nullable=False),
+            ColumnContract(name="resource_state", data_type="bigint", nullable=True),
+            ColumnContract(name="name", data_type="text", nullable=True),
+            ColumnContract(name="activity", data_type="json", nullable=True),
+            ColumnContract(name="athlete", data_type="json", nullable=True),
+            ColumnContract(name="elapsed_time", data_type="bigint", nullable=True),
+            ColumnContract(name="moving_time", data_type="bigint", nullable=True),
+            ColumnContract(
+                name="start_date",
+                data_type="timestamp",
+                nullable=True,
+            ),
+            ColumnContract(
+                name="start_date_local",
+                data_type="timestamp",
+                nullable=True,
+            ),
+            ColumnContract(name="distance", data_type="double", nullable=True),
+            ColumnContract(name="start_index", data_type="bigint", nullable=True),
+            ColumnContract(name="end_index", data_type="bigint", nullable=True),
+            ColumnContract(name="lap_index", data_type="bigint", nullable=True),
+            ColumnContract(name="split", data_type="bigint", nullable=True),
+            ColumnContract(name="total_elevation_gain", data_type="double", nullable=True),
+            ColumnContract(name="average_speed", data_type="double", nullable=True),
+            ColumnContract(name="max_speed", data_type="double", nullable=True),
+            ColumnContract(name="average_cadence", data_type="double", nullable=True),
+            ColumnContract(name="device_watts", data_type="bool", nullable=True),
+            ColumnContract(name="average_watts", data_type="double", nullable=True),
+            ColumnContract(name="average_heartrate", data_type="double", nullable=True),
+            ColumnContract(name="max_heartrate", data_type="double", nullable=True),
+            ColumnContract(name="pace_zone", data_type="bigint", nullable=True),
+            ColumnContract(name="_activities_id", data_type="bigint", nullable=False),
+            ColumnContract(
+                name="_dlt_load_id",
+                data_type="text",
+                nullable=False,
+                is_system=True,
+            ),
+            ColumnContract(
+                name="_dlt_id",
+                data_type="text",
+                nullable=False,
+                is_system=True,
+            ),
+        ),
+    ),
+    "activity_splits": TableContract(
+        name="activity_splits",
+        columns=(
+            ColumnContract(name="split", data_type="bigint", nullable=False),
+            ColumnContract(name="distance", data_type="double", nullable=True),
+            ColumnContract(name="elapsed_time", data_type="bigint", nullable=True),
+            ColumnContract(name="moving_time", data_type="bigint", nullable=True),
+            ColumnContract(name="elevation_difference", data_type="double", nullable=True),
+            ColumnContract(name="average_speed", data_type="double", nullable=True),
+            ColumnContract(
+                name="average_grade_adjusted_speed",
+                data_type="double",
+                nullable=True,
+            ),
+            ColumnContract(name="average_heartrate", data_type="double", nullable=True),
+            ColumnContract(name="pace_zone", data_type="bigint", nullable=True),
+            ColumnContract(name="_activities_id", data_type="bigint", nullable=False),
+            ColumnContract(
+                name="_dlt_load_id",
+                data_type="text",
+                nullable=False,
+                is_system=True,
+            ),
+            ColumnContract(
+                name="_dlt_id",
+                data_type="text",
+                nullable=False,
+                is_system=True,
+            ),
+        ),
+    ),
+    "activity_best_efforts": TableContract(
+        name="activity_best_efforts",
+        columns=(
+            ColumnContract(name="id", data_type="bigint", nullable=False),
+            ColumnContract(name="resource_state", data_type="bigint", nullable=True),
+            ColumnContract(name="name", data_type="text", nullable=True),
+            ColumnContract(name="activity", data_type="json", nullable=True),
+            ColumnContract(name="athlete", data_type="json", nullable=True),
+            ColumnContract(name="elapsed_time", data_type="bigint", nullable=True),
+            ColumnContract(name="moving_time", data_type="bigint", nullable=True),
+            ColumnContract(
+                name="start_date",
+                data_type="timestamp",
+                nullable=True,
+            ),
+            ColumnContract(
+                name="start_date_local",
+                data_type="timestamp",
+                nullable=True,
+            ),
+            ColumnContract(name="distance", data_type="double", nullable=True),
+            ColumnContract(name="start_index", data_type="bigint", nullable=True),
+            ColumnContract(name="end_index", data_type="bigint", nullable=True),
+            ColumnContract(name="pr_rank", data_type="bigint", nullable=True),
+            ColumnContract(name="achievements", data_type="json", nullable=True),
+            ColumnContract(name="_activities_id", data_type="bigint", nullable=False),
+            ColumnContract(
+                name="_dlt_load_id",
+                data_type="text",
+                nullable=False,
+                is_system=True,
+            ),
+            ColumnContract(
+                name="_dlt_id",
+                data_type="text",
+                nullable=False,
+                is_system=True,
+            ),
+        ),
+    ),
     "activity_streams": TableContract(
         name="activity_streams",
         columns=(
             ColumnContract(name="type", data_type="text", nullable=False),
-            ColumnContract(name="data", data_type="json", nullable=True),
+            ColumnContract(
+                name="data_bigint",
+                data_type="json",
+                nullable=True,
+                element_type="bigint",
+            ),
+            ColumnContract(
+                name="data_double",
+                data_type="json",
+                nullable=True,
+                element_type="double",
+            ),
+            ColumnContract(
+                name="data_latlng",
+                data_type="json",
+                nullable=True,
+                element_type="double[2]",
+            ),
+            ColumnContract(
+                name="data_bool",
+                data_type="json",
+                nullable=True,
+                element_type="boolean",
+            ),
             ColumnContract(name="series_type", data_type="text", nullable=True),
             ColumnContract(name="original_size", data_type="bigint", nullable=True),
             ColumnContract(name="resolution", data_type="text", nullable=True),
@@ -192,6 +470,12 @@ SCHEMA_CONTRACTS: dict[str, TableContract] = {
                 is_system=True,
             ),
         ),
+        list_split=ListSplit(
+            source="data",
+            kind_field="type",
+            columns=STREAM_DATA_COLUMNS,
+            default_column="data_double",
+        ),
     ),
     "activity_zones": TableContract(
         name="activity_zones",
@@ -221,8 +505,122 @@ SCHEMA_CONTRACTS: dict[str, TableContract] = {
 }
 
 
-def get_table_contract(table_name: str) -> TableContract | None:
-    return SCHEMA_CONTRACTS.get(table_name)
+def _flat(
+    name: str,
+    data_type: str,
+    source: tuple[str | int, ...],
+    element_type: str | None = None,
+) -> ColumnContract:
+    return ColumnContract(
+        name=name,
+        data_type=data_type,
+        nullable=True,
+        source=source,
+        element_type=element_type,
+    )
+
+
+def _latlng(name: str, source: tuple[str | int, ...]) -> tuple[ColumnContract, ...]:
+    return (
+        _flat(f"{name}__lat", "double", (*source, 0)),
+        _flat(f"{name}__lng", "double", (*source, 1)),
+    )
+
+
+_ATHLETE = (_flat("athlete__id", "bigint", ("athlete", "id")),)
+_ACTIVITY = (_flat("activity__id", "bigint", ("activity", "id")),)
+_ACHIEVEMENTS = (
+    _flat("achievements__type_id", "json", ("achievements", "*", "type_id"), "bigint"),
+    _flat("achievements__type", "json", ("achievements", "*", "type"), "varchar"),
+    _flat("achievements__rank", "json", ("achievements", "*", "rank"), "bigint"),
+)
+_MAP = (
+    _flat("map__id", "text", ("map", "id")),
+    _flat("map__summary_polyline", "text", ("map", "summary_polyline")),
+)
+
+# Typed columns replacing nested JSON columns when pipeline.flatten_nested is
+# set, per table and JSON column. Arrays of objects become parallel typed lists.
+FLATTENED_COLUMNS: dict[str, dict[str, tuple[ColumnContract, ...]]] = {
+    "activities": {
+        "athlete": _ATHLETE,
+        "map": _MAP,
+        "start_latlng": _latlng("start_latlng", ("start_latlng",)),
+        "end_latlng": _latlng("end_latlng", ("end_latlng",)),
+    },
+    "activity_details": {
+        # The detailed map also carries the full-resolution polyline
+        "map": (*_MAP, _flat("map__polyline", "text", ("map", "polyline"))),
+    },
+    "activity_segment_efforts": {
+        "activity": _ACTIVITY,
+        "athlete": _ATHLETE,
+        "segment": (
+            _flat("segment__id", "bigint", ("segment", "id")),
+            _flat("segment__name", "text", ("segment", "name")),
+            _flat("segment__activity_type", "text", ("segment", "activity_type")),
+            _flat("segment__distance", "double", ("segment", "distance")),
+            _flat("segment__average_grade", "double", ("segment", "average_grade")),
+            _flat("segment__maximum_grade", "double", ("segment", "maximum_grade")),
+            _flat("segment__elevation_high", "double", ("segment", "elevation_high")),
+            _flat("segment__elevation_low", "double", ("segment", "elevation_low")),
+            _flat("segment__climb_category", "bigint", ("segment", "climb_category")),
+            _flat("segment__city", "text", ("segment", "city")),
+            _flat("segment__state", "text", ("segment", "state")),
+            _flat("segment__country", "text", ("segment", "country")),
+            *_latlng("segment__start_latlng", ("segment", "start_latlng")),
+            *_latlng("segment__end_latlng", ("segment", "end_latlng")),
+            _flat("segment__private", "bool", ("segment", "private")),
+            _flat("segment__hazardous", "bool", ("segment", "hazardous")),
+            _flat("segment__starred", "bool", ("segment", "starred")),
+        ),
+        "achievements": _ACHIEVEMENTS,
+    },
+    "activity_laps": {
+        "activity": _ACTIVITY,
+        "athlete": _ATHLETE,
+    },
+    "activity_best_efforts": {
+        "activity": _ACTIVITY,
+        "athlete": _ATHLETE,
+        "achievements": _ACHIEVEMENTS,
+    },
+    "activity_zones": {
+        "distribution_buckets": tuple(
+            _flat(
+                f"distribution_buckets__{field}",
+                "json",
+                ("distribution_buckets", "*", field),
+                "double",
+            )
+            for field in ("min", "max", "time")
+        ),
+    },
+}
+
+
+def get_table_contract(table_name: str, flatten: bool = False) -> TableContract | None:
+    contract = SCHEMA_CONTRACTS.get(table_name)
+    if contract is not None and flatten:
+        return contract.flattened
+    return contract
+
+
+def extract_path(value: Any, path: tuple[str | int, ...]) -> Any:
+    """Follow a flattened column's source path; missing steps give None."""
+    for index, key in enumerate(path):
+        if value is None:
+            return None
+        if key == "*":
+            if not isinstance(value, list):
+                return None
+            rest = path[index + 1 :]
+            return [extract_path(item, rest) for item in value]
+        try:
+            value = value[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return value
 
 
 def normalize_record(record: Any, contract: TableContract) -> Any:
@@ -230,14 +628,47 @@ def normalize_record(record: Any, contract: TableContract) -> Any:
         return record
 
     normalized: dict[str, Any] = {}
-    # Unknown fields are ignored by only copying contract-defined columns.
-    for column in contract.columns:
-        if column.is_system:
-            continue
-        if column.name in record:
-            normalized[column.name] = record[column.name]
-        else:
-            # Inject explicit defaults (None when no default exists) for missing fields.
-            normalized[column.name] = column.default
+    # Unknown fields are ignored by only copying contract-defined columns;
+    # missing fields get explicit defaults (None when no default exists).
+    for name, default in contract.fields:
+        normalized[name] = record.get(name, default)
+    for name, path in contract.paths:
+        normalized[name] = extract_path(record, path)
+
+    split = contract.list_split
+    if split is not None and record.get(split.source) is not None:
+        normalized[split.column_for(record)] = record[split.source]
 
     return normalized
+
+
+def normalize_page(records: list[Any], contract: TableContract) -> list[Any]:
+    """
+    Normalize a page of records like normalize_record, trimming dicts in place.
+
+    Dropping the few unknown fields and adding the missing ones is much
+    cheaper than building a new dict per record; records are not used after
+    normalization, so they are modified rather than copied.
+    """
+    names = contract.field_names
+    defaults = contract.field_defaults
+    paths = contract.paths
+    split = contract.list_split
+    for index, record in enumerate(records):
+        if type(record) is not dict:
+            records[index] = normalize_record(record, contract)
+            continue
+        data = record.get(split.source) if split is not None else None
+        # Flattened values are read before their source columns are dropped
+        flat = [(name, extract_path(record, path)) for name, path in paths] if paths else None
+        for name in record.keys() - names:
+            del record[name]
+        if flat:
+            record.update(flat)
+        if len(record) < len(names):
+            for name in names - record.keys():
+                record[name] = defaults[name]
+        if data is not None and split is not None:
+            record[split.column_for(record)] = data
+
+    return records
@@ -0,0 +1,295 @@
+"""Durable local queue of Strava push subscription events."""
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from ..config.settings import get_settings
+from ..utils.exceptions import ValidationError
+
+OBJECT_TYPES = ("activity", "athlete")
+ASPECT_TYPES = ("create", "update", "delete")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    object_type TEXT NOT NULL,
+    object_id INTEGER NOT NULL,
+    aspect_type TEXT NOT NULL,
+    owner_id INTEGER,
+    subscription_id INTEGER,
+    event_time INTEGER NOT NULL,
+    updates TEXT NOT NULL,
+    received_at REAL NOT NULL,
+    drained_at REAL,
+    UNIQUE (object_type, object_id, aspect_type, event_time, updates)
+);
+CREATE INDEX IF NOT EXISTS events_pending ON events (drained_at, seq);
+"""
+
+
+@dataclass(frozen=True)
+class WebhookEvent:
+    """One queued push event."""
+
+    seq: int
+    object_type: str
+    object_id: int
+    aspect_type: str
+    owner_id: Optional[int]
+    subscription_id: Optional[int]
+    event_time: int
+    updates: Dict[str, Any]
+
+    @property
+    def is_deauthorization(self) -> bool:
+        """Whether the athlete revoked the application's access."""
+        return (
+            self.object_type == "athlete"
+            and str(self.updates.get("authorized", "")).lower() == "false"
+        )
+
+
+@dataclass
+class DrainBatch:
+    """
+    Queued events reduced to the work they cause.
+
+    An activity with a delete event is only deleted; any other activity event
+    fetches the activity once, however many events it has. Activity events of
+    an owner who later deauthorized the application are dropped (the token no
+    longer works), including a deauthorization queued in a later batch.
+    """
+
+    events: List[WebhookEvent] = field(default_factory=list)
+    fetch_ids: List[int] = field(default_factory=list)
+    delete_ids: List[int] = field(default_factory=list)
+    deauthorized_owners: List[int] = field(default_factory=list)
+
+    @property
+    def seqs(self) -> List[int]:
+        """Queue sequence numbers of the events in the batch."""
+        return [event.seq for event in self.events]
+
+    @staticmethod
+    def deauthorizations(events: List[WebhookEvent]) -> Dict[int, int]:
+        """
+        Get the owners who deauthorized the application.
+
+        Args:
+            events: Events in queue order.
+
+        Returns:
+            Owner ID -> event time of their last deauthorization.
+        """
+        deauthorized: Dict[int, int] = {}
+        for event in events:
+            if event.is_deauthorization and event.owner_id is not None:
+                deauthorized[event.owner_id] = max(
+                    event.event_time, deauthorized.get(event.owner_id, event.event_time)
+                )
+        return deauthorized
+
+    @classmethod
+    def from_events(
+        cls, events: List[WebhookEvent], deauthorized: Optional[Dict[int, int]] = None
+    ) -> "DrainBatch":
+        """
+        Reduce queued events to the activities to fetch and delete.
+
+        Args:
+            events: Events in queue order.
+            deauthorized: Deauthorizations of all pending events, when the batch
+                is part of them. Defaults to those among ``events``.
+
+        Returns:
+            Batch holding the events and their activity IDs in first-seen order.
+        """
+        if deauthorized is None:
+            deauthorized = cls.deauthorizations(events)
+
+        actions: Dict[int, str] = {}
+        for event in events:
+            if event.object_type != "activity":
+                continue
+            revoked_at = deauthorized.get(event.owner_id) if event.owner_id is not None else None
+            if revoked_at is not None and event.event_time <= revoked_at:
+                continue
+            if event.aspect_type == "delete" or actions.get(event.object_id) == "delete":
+                actions[event.object_id] = "delete"
+            else:
+                actions[event.object_id] = "fetch"
+
+        return cls(
+            events=events,
+            fetch_ids=[activity_id for activity_id, action in actions.items() if action == "fetch"],
+            delete_ids=[activity_id for activity_id, action in actions.items() if action == "delete"],
+            deauthorized_owners=sorted(cls.deauthorizations(events)),
+        )
+
+
+def _required_int(event: Mapping[str, Any], name: str) -> int:
+    value = event.get(name)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValidationError(f"Webhook event field '{name}' must be an integer, got {value!r}")
+    try:
+        return int(value)
+    except ValueError as e:
+        raise ValidationError(
+            f"Webhook event field '{name}' must be an integer, got {value!r}"
+        ) from e
+
+
+def _optional_int(event: Mapping[str, Any], name: str) -> Optional[int]:
+    return None if event.get(name) is None else _required_int(event, name)
+
+
+class EventQueue:
+    """
+    SQLite queue of push events shared by the receiver and the drain.
+
+    Events are appended as they arrive and stay in the queue until a drain
+    has loaded their activities, so a failed or rate limited drain leaves
+    them pending for the next one. Redelivered events (Strava retries
+    unacknowledged ones) are stored once. The database runs in WAL mode, so
+    the receiver keeps appending while a drain reads.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize queue, creating the database if needed.
+
+        Args:
+            path: SQLite database file.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
+
+    def append(self, event: Mapping[str, Any]) -> bool:
+        """
+        Append a push event.
+
+        Args:
+            event: Event body as sent by Strava.
+
+        Returns:
+            False if the event was already queued.
+
+        Raises:
+            ValidationError: If the event is not a Strava push event.
+        """
+        object_type = event.get("object_type")
+        aspect_type = event.get("aspect_type")
+        if object_type not in OBJECT_TYPES or aspect_type not in ASPECT_TYPES:
+            raise ValidationError(
+                f"Unsupported webhook event {object_type!r}/{aspect_type!r}"
+            )
+        updates = event.get("updates") or {}
+        if not isinstance(updates, dict):
+            raise ValidationError(f"Webhook event updates must be an object, got {updates!r}")
+        row = (
+            object_type,
+            _required_int(event, "object_id"),
+            aspect_type,
+            _optional_int(event, "owner_id"),
+            _optional_int(event, "subscription_id"),
+            _required_int(event, "event_time"),
+            json.dumps(updates, sort_keys=True, separators=(",", ":")),
+            time.time(),
+        )
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO events (object_type, object_id, aspect_type, owner_id, "
+                "subscription_id, event_time, updates, received_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+        return cursor.rowcount == 1
+
+    def pending(self, limit: Optional[int] = None) -> List[WebhookEvent]:
+        """
+        Get the events not drained yet, oldest first.
+
+        Args:
+            limit: Maximum number of events.
+
+        Returns:
+            Pending events.
+        """
+        query = (
+            "SELECT seq, object_type, object_id, aspect_type, owner_id, subscription_id, "
+            "event_time, updates FROM events WHERE drained_at IS NULL ORDER BY seq"
+        )
+        params: tuple = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [
+            WebhookEvent(
+                seq=seq,
+                object_type=object_type,
+                object_id=object_id,
+                aspect_type=aspect_type,
+                owner_id=owner_id,
+                subscription_id=subscription_id,
+                event_time=event_time,
+                updates=json.loads(updates),
+            )
+            for (
+                seq, object_type, object_id, aspect_type, owner_id, subscription_id,
+                event_time, updates,
+            ) in rows
+        ]
+
+    def pending_count(self) -> int:
+        """Get the number of events not drained yet."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT COUNT(*) FROM events WHERE drained_at IS NULL"
+            ).fetchone()
+        return int(row[0])
+
+    def mark_drained(self, seqs: List[int], retain_days: Optional[int] = None) -> None:
+        """
+        Mark events as drained, optionally deleting old drained events.
+
+        Args:
+            seqs: Queue sequence numbers of the drained events.
+            retain_days: Delete events drained more than this many days ago.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "UPDATE events SET drained_at = ? WHERE seq = ?", [(now, seq) for seq in seqs]
+            )
+            if retain_days is not None:
+                self._connection.execute(
+                    "DELETE FROM events WHERE drained_at < ?", (now - retain_days * 86400,)
+                )
+
+
+def open_event_queue(path: Optional[str] = None) -> EventQueue:
+    """
+    Open the configured event queue.
+
+    Args:
+        path: SQLite database file. Defaults from config.
+
+    Returns:
+        EventQueue instance.
+    """
+    return EventQueue(path or get_settings().webhooks.queue_path)
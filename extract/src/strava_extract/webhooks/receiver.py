@@ -0,0 +1,151 @@
+"""HTTP receiver for Strava push subscription events."""
+
+import hmac
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from ..config.settings import WebhookConfig, get_settings
+from ..utils.exceptions import ValidationError
+from ..utils.logging import get_logger
+from .event_queue import EventQueue, open_event_queue
+
+logger = get_logger(__name__)
+
+# Push events are a few hundred bytes
+MAX_EVENT_BYTES = 64 * 1024
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server appending Strava push events to an event queue.
+
+    ``GET <callback_path>`` answers the subscription validation request
+    (``hub.challenge`` echoed back when ``hub.verify_token`` matches) and
+    ``POST <callback_path>`` queues the event and acknowledges it at once;
+    Strava expects a 200 within two seconds, so nothing is fetched here.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], queue: EventQueue, config: WebhookConfig):
+        """
+        Initialize server.
+
+        Args:
+            address: (host, port) to listen on; port 0 picks a free port.
+            queue: Queue the events are appended to.
+            config: Webhook settings (callback path, verify token, subscription ID).
+        """
+        super().__init__(address, WebhookHandler)
+        self.queue = queue
+        self.config = config
+
+    @property
+    def url(self) -> str:
+        """Get the callback URL of the server."""
+        host, port = self.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}{self.config.callback_path}"
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Request handler of the webhook receiver."""
+
+    server: WebhookServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log requests at debug level."""
+        logger.debug(f"Webhook request from {self.address_string()}: {format % args}")
+
+    def _send(self, status: int, body: Optional[Any] = None) -> None:
+        payload = json.dumps(body if body is not None else {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        """Answer the subscription validation request."""
+        parts = urlsplit(self.path)
+        if parts.path != self.server.config.callback_path:
+            self._send(404, {"message": "Not Found"})
+            return
+        query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        expected = self.server.config.verify_token
+        token = query.get("hub.verify_token", "")
+        if (
+            query.get("hub.mode") != "subscribe"
+            or "hub.challenge" not in query
+            or expected is None
+            or not hmac.compare_digest(token, expected.get_secret_value())
+        ):
+            logger.warning("Rejected webhook subscription validation request")
+            self._send(403, {"message": "Forbidden"})
+            return
+        logger.info("Webhook subscription validated")
+        self._send(200, {"hub.challenge": query["hub.challenge"]})
+
+    def do_POST(self) -> None:
+        """Queue a push event."""
+        if urlsplit(self.path).path != self.server.config.callback_path:
+            self._send(404, {"message": "Not Found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_EVENT_BYTES:
+            self._send(413, {"message": "Payload Too Large"})
+            return
+        try:
+            event = json.loads(self.rfile.read(length) or b"null")
+            if not isinstance(event, dict):
+                raise ValidationError(f"Webhook event must be an object, got {event!r}")
+            subscription_id = self.server.config.subscription_id
+            if subscription_id is not None and event.get("subscription_id") != subscription_id:
+                raise ValidationError(
+                    f"Webhook event of unknown subscription {event.get('subscription_id')!r}"
+                )
+            queued = self.server.queue.append(event)
+        except (ValueError, ValidationError) as e:
+            logger.warning(f"Rejected webhook event: {e}")
+            self._send(400, {"message": "Bad Request"})
+            return
+
+        logger.info(
+            f"Webhook event {event['object_type']} {event['object_id']} {event['aspect_type']} "
+            f"{'queued' if queued else 'already queued'}"
+        )
+        self._send(200)
+
+
+def serve_webhooks(
+    queue: Optional[EventQueue] = None,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+) -> WebhookServer:
+    """
+    Create the webhook receiver from the ``webhooks`` settings.
+
+    Args:
+        queue: Event queue. Defaults to the configured queue.
+        host: Interface to listen on. Defaults from config.
+        port: Port to listen on (0 picks a free port). Defaults from config.
+
+    Returns:
+        The server, not started yet (run it with ``serve_forever()``).
+    """
+    config = get_settings().webhooks
+    if config.verify_token is None:
+        logger.warning(
+            "webhooks.verify_token is not set; subscription validation requests will be rejected"
+        )
+    server = WebhookServer(
+        (host or config.host, config.port if port is None else port),
+        queue or open_event_queue(),
+        config,
+    )
+    logger.info(f"Webhook receiver listening on {server.url} (queue {server.queue.path})")
+    return server
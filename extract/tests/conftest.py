@@ -0,0 +1,119 @@
+"""Shared fixtures: isolated settings and a local fake Strava API."""
+
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import duckdb
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+import fake_strava
+from fake_strava import API_PREFIX, RateLimits, SyntheticAthletes
+
+from strava_extract.client import http_archive
+from strava_extract.config.settings import Settings, get_settings, reset_settings
+from strava_extract.sources.strava_source import reset_rate_limiter
+
+
+@pytest.fixture
+def settings(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Settings]:
+    """Settings whose state, cache, queue and database files live in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DUCKDB_PATH", str(tmp_path / "strava.duckdb"))
+    monkeypatch.setenv("DLT_DATA_DIR", str(tmp_path / "dlt"))
+    monkeypatch.setenv("CREDENTIALS__CLIENT_ID", "1")
+    monkeypatch.setenv("CREDENTIALS__CLIENT_SECRET", "fake")
+    monkeypatch.setenv("CREDENTIALS__REFRESH_TOKEN", "athlete-0")
+    monkeypatch.setenv("CREDENTIALS__ACCESS_TOKEN_URL", "http://127.0.0.1:9/oauth/token")
+    reset_settings()
+    reset_rate_limiter()
+    monkeypatch.setattr(http_archive, "_http_archive", None)
+
+    config = get_settings()
+    config.telemetry.enabled = False
+    config.rate_limiting.show_progress_bar = False
+    config.logging.log_file = None
+    config.rate_limiting.state_file = str(tmp_path / "rate_limit_state.json")
+    config.auth.token_cache_file = str(tmp_path / "token_cache.json")
+    config.backfill.state_file = str(tmp_path / "backfill_state.json")
+    config.webhooks.queue_path = str(tmp_path / "webhook_events.sqlite")
+    yield config
+
+    reset_rate_limiter()
+    reset_settings()
+
+
+class FakeStrava:
+    """A running fake Strava API the settings point at."""
+
+    def __init__(self, server: fake_strava.FakeStravaServer):
+        self.server = server
+        self.data: SyntheticAthletes = server.data
+
+    @property
+    def url(self) -> str:
+        """Get the base URL of the server."""
+        return self.server.url
+
+    def stats(self) -> Dict[str, int]:
+        """Get the requests served per endpoint."""
+        with self.server.stats_lock:
+            return dict(self.server.stats)
+
+    def reset_stats(self) -> None:
+        """Forget the requests served so far."""
+        with self.server.stats_lock:
+            self.server.stats.clear()
+
+    def activities(self, athlete: int = 0) -> list:
+        """Get the activities of an athlete, oldest first."""
+        return self.server.data.list_activities(athlete, None, None, 1, 1_000_000)
+
+
+@pytest.fixture
+def fake_api(
+    settings: Settings, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[Callable[..., FakeStrava]]:
+    """
+    Start fake Strava APIs and point the settings at the last one started.
+
+    Call it with the synthetic data options (``activities=...``) or ``data``,
+    and optional ``limits``; short activities keep the streams small.
+    """
+    servers = []
+
+    def start(
+        limits: Optional[RateLimits] = None,
+        data: Optional[SyntheticAthletes] = None,
+        **data_options: Any,
+    ) -> FakeStrava:
+        if data is None:
+            data_options.setdefault("activities", 5)
+            data_options.setdefault("min_seconds", 60)
+            data_options.setdefault("max_seconds", 120)
+            data = SyntheticAthletes(**data_options)
+        server = fake_strava.serve(data, limits=limits)
+        servers.append(server)
+        monkeypatch.setenv("CREDENTIALS__ACCESS_TOKEN_URL", f"{server.url}/oauth/token")
+        settings.api.base_url = f"{server.url}{API_PREFIX}"
+        return FakeStrava(server)
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def db(settings: Settings) -> Callable[[str], list]:
+    """Run read-only queries against the test database."""
+
+    def run(sql: str) -> list:
+        with duckdb.connect(os.environ["DUCKDB_PATH"], read_only=True) as connection:
+            return connection.execute(sql).fetchall()
+
+    return run
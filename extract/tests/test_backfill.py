@@ -0,0 +1,75 @@
+"""Tests for splitting a backfill plan into chunks."""
+
+from datetime import datetime
+
+from strava_extract.backfill import BackfillRunner, BackfillState
+
+START = "2024-01-01"
+END = "2024-01-02"
+
+
+def _state(*activities) -> BackfillState:
+    return BackfillState(start_date=START, end_date=END, page_size=200, activities=list(activities))
+
+
+def _chunks(state: BackfillState, budget: int):
+    runner = BackfillRunner(start_date=START, end_date=END)
+    chunks = []
+    while not state.done:
+        chunk = runner.next_chunk(state, budget)
+        assert chunk is not None
+        chunks.append(chunk[:2])
+        state.next_index = chunk[2]
+    return chunks
+
+
+def _listed(start_date: str, after: str, before: str) -> bool:
+    # Strava's `after` and `before` are both exclusive
+    moment = datetime.fromisoformat(start_date.rstrip("Z"))
+    return datetime.fromisoformat(after) < moment < datetime.fromisoformat(before)
+
+
+def test_chunks_list_every_activity_exactly_once(settings):
+    # One second apart, so a chunk boundary falls between each pair
+    activities = [(f"2024-01-01T10:00:0{second}Z", 2) for second in range(6)]
+
+    chunks = _chunks(_state(*activities), budget=3)
+
+    assert len(chunks) == 6
+    for start_date, _ in activities:
+        assert sum(_listed(start_date, after, before) for after, before in chunks) == 1
+
+
+def test_chunk_fills_the_budget(settings):
+    activities = [(f"2024-01-0{day}T10:00:00Z", 3) for day in range(1, 6)]
+    runner = BackfillRunner(start_date=START, end_date=END)
+
+    # Three activities and their list request fit in 10 requests
+    assert runner.next_chunk(_state(*activities), budget=10) == (
+        "2024-01-01T00:00:00",
+        "2024-01-04T10:00:00",
+        3,
+    )
+
+
+def test_last_chunk_ends_at_the_end_date(settings):
+    runner = BackfillRunner(start_date=START, end_date=END)
+
+    assert runner.next_chunk(_state(("2024-01-01T10:00:00Z", 2)), budget=10) == (
+        "2024-01-01T00:00:00",
+        "2024-01-02T00:00:00",
+        1,
+    )
+
+
+def test_activities_sharing_a_start_time_stay_together(settings):
+    activities = [("2024-01-01T10:00:00Z", 2)] * 3 + [("2024-01-01T11:00:00Z", 2)]
+    runner = BackfillRunner(start_date=START, end_date=END)
+
+    assert runner.next_chunk(_state(*activities), budget=3)[2] == 3
+
+
+def test_nothing_fits(settings):
+    runner = BackfillRunner(start_date=START, end_date=END)
+
+    assert runner.next_chunk(_state(("2024-01-01T10:00:00Z", 5)), budget=5) is None
@@ -0,0 +1,115 @@
+"""Tests for the per-parent rules of child resources."""
+
+import pytest
+
+from strava_extract.sources.child_resources import (
+    _expand_keyed_by_type,
+    _query_value,
+    get_param_overrides,
+    get_skip_rules,
+    matches_parent,
+)
+from strava_extract.sources.strava_source import load_resource_config
+from strava_extract.utils.exceptions import ConfigurationError
+
+
+def _resource(name):
+    return next(res for res in load_resource_config() if res["name"] == name)
+
+
+class TestMatchesParent:
+    def test_every_field_must_match(self):
+        match = {"manual": frozenset([True]), "trainer": frozenset([False])}
+        assert matches_parent(match, {"manual": True, "trainer": False})
+        assert not matches_parent(match, {"manual": True, "trainer": True})
+
+    def test_any_listed_value_matches(self):
+        match = {"sport_type": frozenset(["Ride", "VirtualRide"])}
+        assert matches_parent(match, {"sport_type": "VirtualRide"})
+        assert not matches_parent(match, {"sport_type": "Run"})
+
+    def test_missing_field_matches_null(self):
+        match = {"device_watts": frozenset([False, None])}
+        assert matches_parent(match, {})
+        assert not matches_parent({"device_watts": frozenset([False])}, {})
+
+
+class TestSkipRules:
+    def test_manual_activities_have_no_streams(self):
+        (rule,) = get_skip_rules(_resource("activity_streams"))
+        assert matches_parent(rule, {"manual": True})
+        assert not matches_parent(rule, {"manual": False})
+
+    @pytest.mark.parametrize(
+        "activity, skipped",
+        [
+            ({"has_heartrate": False, "device_watts": False}, True),
+            # Strava omits device_watts for activities without power data
+            ({"has_heartrate": False}, True),
+            ({"has_heartrate": False, "device_watts": None}, True),
+            ({"has_heartrate": True}, False),
+            ({"has_heartrate": False, "device_watts": True}, False),
+        ],
+    )
+    def test_zones_need_heart_rate_or_power(self, activity, skipped):
+        rules = get_skip_rules(_resource("activity_zones"))
+        assert any(matches_parent(rule, activity) for rule in rules) is skipped
+
+    @pytest.mark.parametrize("rule", [{}, [], "manual", None])
+    def test_invalid_rules(self, rule):
+        with pytest.raises(ConfigurationError, match="skip_when"):
+            get_skip_rules({"name": "streams", "skip_when": [rule]})
+
+    def test_no_rules(self):
+        assert get_skip_rules({"name": "laps"}) == []
+
+
+class TestParamOverrides:
+    def test_scalar_and_list_matches(self):
+        (override,) = get_param_overrides(
+            {
+                "name": "streams",
+                "param_overrides": [
+                    {"match": {"sport_type": ["Ride", "Swim"]}, "params": {"resolution": "low"}}
+                ],
+            }
+        )
+        assert override.match == {"sport_type": frozenset(["Ride", "Swim"])}
+        assert override.params == {"resolution": "low"}
+        assert override.drop_keys == frozenset()
+
+    def test_indoor_activities_drop_latlng(self):
+        (override,) = get_param_overrides(_resource("activity_streams"))
+        assert matches_parent(override.match, {"trainer": True})
+        assert override.drop_keys == {"latlng"}
+
+    @pytest.mark.parametrize(
+        "entry",
+        [
+            "trainer",
+            {"match": {"trainer": True}},
+            {"match": {"trainer": True}, "params": "low"},
+            {"match": {"trainer": True}, "drop_keys": "latlng"},
+            {"params": {"resolution": "low"}},
+        ],
+    )
+    def test_invalid_entries(self, entry):
+        with pytest.raises(ConfigurationError):
+            get_param_overrides({"name": "streams", "param_overrides": [entry]})
+
+
+def test_query_values_render_booleans_like_strava():
+    assert _query_value(True) == "true"
+    assert _query_value(False) == "false"
+    assert _query_value(5) == 5
+
+
+def test_keyed_by_type_streams_become_records():
+    page = [{"time": {"data": [0, 1]}, "heartrate": {"data": [90, 91]}}]
+    assert _expand_keyed_by_type(page) == [
+        {"type": "time", "data": [0, 1]},
+        {"type": "heartrate", "data": [90, 91]},
+    ]
+    assert _expand_keyed_by_type([{"type": "time", "data": [0]}]) == [
+        {"type": "time", "data": [0]}
+    ]
@@ -0,0 +1,167 @@
+"""Tests for the command line modes, run against the fake Strava API."""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fake_strava import RateLimits
+from webhook_events import synthetic_events
+
+from strava_extract.__main__ import main
+from strava_extract.backfill import BackfillRunner
+from strava_extract.client.rate_limiter import RateLimitExceededError
+from strava_extract.sources.strava_source import get_rate_limiter, reset_rate_limiter
+from strava_extract.webhooks.event_queue import open_event_queue
+
+START = "2023-12-31"
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def cli(monkeypatch):
+    def run(*args: str) -> int:
+        monkeypatch.setattr(sys, "argv", ["strava_extract", *args, "--log-level", "WARNING"])
+        return main()
+
+    return run
+
+
+def test_run(cli, fake_api, db, capsys):
+    fake_api(activities=3)
+
+    assert cli("--start-date", START) == 0
+
+    assert "Pipeline completed successfully!" in capsys.readouterr().out
+    assert db("SELECT COUNT(*) FROM strava_raw.activities")[0][0] == 3
+
+
+def test_invalid_date_fails(cli, settings):
+    assert cli("--start-date", "yesterday") != 0
+
+
+def test_daily_limit_exit_code(cli, fake_api, settings, capsys):
+    fake_api(limits=RateLimits(daily_limit=5), activities=6)
+    settings.rate_limiting.mode = "reactive"
+
+    assert cli("--start-date", START) == 2
+
+    assert "RATE LIMIT EXCEEDED" in capsys.readouterr().err
+
+
+def test_plan_lists_only(cli, fake_api, capsys):
+    api = fake_api(activities=4)
+
+    assert cli("--mode", "plan", "--start-date", START) == 0
+
+    assert set(api.stats()) <= {"token", "list"}
+    assert "4" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("mode", ["plan", "backfill"])
+def test_plan_and_backfill_need_a_start_date(cli, settings, mode, capsys):
+    assert cli("--mode", mode) == 1
+    assert "--start-date is required" in capsys.readouterr().err
+
+
+def test_backfill(cli, fake_api, settings, db, capsys):
+    fake_api(activities=5)
+
+    assert cli("--mode", "backfill", "--start-date", START, "--end-date", "2024-02-01") == 0
+
+    assert settings.rate_limiting.lane == "backfill"
+    assert "Backfill completed" in capsys.readouterr().out
+    assert db("SELECT COUNT(DISTINCT id) FROM strava_raw.activities")[0][0] == 5
+
+
+def test_backfill_pauses_at_the_daily_budget_and_continues(fake_api, settings, db):
+    fake_api(activities=8)
+    settings.backfill.daily_budget = 12
+    runner_args = {"start_date": START, "end_date": "2024-02-01"}
+
+    days = 0
+    while True:
+        try:
+            BackfillRunner(**runner_args).run()
+            break
+        except RateLimitExceededError:
+            days += 1
+            if days > 5:
+                pytest.fail("backfill did not finish")
+            # Next day: the daily counter restarts when the state is loaded
+            state_manager = get_rate_limiter()._state_manager
+            state_manager.state.day_start = (datetime.now() - timedelta(days=1)).isoformat()
+            state_manager.save_state()
+            reset_rate_limiter()
+
+    assert days > 0
+    assert db("SELECT COUNT(DISTINCT id) FROM strava_raw.activities")[0][0] == 8
+    assert db("SELECT COUNT(*) FROM strava_raw.activity_details")[0][0] == 8
+    # The state of a finished backfill is removed
+    assert not Path(settings.backfill.state_file).exists()
+
+
+def test_record_then_replay_offline(cli, fake_api, settings, db, tmp_path):
+    api = fake_api(activities=3)
+    archive = str(tmp_path / "archive")
+    dates = ("--start-date", START, "--end-date", "2024-02-01")
+    assert cli(*dates, "--record", archive) == 0
+    get_rate_limiter().flush_state()
+    reset_rate_limiter()
+    state_before = (tmp_path / "rate_limit_state.json").read_bytes()
+    api.server.shutdown()
+
+    assert cli(*dates, "--replay", archive) == 0
+
+    # The replay loads its own dataset and leaves the rate limit state alone
+    for dataset in ("strava_raw", "strava_raw_replay"):
+        assert db(f"SELECT COUNT(*) FROM {dataset}.activities")[0][0] == 3
+    assert db("SELECT COUNT(*) FROM strava_raw_replay.activity_streams")[0][0] == db(
+        "SELECT COUNT(*) FROM strava_raw.activity_streams"
+    )[0][0]
+    assert (tmp_path / "rate_limit_state.json").read_bytes() == state_before
+
+
+def test_replay_keeps_the_configured_suffix(cli, fake_api, settings, db, tmp_path):
+    fake_api(activities=2)
+    settings.http_archive.replay_suffix = "_offline"
+    archive = str(tmp_path / "archive")
+    dates = ("--start-date", START, "--end-date", "2024-02-01")
+    assert cli(*dates, "--record", archive) == 0
+    reset_rate_limiter()
+
+    assert cli(*dates, "--replay", archive) == 0
+
+    assert settings.http_archive.mode == "replay"
+    assert settings.http_archive.path == archive
+    assert db("SELECT COUNT(*) FROM strava_raw_offline.activities")[0][0] == 2
+
+
+def test_drain(cli, fake_api, db, capsys):
+    api = fake_api(activities=3)
+    queue = open_event_queue()
+    for event in synthetic_events(api.data, creates=2, updates=0, deletes=0):
+        queue.append(event)
+    queue.close()
+
+    assert cli("--mode", "drain") == 0
+
+    assert "Drain completed: 1 load(s), 0 event(s) pending" in capsys.readouterr().out
+    assert db("SELECT COUNT(*) FROM strava_raw.activity_details")[0][0] == 2
+
+
+def test_refresh(cli, fake_api, db, capsys):
+    api = fake_api(activities=4)
+    assert cli("--start-date", START) == 0
+    renamed = api.activities()[1]
+    renamed["name"] = "Renamed"
+    api.reset_stats()
+
+    assert cli("--mode", "refresh", "--start-date", START) == 0
+
+    assert set(api.stats()) <= {"token", "list"}
+    assert "Activities updated:     1" in capsys.readouterr().out
+    assert db(f"SELECT name FROM strava_raw.activities WHERE id = {renamed['id']}") == [
+        ("Renamed",)
+    ]
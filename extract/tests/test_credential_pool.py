@@ -0,0 +1,126 @@
+"""Tests for sharding child requests across a pool of Strava applications."""
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from strava_extract.client.credential_pool import (
+    CredentialPool,
+    PoolMember,
+    member_state_file,
+)
+from strava_extract.client.rate_limiter import RateLimiter, RateLimitExceededError
+from strava_extract.pipeline import StravaPipeline
+from strava_extract.sources.strava_source import get_credential_pool
+from strava_extract.utils.exceptions import ConfigurationError
+
+START = "2023-12-31"
+
+
+def _member(name: str) -> PoolMember:
+    # Sharding and stopping never touch the member's credentials
+    return PoolMember(name, None, RateLimiter(state_file=member_state_file(name)))
+
+
+def _stop(member: PoolMember, hours: int) -> RateLimitExceededError:
+    with pytest.raises(RateLimitExceededError) as error:
+        member.rate_limiter._handle_daily_limit(
+            resume_time=datetime.now() + timedelta(hours=hours)
+        )
+    return error.value
+
+
+@pytest.fixture
+def pool(settings):
+    return CredentialPool([_member(name) for name in ("default", "app2", "app3")])
+
+
+@pytest.fixture
+def two_apps(fake_api, settings, monkeypatch):
+    """Start the fake API with a second application in the pool."""
+
+    def start(**data_options):
+        api = fake_api(**data_options)
+        for name, value in {
+            "CLIENT_ID": "2",
+            "CLIENT_SECRET": "fake",
+            "REFRESH_TOKEN": "athlete-1",
+            "ACCESS_TOKEN_URL": f"{api.url}/oauth/token",
+        }.items():
+            monkeypatch.setenv(f"CREDENTIALS__APP2__{name}", value)
+        settings.credential_pool.members = ["app2"]
+        return api
+
+    return start
+
+
+class TestCredentialPool:
+    @pytest.mark.parametrize(
+        "activity_id, owner",
+        [(9, "default"), (10, "app2"), (11, "app3")],
+    )
+    def test_shards_by_activity_id(self, pool, activity_id, owner):
+        members = [member.name for member in pool.shard(activity_id)]
+        assert members[0] == owner
+        assert sorted(members) == ["app2", "app3", "default"]
+
+    def test_shard_fails_over_in_pool_order(self, pool):
+        assert [member.name for member in pool.shard(10)] == ["app2", "app3", "default"]
+
+    @pytest.mark.parametrize("names", [[], ["default", "default"]])
+    def test_invalid_pools(self, settings, names):
+        with pytest.raises(ConfigurationError):
+            CredentialPool([_member(name) for name in names])
+
+    def test_keeps_running_while_a_member_has_quota(self, pool):
+        _stop(pool.members[1], hours=1)
+        _stop(pool.members[2], hours=2)
+
+        assert not pool.exhausted
+        assert pool.stop_error() is None
+
+    def test_stops_with_the_primary_member(self, pool):
+        error = _stop(pool.primary, hours=3)
+
+        assert pool.stop_error() is error
+
+    def test_stops_with_the_primary_member_when_every_member_stopped(self, pool):
+        _stop(pool.members[1], hours=1)
+        _stop(pool.members[2], hours=2)
+        # Listing waits for the primary member even if another resets first
+        error = _stop(pool.primary, hours=3)
+
+        assert pool.exhausted
+        assert pool.stop_error() is error
+
+    def test_members_keep_their_own_state_files(self, settings):
+        state_file = Path(settings.rate_limiting.state_file)
+        assert Path(member_state_file("app2")) == state_file.with_name(
+            f"{state_file.stem}.app2{state_file.suffix}"
+        )
+
+
+@pytest.mark.integration
+class TestShardedExtract:
+    def test_child_requests_are_shared_by_the_members(self, two_apps, db):
+        two_apps(activities=8, athletes=2)
+
+        StravaPipeline(start_date=START).run()
+
+        usage = get_credential_pool().usage()
+        assert usage["default"]["requests"] > 0
+        assert usage["app2"]["requests"] > 0
+        assert db("SELECT COUNT(*) FROM strava_raw.activity_details")[0][0] == 8
+
+    def test_a_member_waiting_for_its_reset_fails_over(self, two_apps, db):
+        two_apps(activities=6, athletes=2)
+        resume_after = (datetime.now() + timedelta(hours=1)).isoformat()
+        Path(member_state_file("app2")).write_text(json.dumps({"resume_after": resume_after}))
+
+        StravaPipeline(start_date=START).run()
+
+        usage = get_credential_pool().usage()
+        assert usage["app2"]["requests"] == 0
+        assert db("SELECT COUNT(*) FROM strava_raw.activity_details")[0][0] == 6
@@ -0,0 +1,182 @@
+"""Tests for the webhook event queue and drain batching."""
+
+import pytest
+
+from strava_extract.drain import EventDrainer
+from strava_extract.utils.exceptions import ValidationError
+from strava_extract.webhooks.event_queue import DrainBatch, EventQueue, WebhookEvent
+
+
+def _activity(seq, object_id, aspect="create", owner=7, event_time=None):
+    return WebhookEvent(
+        seq=seq,
+        object_type="activity",
+        object_id=object_id,
+        aspect_type=aspect,
+        owner_id=owner,
+        subscription_id=1,
+        event_time=event_time if event_time is not None else seq,
+        updates={},
+    )
+
+
+def _deauthorization(seq, owner=7, event_time=None):
+    return WebhookEvent(
+        seq=seq,
+        object_type="athlete",
+        object_id=owner,
+        aspect_type="update",
+        owner_id=owner,
+        subscription_id=1,
+        event_time=event_time if event_time is not None else seq,
+        updates={"authorized": "false"},
+    )
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = EventQueue(str(tmp_path / "events.sqlite"))
+    yield queue
+    queue.close()
+
+
+def _push(object_id, aspect="create", event_time=100, **fields):
+    event = {
+        "object_type": "activity",
+        "object_id": object_id,
+        "aspect_type": aspect,
+        "owner_id": 7,
+        "subscription_id": 1,
+        "event_time": event_time,
+        "updates": {},
+    }
+    event.update(fields)
+    return event
+
+
+class TestEventQueue:
+    def test_appends_and_lists_pending_events_in_order(self, queue):
+        assert queue.append(_push(1))
+        assert queue.append(_push(2, "update", updates={"title": "Run"}))
+
+        events = queue.pending()
+
+        assert [event.object_id for event in events] == [1, 2]
+        assert events[1].updates == {"title": "Run"}
+        assert events[0].seq < events[1].seq
+        assert queue.pending_count() == 2
+
+    def test_redelivered_events_are_stored_once(self, queue):
+        assert queue.append(_push(1))
+        assert not queue.append(_push(1))
+        assert queue.append(_push(1, event_time=101))
+        assert queue.pending_count() == 2
+
+    def test_pending_limit(self, queue):
+        for object_id in range(5):
+            queue.append(_push(object_id))
+        assert [event.object_id for event in queue.pending(limit=2)] == [0, 1]
+
+    def test_numeric_strings_are_accepted(self, queue):
+        queue.append(_push("12", event_time="100", owner_id=None))
+        (event,) = queue.pending()
+        assert event.object_id == 12
+        assert event.owner_id is None
+
+    @pytest.mark.parametrize(
+        "event",
+        [
+            _push(1, "archive"),
+            _push(1, object_type="club"),
+            _push("one"),
+            _push(True),
+            _push(1, event_time=None),
+            _push(1, updates=["title"]),
+        ],
+    )
+    def test_rejects_invalid_events(self, queue, event):
+        with pytest.raises(ValidationError):
+            queue.append(event)
+
+    def test_drained_events_are_no_longer_pending(self, queue):
+        for object_id in range(3):
+            queue.append(_push(object_id))
+        first, *_ = queue.pending()
+
+        queue.mark_drained([first.seq])
+
+        assert [event.object_id for event in queue.pending()] == [1, 2]
+
+    def test_retention_deletes_old_drained_events(self, queue):
+        queue.append(_push(1))
+        queue.mark_drained([event.seq for event in queue.pending()])
+        queue.mark_drained([], retain_days=-1)
+        (count,) = queue._connection.execute("SELECT COUNT(*) FROM events").fetchone()
+        assert count == 0
+
+
+class TestDrainBatch:
+    def test_each_activity_is_fetched_once(self):
+        batch = DrainBatch.from_events(
+            [_activity(1, 10), _activity(2, 11), _activity(3, 10, "update")]
+        )
+        assert batch.fetch_ids == [10, 11]
+        assert batch.delete_ids == []
+        assert batch.seqs == [1, 2, 3]
+
+    def test_delete_wins_over_other_events(self):
+        batch = DrainBatch.from_events(
+            [_activity(1, 10), _activity(2, 10, "delete"), _activity(3, 10, "update")]
+        )
+        assert batch.fetch_ids == []
+        assert batch.delete_ids == [10]
+
+    def test_deauthorization_drops_earlier_events_of_the_owner(self):
+        batch = DrainBatch.from_events(
+            [
+                _activity(1, 10),
+                _activity(2, 11, owner=8),
+                _deauthorization(3),
+                _activity(4, 12, event_time=5),
+            ]
+        )
+        assert batch.fetch_ids == [11, 12]
+        assert batch.deauthorized_owners == [7]
+
+    def test_deauthorizations_keep_the_latest_time(self):
+        events = [_deauthorization(1, event_time=50), _deauthorization(2, event_time=20)]
+        assert DrainBatch.deauthorizations(events) == {7: 50}
+
+    def test_granted_access_is_not_a_deauthorization(self):
+        event = _deauthorization(1)
+        granted = WebhookEvent(**{**event.__dict__, "updates": {"authorized": "true"}})
+        assert event.is_deauthorization
+        assert not granted.is_deauthorization
+
+
+class TestDrainerBatches:
+    def _drainer(self, settings, queue, max_activities):
+        return EventDrainer(queue=queue, max_activities=max_activities)
+
+    def test_splits_by_activity_count(self, settings, queue):
+        events = [_activity(1, 10), _activity(2, 10, "update"), _activity(3, 11), _activity(4, 12)]
+
+        batches = self._drainer(settings, queue, 2).batches(events)
+
+        assert [batch.fetch_ids for batch in batches] == [[10, 11], [12]]
+        assert [batch.seqs for batch in batches] == [[1, 2, 3], [4]]
+
+    def test_deauthorization_in_a_later_batch_drops_earlier_fetches(self, settings, queue):
+        events = [
+            _activity(1, 10),
+            _activity(2, 11),
+            _deauthorization(3),
+            _activity(4, 12, event_time=10),
+        ]
+
+        batches = self._drainer(settings, queue, 1).batches(events)
+
+        assert [batch.fetch_ids for batch in batches] == [[], [], [12]]
+        assert [batch.seqs for batch in batches] == [[1], [2, 3], [4]]
+        # Only the batch holding the deauthorization reports it
+        assert [batch.deauthorized_owners for batch in batches] == [[], [7], []]
@@ -0,0 +1,110 @@
+"""Tests for the pooled Strava HTTP session."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from requests import HTTPError
+
+from strava_extract.client.http_session import create_session
+
+
+class _ScriptedServer(ThreadingHTTPServer):
+    """Answers requests with the given status codes, then with 200s."""
+
+    def __init__(self, statuses):
+        super().__init__(("127.0.0.1", 0), _ScriptedHandler)
+        self.statuses = list(statuses)
+        self.requests = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api"
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def do_GET(self):  # noqa: N802
+        self.server.requests.append(dict(self.headers))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        body = b"{}"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def scripted(settings):
+    settings.api.retry_backoff_factor = 0
+    settings.api.retry_jitter_seconds = 0
+    servers = []
+
+    def start(*statuses):
+        server = _ScriptedServer(statuses)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _raise_for_status(response, *args, **kwargs):
+    response.raise_for_status()
+
+
+def test_requests_compressed_responses(scripted):
+    server = scripted()
+
+    assert create_session().get(server.url).status_code == 200
+
+    assert "gzip" in server.requests[0]["Accept-Encoding"]
+
+
+@pytest.mark.parametrize("status", [500, 502, 503, 504])
+def test_retries_server_errors(scripted, status):
+    server = scripted(status, status)
+
+    assert create_session().get(server.url).status_code == 200
+
+    assert len(server.requests) == 3
+
+
+def test_gives_up_after_the_retry_attempts(scripted, settings):
+    server = scripted(*[503] * 10)
+
+    assert create_session().get(server.url).status_code == 503
+
+    assert len(server.requests) == settings.api.retry_attempts + 1
+
+
+def test_does_not_retry_client_errors(scripted):
+    server = scripted(404)
+
+    assert create_session().get(server.url).status_code == 404
+
+    assert len(server.requests) == 1
+
+
+def test_resends_a_request_after_a_handled_429(scripted):
+    server = scripted(429)
+
+    response = create_session().get(server.url, hooks={"response": [_raise_for_status]})
+
+    assert response.status_code == 200
+    assert len(server.requests) == 2
+
+
+def test_resends_a_429_a_bounded_number_of_times(scripted):
+    server = scripted(*[429] * 10)
+
+    with pytest.raises(HTTPError):
+        create_session().get(server.url, hooks={"response": [_raise_for_status]})
+
+    assert len(server.requests) == 4
@@ -0,0 +1,164 @@
+"""Tests for header-driven request pacing."""
+
+import pickle
+from datetime import UTC, datetime
+
+import pytest
+
+from strava_extract.client.pacer import (
+    RateLimitUsage,
+    RequestPacer,
+    next_daily_reset,
+    next_short_term_reset,
+    parse_rate_limit_headers,
+)
+
+# 2024-01-01 12:05:00 UTC: 10 minutes before the next quarter hour
+NOW = datetime(2024, 1, 1, 12, 5, tzinfo=UTC).timestamp()
+
+
+def _pacer(**kwargs) -> RequestPacer:
+    options = {
+        "short_term_limit": 100,
+        "daily_limit": 1000,
+        "read_short_term_limit": 100,
+        "read_daily_limit": 1000,
+        "reserve": 2,
+        "spread_threshold": 0.25,
+    }
+    options.update(kwargs)
+    return RequestPacer(**options)
+
+
+def _usage(short_term: int, daily: int, short_term_limit: int = 100, daily_limit: int = 1000):
+    return RateLimitUsage(
+        short_term_limit=short_term_limit,
+        daily_limit=daily_limit,
+        short_term_usage=short_term,
+        daily_usage=daily,
+    )
+
+
+class TestResets:
+    def test_short_term_resets_on_the_quarter_hour(self):
+        assert next_short_term_reset(NOW) == NOW + 600
+
+    def test_short_term_reset_on_a_boundary_is_the_next_one(self):
+        assert next_short_term_reset(NOW + 600) == NOW + 1500
+
+    def test_daily_resets_at_utc_midnight(self):
+        midnight = datetime(2024, 1, 2, tzinfo=UTC).timestamp()
+        assert next_daily_reset(NOW) == midnight
+
+
+class TestParseHeaders:
+    def test_parses_overall_and_read_quotas(self):
+        usage = parse_rate_limit_headers(
+            {
+                "X-RateLimit-Limit": "200,2000",
+                "X-RateLimit-Usage": "10,150",
+                "X-ReadRateLimit-Limit": "100,1000",
+                "X-ReadRateLimit-Usage": "5,75",
+            }
+        )
+        assert usage == RateLimitUsage(200, 2000, 10, 150, 100, 1000, 5, 75)
+
+    def test_read_quota_is_optional(self):
+        usage = parse_rate_limit_headers({"X-RateLimit-Limit": "200,2000", "X-RateLimit-Usage": "1,2"})
+        assert usage is not None
+        assert usage.read_short_term_limit is None
+        assert usage.read_daily_usage is None
+
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            {},
+            {"X-RateLimit-Limit": "200,2000"},
+            {"X-RateLimit-Limit": "200", "X-RateLimit-Usage": "1,2"},
+            {"X-RateLimit-Limit": "a,b", "X-RateLimit-Usage": "1,2"},
+        ],
+    )
+    def test_missing_or_malformed_headers(self, headers):
+        assert parse_rate_limit_headers(headers) is None
+
+
+class TestRequestPacer:
+    def test_requests_flow_freely_with_headroom(self):
+        pacer = _pacer()
+        pacer.update(_usage(10, 10), now=NOW)
+        decisions = [pacer.reserve_slot(now=NOW) for _ in range(5)]
+        assert all(decision.delay_seconds == 0 for decision in decisions)
+        assert pacer.short_term.usage == 15
+
+    def test_spreads_the_last_quarter_of_a_window(self):
+        pacer = _pacer()
+        # 20 left before the reserve of 2: 18 requests over the 600 s to the reset
+        pacer.update(_usage(80, 80), now=NOW)
+        first = pacer.reserve_slot(now=NOW)
+        second = pacer.reserve_slot(now=NOW)
+        assert first.delay_seconds == 0
+        assert second.delay_seconds == pytest.approx(600 / 18)
+        assert second.window == "15-minute"
+
+    def test_waits_for_the_reset_when_only_the_reserve_is_left(self):
+        pacer = _pacer()
+        pacer.update(_usage(98, 98), now=NOW)
+        decision = pacer.reserve_slot(now=NOW)
+        assert decision.delay_seconds == pytest.approx(600)
+        assert not decision.daily_exhausted
+
+    def test_window_refills_after_the_reset(self):
+        pacer = _pacer()
+        pacer.update(_usage(98, 98), now=NOW)
+        decision = pacer.reserve_slot(now=NOW + 601)
+        assert decision.delay_seconds == 0
+
+    def test_reports_an_exhausted_daily_window(self):
+        pacer = _pacer()
+        pacer.update(_usage(10, 998), now=NOW)
+        decision = pacer.reserve_slot(now=NOW)
+        assert decision.daily_exhausted
+        assert decision.window == "daily"
+        assert decision.resume_at == next_daily_reset(NOW)
+
+    def test_read_quota_limits_like_the_overall_one(self):
+        pacer = _pacer()
+        pacer.update(
+            RateLimitUsage(100, 1000, 10, 10, 100, 1000, 10, 998),
+            now=NOW,
+        )
+        decision = pacer.reserve_slot(now=NOW)
+        assert decision.daily_exhausted
+        assert decision.window == "read daily"
+
+    def test_backfill_lane_leaves_its_held_back_share(self):
+        pacer = _pacer(held_back=0.3)
+        # 30 % of 1000 plus the reserve stays unused for the fresh lane
+        pacer.update(_usage(10, 698), now=NOW)
+        assert pacer.reserve_slot(now=NOW).daily_exhausted
+        fresh = _pacer()
+        fresh.update(_usage(10, 698), now=NOW)
+        assert not fresh.reserve_slot(now=NOW).daily_exhausted
+
+    def test_stale_headers_do_not_free_granted_slots(self):
+        pacer = _pacer()
+        pacer.update(_usage(10, 995), now=NOW)
+        pacer.reserve_slot(now=NOW)
+        pacer.reserve_slot(now=NOW)
+        pacer.reserve_slot(now=NOW)
+        # The response to the first of those requests counted only 996
+        pacer.update(_usage(11, 996), now=NOW)
+        assert pacer.reserve_slot(now=NOW).daily_exhausted
+
+    def test_concurrent_callers_get_consecutive_slots(self):
+        pacer = _pacer()
+        pacer.update(_usage(90, 90), now=NOW)
+        delays = [pacer.reserve_slot(now=NOW).delay_seconds for _ in range(3)]
+        assert delays[0] < delays[1] < delays[2]
+
+    def test_pickles_without_its_lock(self):
+        pacer = _pacer()
+        pacer.update(_usage(50, 50), now=NOW)
+        restored = pickle.loads(pickle.dumps(pacer))
+        assert restored.short_term.usage == 50
+        assert restored.reserve_slot(now=NOW).delay_seconds == 0
@@ -0,0 +1,206 @@
+"""End-to-end pipeline runs against the fake Strava API."""
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import dlt
+import pytest
+from fake_strava import RateLimits, SyntheticAthletes
+
+from strava_extract.client.rate_limiter import RateLimitExceededError
+from strava_extract.pipeline import StravaPipeline
+from strava_extract.sources.strava_source import reset_rate_limiter
+
+START = "2023-12-31"
+
+pytestmark = pytest.mark.integration
+
+
+class SameSecondPairs(SyntheticAthletes):
+    """Activities starting in pairs at the same second."""
+
+    def _activity(self, rng, athlete, index):
+        activity = super()._activity(rng, athlete, index)
+        start = self.start + timedelta(hours=(index // 2) * self.spacing_hours)
+        activity["start_date"] = start.strftime("%Y-%m-%dT%H:%M:%SZ")
+        return activity
+
+
+def _count(db, table):
+    return db(f"SELECT COUNT(*) FROM strava_raw.{table}")[0][0]
+
+
+def test_loads_activities_and_their_child_tables(fake_api, db):
+    api = fake_api(activities=6)
+
+    StravaPipeline(start_date=START).run()
+
+    assert _count(db, "activities") == 6
+    assert _count(db, "activity_details") == 6
+    assert db("SELECT COUNT(DISTINCT _activities_id) FROM strava_raw.activity_streams")[0][0] == 6
+    stats = api.stats()
+    assert stats["detail"] == stats["streams"] == 6
+    # Only activities with heart rate or a power meter have zones
+    expected_zones = sum(
+        1
+        for activity in api.activities()
+        if activity["has_heartrate"] or activity.get("device_watts")
+    )
+    assert stats.get("zones", 0) == expected_zones
+
+
+def test_rerun_fetches_only_new_activities(fake_api, db):
+    api = fake_api(activities=4)
+    StravaPipeline(start_date=START).run()
+
+    api.reset_stats()
+    StravaPipeline().run()
+
+    stats = api.stats()
+    assert "detail" not in stats
+    assert "streams" not in stats
+    assert _count(db, "activities") == 4
+
+
+def test_force_refetch_fetches_child_data_again(fake_api, db):
+    api = fake_api(activities=3)
+    StravaPipeline(start_date=START).run()
+
+    # An explicit range relists the loaded activities
+    api.reset_stats()
+    StravaPipeline(start_date=START, end_date="2024-02-01").run()
+    assert "detail" not in api.stats()
+
+    StravaPipeline(start_date=START, end_date="2024-02-01", force_refetch=True).run()
+
+    assert api.stats()["detail"] == 3
+    assert _count(db, "activity_details") == 3
+
+
+@pytest.mark.parametrize("end_date", [None, "2024-02-01"])
+def test_chunked_commits_keep_activities_sharing_a_start_second(
+    fake_api, settings, db, end_date
+):
+    fake_api(data=SameSecondPairs(activities=10, min_seconds=60, max_seconds=120))
+    settings.pipeline.commit_every_activities = 3
+
+    StravaPipeline(start_date=START, end_date=end_date).run()
+
+    assert db("SELECT COUNT(*), COUNT(DISTINCT id) FROM strava_raw.activities")[0] == (10, 10)
+    assert _count(db, "activity_details") == 10
+
+
+@pytest.mark.parametrize("mode", ["reactive", "paced"])
+def test_daily_limit_stops_and_the_next_day_resumes(fake_api, settings, db, mode):
+    api = fake_api(limits=RateLimits(daily_limit=14), activities=8)
+    settings.rate_limiting.mode = mode
+
+    with pytest.raises(RateLimitExceededError):
+        StravaPipeline(start_date=START).run()
+    # Paced runs stop on the usage headers before Strava refuses a request
+    assert (api.stats().get("429", 0) > 0) is (mode == "reactive")
+
+    # Same day: refused before sending any request
+    reset_rate_limiter()
+    api.reset_stats()
+    with pytest.raises(RateLimitExceededError):
+        StravaPipeline(start_date=START).run()
+    assert api.stats() == {}
+
+    # Next day: the quota is back and the run completes
+    state_file = Path(settings.rate_limiting.state_file)
+    state = json.loads(state_file.read_text())
+    state["resume_after"] = (datetime.now() - timedelta(minutes=1)).isoformat()
+    state_file.write_text(json.dumps(state))
+    reset_rate_limiter()
+    api.server.limits = RateLimits()
+    StravaPipeline(start_date=START).run()
+
+    assert db("SELECT COUNT(*), COUNT(DISTINCT id) FROM strava_raw.activities")[0] == (8, 8)
+    assert _count(db, "activity_details") == 8
+
+
+def test_arrow_items_load_like_dicts(fake_api, settings, db):
+    fake_api(activities=3)
+    settings.pipeline.item_format = "arrow"
+
+    StravaPipeline(start_date=START).run()
+
+    assert _count(db, "activities") == 3
+    time_streams = db(
+        "SELECT len(data_bigint) FROM strava_raw.activity_streams WHERE type = 'time'"
+    )
+    assert len(time_streams) == 3
+    assert all(length > 0 for (length,) in time_streams)
+
+
+def test_performance_settings_become_dlt_config(settings):
+    settings.pipeline.normalize_workers = 3
+    settings.pipeline.load_workers = 4
+    settings.pipeline.buffer_max_items = 1000
+    settings.pipeline.file_max_items = 50_000
+    settings.pipeline.file_max_bytes = None
+    pipeline = StravaPipeline(start_date=START)
+
+    expected = {
+        "normalize.workers": 3,
+        "load.workers": 4,
+        "extract.data_writer.buffer_max_items": 1000,
+        "data_writer.file_max_items": 50_000,
+    }
+    assert pipeline._dlt_performance_config() == expected
+
+    pipeline._create_pipeline()
+
+    assert {key: dlt.config[key] for key in expected} == expected
+
+
+def test_arrow_items_ask_dlt_for_its_row_columns(settings):
+    settings.pipeline.item_format = "arrow"
+
+    config = StravaPipeline(start_date=START)._dlt_performance_config()
+
+    assert config["normalize.parquet_normalizer.add_dlt_id"] is True
+    assert config["normalize.parquet_normalizer.add_dlt_load_id"] is True
+
+
+def test_flatten_nested_loads_typed_columns(fake_api, settings, db):
+    fake_api(activities=3)
+    settings.pipeline.flatten_nested = True
+
+    StravaPipeline(start_date=START).run()
+
+    assert db(
+        "SELECT COUNT(athlete__id), COUNT(map__summary_polyline) FROM strava_raw.activities"
+    )[0] == (3, 3)
+    assert db("SELECT COUNT(map__polyline) FROM strava_raw.activity_details")[0][0] == 3
+    columns = {row[0] for row in db("DESCRIBE strava_raw.activities")}
+    assert "map" not in columns
+
+
+def test_activity_ids_fetch_without_listing(fake_api, db):
+    api = fake_api(activities=5)
+    wanted = [activity["id"] for activity in api.activities()[1:3]]
+
+    StravaPipeline(activity_ids=wanted).run()
+
+    assert "list" not in api.stats()
+    assert sorted(row[0] for row in db("SELECT id FROM strava_raw.activity_details")) == wanted
+
+
+def test_delete_activities_removes_every_table_row(fake_api, db):
+    api = fake_api(activities=3)
+    StravaPipeline(start_date=START).run()
+    deleted = api.activities()[0]["id"]
+
+    StravaPipeline().delete_activities([deleted])
+
+    assert _count(db, "activities") == 2
+    assert db(
+        f"SELECT COUNT(*) FROM strava_raw.activity_streams WHERE _activities_id = {deleted}"
+    )[0][0] == 0
+
+
+def test_delete_before_the_first_load_is_a_no_op(settings):
+    assert StravaPipeline().delete_activities([1]) == 0
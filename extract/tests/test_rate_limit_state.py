@@ -0,0 +1,109 @@
+"""Tests for batched, atomic rate limit state persistence."""
+
+import json
+import os
+import time
+
+import pytest
+
+from strava_extract.client.rate_limit_state import RateLimitStateManager
+
+
+@pytest.fixture
+def state_file(settings, tmp_path):
+    return tmp_path / "state" / "rate_limit_state.json"
+
+
+def _manager(state_file, **kwargs):
+    options = {"flush_requests": 3, "flush_seconds": 3600}
+    options.update(kwargs)
+    return RateLimitStateManager(str(state_file), **options)
+
+
+def _saved_requests(state_file):
+    return json.loads(state_file.read_text())["total_requests_today"]
+
+
+class TestBatchedFlush:
+    def test_requests_are_written_once_a_batch_is_full(self, state_file):
+        manager = _manager(state_file)
+
+        manager.record_request()
+        manager.record_request()
+        assert not state_file.exists()
+
+        manager.record_request()
+        assert _saved_requests(state_file) == 3
+
+    def test_old_updates_are_written_with_the_next_request(self, state_file):
+        manager = _manager(state_file, flush_requests=100, flush_seconds=0.05)
+        manager.record_request()
+        time.sleep(0.1)
+
+        manager.record_request()
+
+        assert _saved_requests(state_file) == 2
+
+    def test_flush_writes_pending_requests(self, state_file):
+        manager = _manager(state_file)
+        manager.record_request()
+
+        manager.flush()
+
+        assert _saved_requests(state_file) == 1
+
+    def test_flush_without_pending_requests_does_not_write(self, state_file):
+        manager = _manager(state_file)
+        manager.record_request()
+        manager.flush()
+        os.utime(state_file, ns=(0, 0))
+
+        manager.flush()
+
+        assert state_file.stat().st_mtime_ns == 0
+
+    def test_429s_are_written_immediately(self, state_file):
+        manager = _manager(state_file)
+
+        manager.record_429("https://example.com/a")
+
+        assert json.loads(state_file.read_text())["current_request_url"] == "https://example.com/a"
+
+    def test_memory_only_state_is_never_written(self, state_file):
+        manager = _manager(state_file, flush_requests=1, persist=False)
+
+        manager.record_request()
+        manager.record_429("https://example.com/a")
+
+        assert manager.state.total_requests_today == 1
+        assert not state_file.exists()
+
+
+class TestAtomicWrite:
+    def test_replaces_the_state_file_without_leaving_temporary_files(self, state_file):
+        manager = _manager(state_file, flush_requests=1)
+
+        for _ in range(3):
+            manager.record_request()
+
+        assert os.listdir(state_file.parent) == [state_file.name]
+        assert _saved_requests(state_file) == 3
+
+    def test_failed_write_keeps_the_previous_file(self, state_file, monkeypatch):
+        manager = _manager(state_file, flush_requests=1)
+        manager.record_request()
+
+        def fail(*args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(os, "replace", fail)
+        manager.record_request()
+
+        assert os.listdir(state_file.parent) == [state_file.name]
+        assert _saved_requests(state_file) == 1
+
+    def test_state_is_read_back(self, state_file):
+        manager = _manager(state_file, flush_requests=1)
+        manager.record_request()
+
+        assert _manager(state_file).state.total_requests_today == 1
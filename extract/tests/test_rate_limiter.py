@@ -0,0 +1,84 @@
+"""Tests for the rate limiter's short-term waits."""
+
+import threading
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from strava_extract.client.rate_limiter import RateLimiter
+
+# 2024-01-01 12:05:00 UTC: 10 minutes before the next quarter hour
+NOW = datetime(2024, 1, 1, 12, 5, tzinfo=UTC).timestamp()
+
+
+@pytest.fixture
+def limiter(settings):
+    return RateLimiter(show_progress=False)
+
+
+def _wait_in_thread(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+class TestShortTermWait:
+    def test_waits_until_the_quarter_hour_reset(self, limiter):
+        assert limiter._short_term_wait_seconds(NOW) == 600 + limiter.reset_buffer_seconds
+
+    def test_wait_is_capped_at_the_configured_sleep(self, limiter):
+        limiter.short_term_sleep_minutes = 5
+        assert limiter._short_term_wait_seconds(NOW) == 300
+
+    def test_concurrent_429s_share_one_resume_time(self, limiter):
+        resume_times = []
+        limiter._sleep_for_short_term_limit = resume_times.append
+
+        assert limiter.handle_429("https://example.com/a")
+        time.sleep(0.01)
+        assert limiter.handle_429("https://example.com/b")
+
+        assert resume_times[0] == resume_times[1]
+        assert resume_times[0] > time.time()
+
+    def test_resume_time_moves_on_after_the_reset(self, limiter):
+        resume_times = []
+        limiter._sleep_for_short_term_limit = resume_times.append
+        limiter.handle_429("https://example.com/a")
+
+        limiter._short_term_resume_at = past = time.time() - 1
+        limiter.handle_429("https://example.com/b")
+
+        assert limiter._short_term_resume_at == resume_times[1] > past + 1
+
+
+class TestInterrupt:
+    def test_wakes_every_waiting_thread(self, limiter):
+        waiters = [
+            _wait_in_thread(limiter.handle_429, f"https://example.com/{name}")
+            for name in ("a", "b")
+        ]
+        time.sleep(0.2)
+        assert all(waiter.is_alive() for waiter in waiters)
+
+        limiter.interrupt()
+
+        for waiter in waiters:
+            waiter.join(timeout=5)
+            assert not waiter.is_alive()
+
+    def test_does_not_cut_a_later_wait_short(self, limiter):
+        limiter.interrupt()
+
+        assert not limiter._wait(0.05)
+
+    def test_wakes_a_progress_bar_wait(self, settings, capsys):
+        limiter = RateLimiter(show_progress=True)
+        waiter = _wait_in_thread(limiter._sleep_with_progress, 900, "Waiting for the reset")
+        time.sleep(0.2)
+
+        limiter.interrupt()
+
+        waiter.join(timeout=5)
+        assert not waiter.is_alive()
@@ -0,0 +1,129 @@
+"""Tests for record normalization against the schema contract."""
+
+import copy
+
+import pytest
+
+from strava_extract.strava_schema_contract import (
+    extract_path,
+    get_table_contract,
+    normalize_page,
+    normalize_record,
+)
+
+ACTIVITY = {
+    "id": 1,
+    "name": "Morning Run",
+    "sport_type": "Run",
+    "athlete": {"id": 7, "resource_state": 1},
+    "map": {"id": "a1", "summary_polyline": "abc", "resource_state": 2},
+    "start_latlng": [52.1, 4.3],
+    "end_latlng": [],
+    "unknown_field": "dropped",
+}
+
+
+@pytest.fixture
+def activities():
+    return get_table_contract("activities")
+
+
+@pytest.fixture
+def flat_activities():
+    return get_table_contract("activities", flatten=True)
+
+
+class TestExtractPath:
+    def test_follows_keys_and_indexes(self):
+        assert extract_path(ACTIVITY, ("map", "summary_polyline")) == "abc"
+        assert extract_path(ACTIVITY, ("start_latlng", 1)) == 4.3
+
+    def test_missing_steps_give_none(self):
+        assert extract_path(ACTIVITY, ("end_latlng", 0)) is None
+        assert extract_path(ACTIVITY, ("gear", "id")) is None
+        assert extract_path({"map": None}, ("map", "id")) is None
+        assert extract_path({"map": "text"}, ("map", "id")) is None
+
+    def test_star_maps_over_lists(self):
+        record = {"achievements": [{"type_id": 2, "rank": 1}, {"type_id": 3}]}
+        assert extract_path(record, ("achievements", "*", "rank")) == [1, None]
+        assert extract_path({"achievements": None}, ("achievements", "*", "rank")) is None
+        assert extract_path({"achievements": {}}, ("achievements", "*", "rank")) is None
+
+
+class TestNormalizePage:
+    def test_matches_normalize_record(self, activities, flat_activities):
+        for contract in (activities, flat_activities):
+            expected = normalize_record(copy.deepcopy(ACTIVITY), contract)
+            assert normalize_page([copy.deepcopy(ACTIVITY)], contract) == [expected]
+
+    def test_unknown_fields_are_dropped_and_missing_ones_added(self, activities):
+        (record,) = normalize_page([copy.deepcopy(ACTIVITY)], activities)
+        assert "unknown_field" not in record
+        assert record["gear_id"] is None
+        assert record["athlete"] == {"id": 7, "resource_state": 1}
+        assert "_dlt_id" not in record
+
+    def test_flattened_columns_replace_nested_ones(self, flat_activities):
+        (record,) = normalize_page([copy.deepcopy(ACTIVITY)], flat_activities)
+        assert record["athlete__id"] == 7
+        assert record["map__id"] == "a1"
+        assert record["map__summary_polyline"] == "abc"
+        assert record["start_latlng__lat"] == 52.1
+        assert record["start_latlng__lng"] == 4.3
+        assert record["end_latlng__lat"] is None
+        assert not {"athlete", "map", "start_latlng", "end_latlng"} & record.keys()
+
+    def test_detailed_map_keeps_its_polyline(self):
+        contract = get_table_contract("activity_details", flatten=True)
+        (record,) = normalize_page(
+            [{"id": 1, "map": {"id": "a1", "polyline": "full", "summary_polyline": "abc"}}],
+            contract,
+        )
+        assert record["map__polyline"] == "full"
+        assert record["map__summary_polyline"] == "abc"
+
+    def test_lists_of_objects_become_parallel_lists(self):
+        contract = get_table_contract("activity_zones", flatten=True)
+        buckets = [{"min": 0, "max": 120, "time": 30}, {"min": 120, "max": -1, "time": 60}]
+        (record,) = normalize_page([{"type": "heartrate", "distribution_buckets": buckets}], contract)
+        assert record["distribution_buckets__min"] == [0, 120]
+        assert record["distribution_buckets__max"] == [120, -1]
+        assert record["distribution_buckets__time"] == [30, 60]
+
+    def test_non_dict_records_are_kept(self, activities):
+        assert normalize_page(["raw"], activities) == ["raw"]
+
+    def test_flatten_without_flattened_columns_keeps_the_contract(self):
+        contract = get_table_contract("activity_streams")
+        assert get_table_contract("activity_streams", flatten=True) is contract
+        assert get_table_contract("no_such_table") is None
+
+
+class TestListSplit:
+    @pytest.fixture
+    def streams(self):
+        return get_table_contract("activity_streams")
+
+    @pytest.mark.parametrize(
+        "stream_type, column",
+        [
+            ("time", "data_bigint"),
+            ("distance", "data_double"),
+            ("latlng", "data_latlng"),
+            ("moving", "data_bool"),
+            ("new_sensor", "data_double"),
+            (None, "data_double"),
+        ],
+    )
+    def test_samples_go_to_the_column_of_their_type(self, streams, stream_type, column):
+        record = {"type": stream_type, "data": [1, 2], "series_type": "distance"}
+        (normalized,) = normalize_page([dict(record)], streams)
+        assert normalized[column] == [1, 2]
+        assert "data" not in normalized
+        assert normalize_record(record, streams) == normalized
+
+    def test_other_data_columns_stay_empty(self, streams):
+        (normalized,) = normalize_page([{"type": "time", "data": [1]}], streams)
+        assert normalized["data_double"] is None
+        assert normalized["data_latlng"] is None
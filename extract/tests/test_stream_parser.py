@@ -0,0 +1,152 @@
+"""Tests for incremental stream response parsing."""
+
+import json
+from array import array
+from threading import BoundedSemaphore
+
+import pytest
+
+from strava_extract.client.http_session import create_session
+from strava_extract.client.rate_limiter import RateLimiter
+from strava_extract.client.response_handler import create_streaming_response_hooks
+from strava_extract.sources.child_resources import ChildResourceFetcher
+from strava_extract.sources.strava_source import get_credential_pool, load_resource_config
+from strava_extract.sources.stream_parser import (
+    StreamingRESTClient,
+    parse_streams,
+    samples_to_list,
+)
+from strava_extract.utils.exceptions import ConfigurationError
+
+STREAMS = [
+    {"type": "time", "data": [0, 1, 2, 5, 10], "series_type": "distance", "original_size": 5},
+    {"type": "distance", "data": [0.0, 2.5, 5.25, 12.0, 30.125], "resolution": "high"},
+    {"type": "latlng", "data": [[52.1, 4.3], [52.2, 4.4], [52.25, 4.45]]},
+    {"type": "moving", "data": [False, True, True, True, False]},
+    {"type": "heartrate", "data": [120, 121, 135, 140, 150]},
+]
+BODY = json.dumps(STREAMS).encode()
+
+
+def _chunks(body: bytes, size: int):
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+@pytest.mark.parametrize("size", range(1, 48))
+def test_every_chunk_boundary_parses_like_json_loads(size):
+    assert parse_streams(_chunks(BODY, size)) == STREAMS
+
+
+def test_compact_samples_are_typed_arrays():
+    streams = parse_streams(_chunks(BODY, 7), compact=True)
+    by_type = {stream["type"]: stream["data"] for stream in streams}
+
+    assert by_type["time"] == array("q", [0, 1, 2, 5, 10])
+    assert by_type["distance"] == array("d", [0.0, 2.5, 5.25, 12.0, 30.125])
+    assert by_type["latlng"] == array("d", [52.1, 4.3, 52.2, 4.4, 52.25, 4.45])
+    assert by_type["moving"] == array("b", [0, 1, 1, 1, 0])
+    assert samples_to_list(by_type["latlng"], 2) == STREAMS[2]["data"]
+
+
+def test_keyed_by_type_takes_the_type_from_the_key():
+    keyed = {stream["type"]: stream for stream in STREAMS}
+    for stream in keyed.values():
+        del stream["type"]
+    body = json.dumps(keyed).encode()
+
+    assert parse_streams(_chunks(body, 5)) == keyed
+    compact = parse_streams(_chunks(body, 5), compact=True)
+    assert isinstance(compact["heartrate"]["data"], array)
+    assert compact["heartrate"]["data"].typecode == "q"
+
+
+def test_unexpected_samples_fall_back_to_json_values():
+    streams = [{"type": "heartrate", "data": [120, None, 130.5]}]
+    body = json.dumps(streams).encode()
+
+    for size in (1, 3, 64):
+        assert parse_streams(_chunks(body, size), compact=True) == streams
+
+
+def test_unknown_stream_types_keep_json_values():
+    streams = [{"type": "new_sensor", "data": [1, 2.5, 3]}]
+
+    parsed = parse_streams([json.dumps(streams).encode()], compact=True)
+
+    assert parsed[0]["data"] == array("d", [1.0, 2.5, 3.0])
+
+
+def test_empty_streams():
+    streams = [{"type": "time", "data": []}, {"type": "latlng", "data": []}]
+
+    assert parse_streams([json.dumps(streams).encode()]) == streams
+
+
+def test_multibyte_text_split_across_chunks():
+    streams = [{"type": "time", "data": [1, 2], "series_type": "distancé"}]
+    body = json.dumps(streams, ensure_ascii=False).encode()
+
+    assert parse_streams(_chunks(body, 1)) == streams
+
+
+def test_truncated_body_is_an_error():
+    with pytest.raises(ValueError, match="inside a data array"):
+        parse_streams([BODY[: BODY.index(b"5, 10")]])
+
+
+def test_samples_to_list_keeps_lists():
+    assert samples_to_list([1, 2, 3]) == [1, 2, 3]
+    assert samples_to_list([[1.0, 2.0]], 2) == [[1.0, 2.0]]
+    assert samples_to_list(array("q", [1, 2])) == [1, 2]
+
+
+class _BodyCheckingClient(StreamingRESTClient):
+    """Records whether each response body was read before the parser got it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bodies = []
+
+    def extract_response(self, response, data_selector):
+        self.bodies.append(
+            (int(response.headers["Content-Length"]), response._content_consumed)
+        )
+        return super().extract_response(response, data_selector)
+
+
+@pytest.mark.integration
+def test_response_hooks_leave_the_streamed_body_unread(fake_api, settings):
+    # Six hours of 1 Hz samples: megabytes of JSON
+    api = fake_api(activities=1, min_seconds=6 * 3600, max_seconds=6 * 3600)
+    (member,) = get_credential_pool().members
+    client = _BodyCheckingClient(
+        base_url=settings.api.base_url, auth=member.auth, session=create_session()
+    )
+    res_config = next(res for res in load_resource_config() if res["name"] == "activity_streams")
+    fetcher = ChildResourceFetcher(res_config, [(member, client)], BoundedSemaphore(1))
+    activity = api.activities()[0]
+
+    streams = fetcher.fetch(activity)
+
+    ((length, consumed),) = client.bodies
+    assert length > 1_000_000
+    assert not consumed
+    assert {stream["type"] for stream in streams} >= {"time", "distance"}
+    assert member.rate_limiter.total_requests > 0
+
+    # The 404 of a deleted activity is ignored on its status code alone
+    assert fetcher.fetch({**activity, "id": 1}) == []
+    assert len(client.bodies) == 1
+
+
+@pytest.mark.parametrize(
+    "action",
+    [
+        {"content": "Not Found", "action": "ignore"},
+        {"status_code": 404, "action": "retry"},
+        lambda response: None,
+    ],
+)
+def test_streaming_hooks_refuse_actions_reading_the_body(settings, action):
+    with pytest.raises(ConfigurationError, match="activity_streams"):
+        create_streaming_response_hooks(RateLimiter(), "activity_streams", [action])
@@ -0,0 +1,153 @@
+"""Tests for the access token cache."""
+
+import importlib.util
+import os
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from strava_extract.auth.oauth import get_auth
+from strava_extract.auth.token_cache import (
+    DEFAULT_CACHE_FILE,
+    CachedToken,
+    FileTokenCache,
+    TokenCache,
+    cache_key,
+    create_token_cache,
+    default_cache_file,
+)
+from strava_extract.utils.exceptions import ConfigurationError
+
+TOKEN = CachedToken(access_token="abc", expires_at=1_700_000_000, refresh_token="r1")
+
+
+class TestFileTokenCache:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "cache.json"
+        FileTokenCache(str(path)).store("key", TOKEN)
+
+        assert FileTokenCache(str(path)).load("key") == TOKEN
+        assert FileTokenCache(str(path)).load("other") is None
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+    def test_keys_are_kept_apart(self, tmp_path):
+        cache = FileTokenCache(str(tmp_path / "cache.json"))
+        other = CachedToken(access_token="def", expires_at=1)
+        cache.store("a", TOKEN)
+        cache.store("b", other)
+
+        assert cache.load("a") == TOKEN
+        assert cache.load("b") == other
+
+    def test_missing_or_corrupt_file_is_empty(self, tmp_path):
+        path = tmp_path / "cache.json"
+        cache = FileTokenCache(str(path))
+        assert cache.load("key") is None
+
+        path.write_text("{not json")
+        assert cache.load("key") is None
+
+        cache.store("key", TOKEN)
+        assert cache.load("key") == TOKEN
+
+    def test_lock_uses_a_lock_file_next_to_the_cache(self, tmp_path):
+        cache = FileTokenCache(str(tmp_path / "cache.json"))
+        with cache.lock("key"):
+            assert (tmp_path / "cache.json.lock").exists()
+
+
+def test_caches_must_implement_load_and_store(tmp_path):
+    class LoadOnly(TokenCache):
+        def load(self, key):
+            return None
+
+    with pytest.raises(TypeError, match="store"):
+        LoadOnly(str(tmp_path / "lock"))
+    with pytest.raises(TypeError):
+        TokenCache(str(tmp_path / "lock"))
+
+
+def test_cache_key_hides_the_refresh_token():
+    key = cache_key("123", "secret-refresh-token")
+    assert key.startswith("123-")
+    assert "secret" not in key
+    assert key != cache_key("123", "other-refresh-token")
+
+
+def test_default_cache_file_sits_next_to_the_state_file(tmp_path):
+    state_file = tmp_path / "state" / "rate_limit.json"
+    assert default_cache_file(str(state_file)) == str(tmp_path / "state" / DEFAULT_CACHE_FILE)
+    assert default_cache_file(None) == str(Path(DEFAULT_CACHE_FILE))
+
+
+class TestCreateTokenCache:
+    def test_file_cache(self, settings):
+        cache = create_token_cache()
+        assert isinstance(cache, FileTokenCache)
+
+    def test_file_defaults_next_to_the_state_file(self, settings, tmp_path):
+        settings.auth.token_cache_file = None
+        settings.rate_limiting.state_file = str(tmp_path / "state" / "limits.json")
+
+        create_token_cache().store("key", TOKEN)
+
+        assert (tmp_path / "state" / DEFAULT_CACHE_FILE).exists()
+
+    def test_disabled(self, settings):
+        settings.auth.token_cache = "none"
+        assert create_token_cache() is None
+
+    def test_airflow_backend_requires_airflow(self, settings):
+        if importlib.util.find_spec("airflow") is not None:
+            pytest.skip("apache-airflow is installed")
+        settings.auth.token_cache = "airflow_variable"
+        with pytest.raises(ConfigurationError, match="apache-airflow"):
+            create_token_cache()
+
+
+class TestCachedRefresh:
+    def test_second_run_reuses_the_cached_token(self, fake_api):
+        api = fake_api()
+
+        first = get_auth()
+        first.obtain_token()
+        second = get_auth()
+        second.obtain_token()
+
+        assert first.access_token == second.access_token == "fake-access-0"
+        assert api.stats().get("token") == 1
+
+    def test_concurrent_tasks_share_one_refresh(self, fake_api):
+        api = fake_api()
+        auths = [get_auth() for _ in range(4)]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda auth: auth.obtain_token(), auths))
+
+        assert {auth.access_token for auth in auths} == {"fake-access-0"}
+        assert api.stats().get("token") == 1
+
+    def test_token_expiring_within_the_margin_is_refreshed(self, fake_api, settings):
+        api = fake_api()
+        FileTokenCache(settings.auth.token_cache_file).store(
+            cache_key("1", "athlete-0"),
+            CachedToken(access_token="stale", expires_at=int(time.time()) + 60),
+        )
+
+        auth = get_auth()
+        auth.obtain_token()
+
+        assert auth.access_token == "fake-access-0"
+        assert api.stats().get("token") == 1
+
+    def test_without_cache_every_auth_refreshes(self, fake_api, settings):
+        settings.auth.token_cache = "none"
+        api = fake_api()
+
+        for _ in range(2):
+            get_auth().obtain_token()
+
+        assert api.stats().get("token") == 2
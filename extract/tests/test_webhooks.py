@@ -0,0 +1,98 @@
+"""Tests for the webhook receiver and the event drain."""
+
+import threading
+from urllib.error import HTTPError
+
+import pytest
+from pydantic import SecretStr
+from webhook_events import SUBSCRIPTION_ID, post_event, synthetic_events, validate
+
+from strava_extract.drain import EventDrainer
+from strava_extract.pipeline import StravaPipeline
+from strava_extract.webhooks.event_queue import open_event_queue
+from strava_extract.webhooks.receiver import serve_webhooks
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def receiver(settings):
+    settings.webhooks.verify_token = SecretStr("verify-me")
+    server = serve_webhooks(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    server.queue.close()
+
+
+class TestReceiver:
+    def test_answers_the_subscription_challenge(self, receiver):
+        assert validate(receiver.url, "verify-me") == {"hub.challenge": "local-challenge"}
+
+    def test_rejects_a_wrong_verify_token(self, receiver):
+        with pytest.raises(HTTPError) as error:
+            validate(receiver.url, "guess")
+        assert error.value.code == 403
+
+    def test_queues_events_once(self, receiver, fake_api):
+        events = synthetic_events(fake_api().data, creates=2, updates=1, deletes=1)
+
+        statuses = [post_event(receiver.url, event) for event in events + events[:1]]
+
+        assert statuses == [200] * (len(events) + 1)
+        assert receiver.queue.pending_count() == len(events)
+
+    @pytest.mark.parametrize("body", [{"object_type": "club"}, [], "event"])
+    def test_rejects_invalid_events(self, receiver, body):
+        assert post_event(receiver.url, body) == 400
+        assert receiver.queue.pending_count() == 0
+
+    def test_filters_other_subscriptions(self, receiver, fake_api):
+        receiver.config.subscription_id = SUBSCRIPTION_ID + 1
+        (event,) = synthetic_events(fake_api().data, creates=1, updates=0, deletes=0)
+
+        assert post_event(receiver.url, event) == 400
+
+    def test_unknown_paths(self, receiver):
+        assert post_event(receiver.url.replace("/webhook", "/other"), {}) == 404
+
+
+class TestDrain:
+    def test_fetches_created_and_deletes_removed_activities(self, fake_api, db):
+        api = fake_api(activities=8)
+        activities = api.activities()
+        # Everything but the newest three is loaded already
+        StravaPipeline(start_date="2023-12-31", end_date=activities[-3]["start_date"][:10]).run()
+        loaded = db("SELECT COUNT(*) FROM strava_raw.activities")[0][0]
+        queue = open_event_queue()
+        for event in synthetic_events(api.data, creates=3, updates=1, deletes=2):
+            queue.append(event)
+        api.reset_stats()
+
+        load_infos = EventDrainer(queue=queue).run()
+
+        assert len(load_infos) == 1
+        assert "list" not in api.stats()
+        assert api.stats()["detail"] == 3
+        assert queue.pending_count() == 0
+        ids = {row[0] for row in db("SELECT id FROM strava_raw.activity_details")}
+        assert {activity["id"] for activity in activities[-3:]} <= ids
+        assert not {activity["id"] for activity in activities[-5:-3]} & ids
+        assert db("SELECT COUNT(*) FROM strava_raw.activities")[0][0] == loaded - 2 + 3
+        queue.close()
+
+    def test_drops_activities_of_deauthorized_athletes(self, fake_api, db):
+        api = fake_api(activities=4)
+        queue = open_event_queue()
+        for event in synthetic_events(api.data, creates=2, updates=0, deletes=0, deauth=True):
+            queue.append(event)
+
+        assert EventDrainer(queue=queue, max_activities=1).run() == []
+
+        assert "detail" not in api.stats()
+        assert queue.pending_count() == 0
+        queue.close()
+
+    def test_nothing_pending(self, settings):
+        assert EventDrainer().run() == []
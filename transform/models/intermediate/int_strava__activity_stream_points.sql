@@ -21,15 +21,15 @@
 with activity_streams as (
     select
         activity_id,
-        -- Cast streams to typed arrays once
-        cast(time_stream as bigint[]) as time_arr,
-        cast(distance_stream as double[]) as distance_arr,
-        cast(altitude_stream as double[]) as altitude_arr,
-        cast(velocity_stream as double[]) as velocity_arr,
-        cast(heartrate_stream as int[]) as heartrate_arr,
-        cast(grade_stream as double[]) as grade_arr,
-        cast(latlng_stream as double[][]) as latlng_arr,
-        cast(moving_stream as boolean[]) as moving_arr
+        -- Streams are loaded as typed lists, no casts needed
+        time_stream as time_arr,
+        distance_stream as distance_arr,
+        altitude_stream as altitude_arr,
+        velocity_stream as velocity_arr,
+        heartrate_stream as heartrate_arr,
+        grade_stream as grade_arr,
+        latlng_stream as latlng_arr,
+        moving_stream as moving_arr
     from {{ ref('int_strava__activity_streams') }}
     where time_stream is not null
     {% if is_incremental() %}
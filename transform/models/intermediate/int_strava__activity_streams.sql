@@ -9,7 +9,7 @@
     Grain: One row per activity.
     Primary key: activity_id
 
-    Each stream type becomes a column containing its JSON array of values.
+    Each stream type becomes a column containing its typed list of values.
 */
 
 with streams as (
@@ -21,14 +21,14 @@ pivoted as (
         activity_id,
 
         -- Pivot each stream type to its own column
-        max(case when stream_type = 'time' then stream_data end) as time_stream,
-        max(case when stream_type = 'distance' then stream_data end) as distance_stream,
-        max(case when stream_type = 'altitude' then stream_data end) as altitude_stream,
-        max(case when stream_type = 'velocity_smooth' then stream_data end) as velocity_stream,
-        max(case when stream_type = 'heartrate' then stream_data end) as heartrate_stream,
-        max(case when stream_type = 'grade_smooth' then stream_data end) as grade_stream,
-        max(case when stream_type = 'latlng' then stream_data end) as latlng_stream,
-        max(case when stream_type = 'moving' then stream_data end) as moving_stream,
+        max(case when stream_type = 'time' then stream_data_bigint end) as time_stream,
+        max(case when stream_type = 'distance' then stream_data_double end) as distance_stream,
+        max(case when stream_type = 'altitude' then stream_data_double end) as altitude_stream,
+        max(case when stream_type = 'velocity_smooth' then stream_data_double end) as velocity_stream,
+        max(case when stream_type = 'heartrate' then stream_data_bigint end) as heartrate_stream,
+        max(case when stream_type = 'grade_smooth' then stream_data_double end) as grade_stream,
+        max(case when stream_type = 'latlng' then stream_data_latlng end) as latlng_stream,
+        max(case when stream_type = 'moving' then stream_data_bool end) as moving_stream,
 
         -- Stream availability flags
         max(case when stream_type = 'time' then 1 else 0 end)::boolean as has_time_stream,
@@ -15,32 +15,31 @@
     - 'heartrate': Heart rate zones with min/max bpm
 */
 
-with pace_zones_raw as (
+with zone_buckets as (
+    -- One row per bucket, unnested from the staging model's parallel lists
     select
         activity_id,
-        distribution_buckets
+        zone_type,
+        idx as zone_id,
+        bucket_min_values[idx] as zone_min,
+        bucket_max_values[idx] as zone_max,
+        bucket_time_seconds[idx] as time_seconds,
+        'Zone ' || idx::varchar as zone_name
     from {{ ref('stg_strava__activity_zones') }}
-    where zone_type = 'pace'
-      and distribution_buckets is not null
+    cross join range(1, len(bucket_time_seconds) + 1) as r(idx)
+    where bucket_time_seconds is not null
 ),
 
 pace_buckets as (
     select
         activity_id,
-        idx + 1 as zone_id,
-        json_extract(bucket, '$.min')::double as zone_min_speed_mps,
-        json_extract(bucket, '$.max')::double as zone_max_speed_mps,
-        json_extract(bucket, '$.time')::double as time_seconds,
-        coalesce(
-            json_extract_string(bucket, '$.name'),
-            json_extract_string(bucket, '$.zone'),
-            'Zone ' || (idx + 1)::varchar
-        ) as zone_name
-    from pace_zones_raw
-    cross join range(0, cast(json_array_length(distribution_buckets) as bigint)) as r(idx)
-    cross join lateral (
-        select json_extract(distribution_buckets, '$[' || idx::varchar || ']') as bucket
-    ) as b
+        zone_id,
+        zone_min as zone_min_speed_mps,
+        zone_max as zone_max_speed_mps,
+        time_seconds,
+        zone_name
+    from zone_buckets
+    where zone_type = 'pace'
 ),
 
 pace_zones as (
@@ -100,32 +99,16 @@ pace_zones_formatted as (
     from pace_zones
 ),
 
-power_zones_raw as (
-    select
-        activity_id,
-        distribution_buckets
-    from {{ ref('stg_strava__activity_zones') }}
-    where zone_type = 'power'
-      and distribution_buckets is not null
-),
-
 power_buckets as (
     select
         activity_id,
-        idx + 1 as zone_id,
-        json_extract(bucket, '$.min')::double as zone_min_watts,
-        json_extract(bucket, '$.max')::double as zone_max_watts,
-        json_extract(bucket, '$.time')::double as time_seconds,
-        coalesce(
-            json_extract_string(bucket, '$.name'),
-            json_extract_string(bucket, '$.zone'),
-            'Zone ' || (idx + 1)::varchar
-        ) as zone_name
-    from power_zones_raw
-    cross join range(0, cast(json_array_length(distribution_buckets) as bigint)) as r(idx)
-    cross join lateral (
-        select json_extract(distribution_buckets, '$[' || idx::varchar || ']') as bucket
-    ) as b
+        zone_id,
+        zone_min as zone_min_watts,
+        zone_max as zone_max_watts,
+        time_seconds,
+        zone_name
+    from zone_buckets
+    where zone_type = 'power'
 ),
 
 power_zones as (
@@ -151,32 +134,16 @@ power_zones as (
     from power_buckets
 ),
 
-hr_zones_raw as (
-    select
-        activity_id,
-        distribution_buckets
-    from {{ ref('stg_strava__activity_zones') }}
-    where zone_type = 'heartrate'
-      and distribution_buckets is not null
-),
-
 hr_buckets as (
     select
         activity_id,
-        idx + 1 as zone_id,
-        json_extract(bucket, '$.min')::double as zone_min_bpm,
-        json_extract(bucket, '$.max')::double as zone_max_bpm,
-        json_extract(bucket, '$.time')::double as time_seconds,
-        coalesce(
-            json_extract_string(bucket, '$.name'),
-            json_extract_string(bucket, '$.zone'),
-            'Zone ' || (idx + 1)::varchar
-        ) as zone_name
-    from hr_zones_raw
-    cross join range(0, cast(json_array_length(distribution_buckets) as bigint)) as r(idx)
-    cross join lateral (
-        select json_extract(distribution_buckets, '$[' || idx::varchar || ']') as bucket
-    ) as b
+        zone_id,
+        zone_min as zone_min_bpm,
+        zone_max as zone_max_bpm,
+        time_seconds,
+        zone_name
+    from zone_buckets
+    where zone_type = 'heartrate'
 ),
 
 hr_zones as (
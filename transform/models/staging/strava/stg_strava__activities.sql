@@ -19,8 +19,12 @@ staged as (
         -- Primary key
         id as activity_id,
 
-        -- Athlete (extracted from JSON)
+        -- Athlete (extracted from JSON unless flattened at extract time)
+        {% if var('strava_flattened') %}
+        athlete__id as athlete_id,
+        {% else %}
         (athlete->>'id')::bigint as athlete_id,
+        {% endif %}
 
         -- Activity identifiers
         name as activity_name,
@@ -39,6 +43,17 @@ staged as (
         location_state,
         location_country,
 
+        {% if var('strava_flattened') %}
+        -- Coordinates
+        start_latlng__lat as start_latitude,
+        start_latlng__lng as start_longitude,
+        end_latlng__lat as end_latitude,
+        end_latlng__lng as end_longitude,
+
+        -- Map data
+        map__id as map_id,
+        map__summary_polyline as polyline,
+        {% else %}
         -- Coordinates (extracted from JSON arrays)
         (start_latlng->>0)::double as start_latitude,
         (start_latlng->>1)::double as start_longitude,
@@ -48,6 +63,7 @@ staged as (
         -- Map data (extracted from JSON)
         (map->>'id') as map_id,
         (map->>'summary_polyline') as polyline,
+        {% endif %}
 
         -- Distance and elevation
         distance as distance_meters,
@@ -22,8 +22,13 @@ staged as (
 
         -- Foreign keys
         _activities_id as activity_id,
+        {% if var('strava_flattened') %}
+        segment__id as segment_id,
+        athlete__id as athlete_id,
+        {% else %}
         (segment->>'id')::bigint as segment_id,
         (athlete->>'id')::bigint as athlete_id,
+        {% endif %}
 
         -- Effort details
         name as effort_name,
@@ -56,6 +61,32 @@ staged as (
         visibility,
         hidden as is_hidden,
 
+        {% if var('strava_flattened') %}
+        -- Segment details (flattened at extract time)
+        segment__name as segment_name,
+        segment__activity_type as segment_activity_type,
+        segment__distance as segment_distance_meters,
+        segment__average_grade as segment_average_grade,
+        segment__maximum_grade as segment_maximum_grade,
+        segment__elevation_high as segment_elevation_high,
+        segment__elevation_low as segment_elevation_low,
+        segment__climb_category::int as segment_climb_category,
+        segment__city as segment_city,
+        segment__state as segment_state,
+        segment__country as segment_country,
+        segment__start_latlng__lat as segment_start_latitude,
+        segment__start_latlng__lng as segment_start_longitude,
+        segment__end_latlng__lat as segment_end_latitude,
+        segment__end_latlng__lng as segment_end_longitude,
+        segment__private as segment_is_private,
+        segment__hazardous as segment_is_hazardous,
+        segment__starred as segment_is_starred,
+
+        -- Achievements (one list element per achievement)
+        achievements__type_id as achievement_type_ids,
+        achievements__type as achievement_types,
+        achievements__rank as achievement_ranks,
+        {% else %}
         -- Segment details (extracted from JSON for denormalization)
         segment->>'name' as segment_name,
         segment->>'activity_type' as segment_activity_type,
@@ -76,8 +107,11 @@ staged as (
         (segment->>'hazardous')::boolean as segment_is_hazardous,
         (segment->>'starred')::boolean as segment_is_starred,
 
-        -- Achievements (keep as JSON for flexibility)
-        achievements as achievements_json,
+        -- Achievements (one list element per achievement)
+        json_extract(achievements, '$[*].type_id')::bigint[] as achievement_type_ids,
+        json_extract_string(achievements, '$[*].type') as achievement_types,
+        json_extract(achievements, '$[*].rank')::bigint[] as achievement_ranks,
+        {% endif %}
 
         -- Resource state
         resource_state,
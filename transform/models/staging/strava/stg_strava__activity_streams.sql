@@ -26,8 +26,11 @@ staged as (
         original_size as data_point_count,
         resolution,
 
-        -- Stream data (JSON array of values)
-        data as stream_data,
+        -- Stream data (typed list of values; only the column of the stream's element type is set)
+        data_bigint as stream_data_bigint,
+        data_double as stream_data_double,
+        data_latlng as stream_data_latlng,
+        data_bool as stream_data_bool,
 
         -- dlt metadata
         _dlt_load_id,
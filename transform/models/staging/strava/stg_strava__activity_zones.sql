@@ -22,7 +22,16 @@ staged as (
         sensor_based,
         points,
         custom_zones,
-        distribution_buckets,
+        -- Zone buckets as parallel lists (one element per zone)
+        {% if var('strava_flattened') %}
+        distribution_buckets__min as bucket_min_values,
+        distribution_buckets__max as bucket_max_values,
+        distribution_buckets__time as bucket_time_seconds,
+        {% else %}
+        json_extract(distribution_buckets, '$[*].min')::double[] as bucket_min_values,
+        json_extract(distribution_buckets, '$[*].max')::double[] as bucket_max_values,
+        json_extract(distribution_buckets, '$[*].time')::double[] as bucket_time_seconds,
+        {% endif %}
         resource_state,
         _dlt_load_id,
         _dlt_id
@@ -36,7 +45,9 @@ select
     sensor_based,
     points,
     custom_zones,
-    distribution_buckets,
+    bucket_min_values,
+    bucket_max_values,
+    bucket_time_seconds,
     resource_state,
     _dlt_load_id,
     _dlt_id